@@ -5,30 +5,106 @@ Flask API для проверки текста на соответствие з
 УЛУЧШЕННАЯ ВЕРСИЯ с максимальным функционалом
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import (Flask, Response, render_template, request, jsonify, send_file, session,
+                   stream_with_context)
 from flask_cors import CORS
 import os
+import logging
 from datetime import datetime
+from boilerplate import Boilerplate
 from checker import RussianLanguageChecker
+from checkpool import CheckPool
+from crawler import CRAWL_MAX_PAGES, SiteCrawler, crawl_root
+from fetcher import BatchFetcher, normalize_url, url_host
+from htmltext import read_page_text
+from httpcache import PageCache
+from resultcache import ResultCache, text_digest
+from singleflight import SingleFlight
+from jobs import JobError, JobRunner, JobStore
+from monitor import MONITOR_INTERVAL, MonitorError, MonitorRunner, MonitorStore
+from memstats import deep_sizeof, memory_report
 import requests
-from bs4 import BeautifulSoup
 import io
 import json
 import uuid
 from collections import defaultdict
 
+# Уровень логов: LOG_LEVEL=INFO покажет загрузку словарей и фазы запуска
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 # CORS - разрешаем все домены
 CORS(app, resources={
     r"/api/*": {
         "origins": "*",
-        "methods": ["GET", "POST", "OPTIONS"],
+        "methods": ["GET", "POST", "DELETE", "OPTIONS"],
         "allow_headers": ["Content-Type"]
     }
 })
 
-# Инициализация чекера
-checker = RussianLanguageChecker()
+# Инициализация чекера (под gunicorn с preload_app - один раз в мастере,
+# воркеры наследуют его через fork, см. gunicorn.conf.py).
+# LAZY_STARTUP=1 - словари грузятся в фоне, приложение отвечает сразу,
+# готовность - /readyz
+LAZY_STARTUP = os.environ.get('LAZY_STARTUP', '0') == '1'
+checker = RussianLanguageChecker(defer=LAZY_STARTUP)
+if LAZY_STARTUP:
+    checker.start_background_init()
+
+# DICT_WATCH_INTERVAL=N - раз в N секунд проверять mtime файлов в
+# dictionaries/ и перезагружать словари без рестарта (в каждом воркере)
+DICT_WATCH_INTERVAL = float(os.environ.get('DICT_WATCH_INTERVAL', 0))
+
+# DEFER_BACKGROUND=1 (ставит gunicorn.conf.py при preload_app) - фоновые
+# потоки не запускаются при импорте в мастере, их запускает post_fork
+# в каждом воркере (start_background)
+DEFER_BACKGROUND = os.environ.get('DEFER_BACKGROUND', '0') == '1'
+
+# Пул соединений и потоков для /api/batch-check; разбор и проверка
+# страниц - в пуле процессов при CHECK_PROCESSES > 0 (checkpool.py)
+batch_fetcher = BatchFetcher()
+check_pool = CheckPool(checker)
+
+# Кэш извлечённого текста страниц с перепроверкой по ETag/Last-Modified
+page_cache = PageCache()
+
+# Задания аудита больших списков URL (jobs.py). Обработчик заданий и
+# мониторинга - один отдельный процесс python jobs.py (worker в Procfile,
+# JOBS_DB и MONITOR_DB на общем с web диске), HTTP-воркеры только принимают
+# задания. JOBS_INLINE=1 - обработчики в каждом воркере (один процесс без
+# Procfile); python app.py запускает их сам
+JOBS_INLINE = os.environ.get('JOBS_INLINE', '0') == '1'
+job_store = JobStore()
+crawler = SiteCrawler(job_store, check_pool, page_cache)
+job_runner = JobRunner(job_store, batch_fetcher, lambda url, fetch: check_page(url, fetch), crawler)
+
+# Мониторинг страниц по расписанию (monitor.py): проверяются только
+# изменённые абзацы; обработчик - как у заданий (JOBS_INLINE)
+monitor_store = MonitorStore()
+monitor_runner = MonitorRunner(monitor_store, checker, batch_fetcher, page_cache)
+
+
+def start_background():
+    """Фоновые потоки процесса: слежение за словарями, задания, мониторинг"""
+    if DICT_WATCH_INTERVAL > 0:
+        checker.start_watcher(DICT_WATCH_INTERVAL)
+    if JOBS_INLINE:
+        job_runner.start()
+        monitor_runner.start()
+
+
+if not DEFER_BACKGROUND:
+    start_background()
+
+# Объединение одинаковых одновременных проверок текста и URL
+in_flight = SingleFlight()
+
+# Результаты /api/check по хешу текста и версии словарей (resultcache.py)
+result_cache = ResultCache()
 
 # Хранилище истории проверок (в продакшене используйте Redis/Database)
 check_history = []
@@ -63,6 +139,22 @@ def robots():
     """Robots.txt"""
     return send_file('static/robots.txt', mimetype='text/plain')
 
+@app.route('/healthz')
+def healthz():
+    """Процесс запущен"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Словари и морфология загружены"""
+    body = {
+        'ready': checker.ready,
+        'startup_timings_ms': checker.startup_timings
+    }
+    if checker.startup_error:
+        body['error'] = checker.startup_error
+    return jsonify(body), (200 if checker.ready else 503)
+
 @app.route('/favicon.ico')
 def favicon():
     """Favicon"""
@@ -81,7 +173,15 @@ def check_text():
         if not text or not text.strip():
             return jsonify({'error': 'Текст не предоставлен'}), 400
         
-        result = checker.check_text(text)
+        # Повторно присланный текст берётся из кэша, одинаковые
+        # одновременные тексты проверяются один раз
+        digest = text_digest(text)
+        shared = result_cache.get(digest, checker.dict_version)
+        cached, coalesced = shared is not None, False
+        if not cached:
+            shared, coalesced = in_flight.do(
+                ('text', digest), lambda: result_cache.put(digest, checker.check_text(text)))
+        result = dict(shared, coalesced=coalesced, cached=cached)
         
         # Добавляем рекомендации
         result['recommendations'] = generate_recommendations(result)
@@ -103,6 +203,25 @@ def check_text():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def fetch_and_check(url):
+    """Загрузка страницы и проверка её текста"""
+    # Загрузка страницы потоком: текст извлекается по мере чтения,
+    # тело ограничено MAX_PAGE_BYTES (htmltext.py). Через кэш: на 304
+    # нет ни загрузки, ни разбора (httpcache.py)
+    def get(headers):
+        return requests.get(url, timeout=15, stream=True, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            **headers
+        })
+    text, title, page_info, cache_info = page_cache.fetch(url, 'page', get, read_page_text)
+    title_text = title if title is not None else 'Без названия'
+    
+    result = checker.check_text(text)
+    result['page_title'] = title_text
+    result.update(page_info)
+    result['cache'] = cache_info
+    return result
+
 @app.route('/api/check-url', methods=['POST'])
 def check_url():
     """API: Проверка URL"""
@@ -113,24 +232,9 @@ def check_url():
         if not url or not url.startswith('http'):
             return jsonify({'error': 'Некорректный URL'}), 400
         
-        # Загрузка страницы
-        response = requests.get(url, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Удаляем ненужное
-        for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
-            tag.decompose()
-        
-        # Извлекаем текст и мета-информацию
-        text = soup.get_text(separator=' ', strip=True)
-        title = soup.find('title')
-        title_text = title.get_text() if title else 'Без названия'
-        
-        result = checker.check_text(text)
-        result['page_title'] = title_text
+        # Одновременные запросы одного URL - одна загрузка и одна проверка
+        shared, coalesced = in_flight.do(('url', normalize_url(url)), lambda: fetch_and_check(url))
+        result = dict(shared, coalesced=coalesced)
         result['recommendations'] = generate_recommendations(result)
         
         # Сохраняем в историю
@@ -147,6 +251,29 @@ def check_url():
     except Exception as e:
         return jsonify({'error': f'Ошибка загрузки: {str(e)}'}), 500
 
+def check_page(url, fetch, page=False):
+    """Страница пакета (через кэш страниц) -> результат check_text.
+
+    page=True - текст извлекается как у /api/check-url (без меню, шапки
+    и подвала): так проверяет пакеты интерфейс сайта.
+    """
+    return check_pool.check_page(url, fetch, page_cache, page=page)
+
+def batch_process(data):
+    """Обработка URL пакета по параметрам запроса (extract: 'page' или 'batch')"""
+    page = data.get('extract') == 'page'
+    return lambda url, fetch: check_page(url, fetch, page)
+
+def batch_record(url, result, error):
+    """Запись результата одного URL пакета"""
+    if error is None:
+        return {'url': url, 'success': True, 'result': result}
+    return {'url': url, 'success': False, 'error': str(error)}
+
+def batch_hosts(batch):
+    """Время ответа и состояние хостов пакета (fetcher.health)"""
+    return batch_fetcher.health.report({url_host(url) for url in batch if isinstance(url, str)})
+
 @app.route('/api/batch-check', methods=['POST'])
 def batch_check():
     """API: Пакетная проверка"""
@@ -157,41 +284,223 @@ def batch_check():
         if not urls:
             return jsonify({'error': 'Список URL пуст'}), 400
         
+        # Страницы грузятся параллельно (fetcher.py), порядок результатов - как в urls
+        batch = urls[:50]  # Лимит 50 URL за раз
+        outcomes = batch_fetcher.map(batch, batch_process(data))
+        
+        # Общие абзацы сайта (шапка, меню, подвал) - один раз в boilerplate,
+        # в результатах страниц только их собственный текст
+        strip = data.get('boilerplate', 'strip') != 'keep'
+        boilerplate = Boilerplate()
+        for url, (result, error) in zip(batch, outcomes):
+            if error is None:
+                boilerplate.add(url, result['blocks'])
         results = []
-        for url in urls[:50]:  # Лимит 50 URL за раз
-            try:
-                response = requests.get(url, timeout=10, headers={
-                    'User-Agent': 'Mozilla/5.0'
-                })
-                soup = BeautifulSoup(response.text, 'html.parser')
-                for tag in soup(['script', 'style']):
-                    tag.decompose()
-                text = soup.get_text(separator=' ', strip=True)
-                result = checker.check_text(text)
-                
-                results.append({
-                    'url': url,
-                    'success': True,
-                    'result': result
-                })
-                
-            except Exception as e:
-                results.append({
-                    'url': url,
-                    'success': False,
-                    'error': str(e)
-                })
+        for url, (result, error) in zip(batch, outcomes):
+            if error is None:
+                blocks = result.pop('blocks')
+                if strip:
+                    result = boilerplate.strip(url, result, blocks)
+            results.append(batch_record(url, result, error))
         
         return jsonify({
             'success': True,
             'total': len(urls),
             'results': results,
+            'boilerplate': boilerplate.report(),
+            'hosts': batch_hosts(batch),
             'timestamp': datetime.now().isoformat()
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/batch-check/stream', methods=['POST'])
+def batch_check_stream():
+    """API: Пакетная проверка с потоковой выдачей.
+
+    События по мере готовности: result (запись URL с индексом), progress,
+    в конце summary. Формат - NDJSON (по умолчанию) или Server-Sent Events
+    (?format=sse или Accept: text/event-stream).
+
+    Результаты страниц уходят до того, как известны общие абзацы сайта,
+    поэтому они полные; общие абзацы и их нарушения - в summary.boilerplate.
+    """
+    data = request.json or {}
+    urls = data.get('urls', [])
+    if not urls:
+        return jsonify({'error': 'Список URL пуст'}), 400
+    
+    batch = urls[:50]  # Лимит 50 URL за раз
+    sse = (request.args.get('format') == 'sse'
+           or request.accept_mimetypes.best == 'text/event-stream')
+    
+    def encode(event, payload):
+        line = json.dumps(payload, ensure_ascii=False)
+        if sse:
+            return f"event: {event}\ndata: {line}\n\n"
+        return json.dumps({'type': event, **payload}, ensure_ascii=False) + "\n"
+    
+    def generate():
+        completed = successful = violations = 0
+        boilerplate = Boilerplate()
+        yield encode('progress', {'completed': 0, 'total': len(batch)})
+        for index, result, error in batch_fetcher.iter_completed(batch, batch_process(data)):
+            if error is None:
+                boilerplate.add(batch[index], result.pop('blocks'))
+            record = batch_record(batch[index], result, error)
+            completed += 1
+            if error is None:
+                successful += 1
+                violations += 0 if result['law_compliant'] else 1
+            yield encode('result', {'index': index, **record})
+            yield encode('progress', {'completed': completed, 'total': len(batch)})
+        yield encode('summary', {
+            'total': len(urls),
+            'checked': completed,
+            'successful': successful,
+            'failed': completed - successful,
+            'with_violations': violations,
+            'boilerplate': boilerplate.report(),
+            'hosts': batch_hosts(batch),
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream' if sse else 'application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """API: Задание аудита списка URL - результат опрашивается по job_id"""
+    data = request.json or {}
+    try:
+        job = job_store.create(data.get('urls', []))
+    except JobError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(job), 202
+
+@app.route('/api/crawl', methods=['POST'])
+def create_crawl():
+    """API: Обход сайта - задание, страницы ищутся в robots.txt/sitemap.xml.
+
+    follow_links - добавлять ссылки проверенных страниц того же хоста;
+    остановка и продолжение - /api/jobs/<id>/cancel и /resume.
+    """
+    data = request.json or {}
+    url = (data.get('url') or data.get('domain') or '').strip()
+    if not url:
+        return jsonify({'error': 'Не указан сайт'}), 400
+    root = crawl_root(url)
+    try:
+        max_pages = int(data.get('max_pages', 1000))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Некорректный max_pages'}), 400
+    options = {
+        'follow_links': bool(data.get('follow_links', False)),
+        'max_pages': min(max(max_pages, 1), CRAWL_MAX_PAGES)
+    }
+    return jsonify(job_store.create_crawl(root, options)), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """API: Состояние задания"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """API: Страница результатов задания (?offset=&limit=).
+
+    Нарушения общих абзацев сайта в результаты страниц не входят
+    (?boilerplate=keep - полные результаты), они - в /boilerplate.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    strip = request.args.get('boilerplate', 'strip') != 'keep'
+    return jsonify({
+        'job': job,
+        'offset': offset,
+        'limit': limit,
+        'results': job_store.results(job_id, offset, limit, strip)
+    })
+
+@app.route('/api/jobs/<job_id>/boilerplate', methods=['GET'])
+def get_job_boilerplate(job_id):
+    """API: Общие абзацы сайтов задания и их нарушения (по хостам)"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    return jsonify({'job': job, 'boilerplate': job_store.boilerplate(job_id).report()})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """API: Отмена задания (проверенные URL сохраняются)"""
+    return job_transition(job_store.cancel, job_id)
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """API: Продолжение отменённого задания с первого непроверенного URL"""
+    return job_transition(job_store.resume, job_id)
+
+def job_transition(action, job_id):
+    try:
+        job = action(job_id)
+    except JobError as e:
+        return jsonify({'error': str(e)}), 409
+    if job is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    return jsonify(job)
+
+@app.route('/api/monitors', methods=['POST'])
+def add_monitor():
+    """API: Страница под наблюдением; interval - секунды между проверками"""
+    data = request.json or {}
+    url = (data.get('url') or '').strip()
+    if not url:
+        return jsonify({'error': 'URL не предоставлен'}), 400
+    try:
+        monitor = monitor_store.add(url, data.get('interval', MONITOR_INTERVAL))
+    except (MonitorError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(monitor), 201
+
+@app.route('/api/monitors', methods=['GET'])
+def list_monitors():
+    """API: Страницы под наблюдением (?offset=&limit=)"""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    return jsonify({'monitors': monitor_store.list(offset, limit)})
+
+@app.route('/api/monitors/<monitor_id>', methods=['GET'])
+def get_monitor(monitor_id):
+    """API: Последний результат страницы и история запусков с изменениями нарушений"""
+    monitor = monitor_store.get(monitor_id)
+    if monitor is None:
+        return jsonify({'error': 'Страница не найдена'}), 404
+    monitor['runs'] = monitor_store.runs(monitor_id, request.args.get('runs', 10, type=int))
+    return jsonify(monitor)
+
+@app.route('/api/monitors/<monitor_id>', methods=['DELETE'])
+def remove_monitor(monitor_id):
+    """API: Снятие страницы с наблюдения"""
+    if not monitor_store.remove(monitor_id):
+        return jsonify({'error': 'Страница не найдена'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/monitors/<monitor_id>/run', methods=['POST'])
+def run_monitor(monitor_id):
+    """API: Внеочередная проверка страницы"""
+    monitor = monitor_store.schedule_now(monitor_id)
+    if monitor is None:
+        return jsonify({'error': 'Страница не найдена'}), 404
+    return jsonify(monitor), 202
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """API: Статистика словарей"""
@@ -200,15 +509,25 @@ def get_stats():
             'normative': len(checker.normative_words),
             'foreign': len(checker.foreign_allowed),
             'nenormative': len(checker.nenormative_words),
-            'morph_available': checker.morph is not None
+            'morph_available': checker.morph is not None,
+            'dict_version': checker.dict_version,
+            'dictionaries_loaded_at': checker.dictionaries_loaded_at,
+            'ready': checker.ready,
+            'startup_timings_ms': checker.startup_timings,
+            'verdict_cache': checker.verdict_cache.stats(),
+            'page_cache': page_cache.stats(),
+            'in_flight': in_flight.stats(),
+            'result_cache': result_cache.stats(),
+            'block_cache': check_pool.blocks.stats(),
+            'hosts': batch_fetcher.health.stats()
         }
         
-        print(f"📊 Отправка статистики: {stats_data}")  # Для отладки
+        logger.debug("Отправка статистики: %s", stats_data)
         
         return jsonify(stats_data)
     
     except Exception as e:
-        print(f"❌ Ошибка в /api/stats: {e}")
+        logger.error("Ошибка в /api/stats: %s", e)
         return jsonify({
             'normative': 0,
             'foreign': 0,
@@ -217,6 +536,44 @@ def get_stats():
             'error': str(e)
         }), 500
 
+@app.route('/api/explain', methods=['GET'])
+def explain_word():
+    """API: Почему слово признано допустимым (вердикт, источники, причина)"""
+    word = request.args.get('word', '').strip()
+    if not word:
+        return jsonify({'error': 'Слово не указано'}), 400
+    try:
+        return jsonify(checker.explain_word(word))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/memory', methods=['GET'])
+def admin_memory():
+    """API: Память процесса и воркеров (shared/private страницы) и структур"""
+    try:
+        report = memory_report()
+        structures = checker.memory_usage()
+        structures['history'] = {'entries': len(check_history), 'bytes': deep_sizeof(check_history)}
+        structures['statistics'] = {'bytes': deep_sizeof(statistics)}
+        report['structures'] = structures
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """API: Перезагрузка словарей без рестарта.
+
+    Под gunicorn перезагружается только обработавший запрос воркер -
+    для всех воркеров используйте DICT_WATCH_INTERVAL.
+    """
+    try:
+        result = checker.reload_dictionaries()
+        result['pid'] = os.getpid()
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
     """API: История проверок"""
@@ -787,4 +1144,7 @@ def generate_html_report(result):
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
+    if not JOBS_INLINE:
+        job_runner.start()
+        monitor_runner.start()
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк CPU-этапа пакетной проверки: страниц/с при 1, 2, 4, 8 процессах
+
+Страницы уже загружены (HTML в памяти), проверка идёт из пула потоков,
+как в BatchFetcher. 0 процессов - прежний вариант: разбор и check_text
+в потоках под GIL.
+
+Запуск: python benchmarks/bench_checkpool.py [страниц] [размер_страницы_КБ]
+"""
+
+import html
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_tokenizer import make_text  # noqa: E402
+from checker import RussianLanguageChecker  # noqa: E402
+from checkpool import CheckPool  # noqa: E402
+
+
+def make_pages(count, size_bytes):
+    """HTML-страницы с текстом, скриптами и стилями"""
+    pages = []
+    for seed in range(count):
+        paragraphs = make_text(size_bytes, seed=seed).split('\n')
+        body = ''.join(f'<p>{html.escape(p)}</p>' for p in paragraphs if p)
+        pages.append(f'<html><head><title>Страница {seed}</title><style>p {{margin: 0}}</style>'
+                     f'<script>var page = {seed};</script></head><body>{body}</body></html>')
+    return pages
+
+
+def run(pool, pages, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(pool.check_html, pages))
+    return time.perf_counter() - start, results
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    size_kb = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pages = make_pages(count, int(size_kb * 1024))
+    checker = RussianLanguageChecker()
+
+    # Кэш вердиктов прогревается заранее - процессы наследуют его при fork
+    run(CheckPool(checker, 0), pages, 1)
+
+    print(f"Страниц: {count}, ~{size_kb:.0f} КБ текста каждая, ядер: {os.cpu_count()}")
+    baseline = None
+    for processes in (0, 1, 2, 4, 8):
+        pool = CheckPool(checker, processes)
+        # Порождение процессов не входит в замер
+        run(pool, pages[:processes or 1], max(processes, 1))
+        elapsed, results = run(pool, pages, max(processes * 2, 4))
+        pool.shutdown()
+        if baseline is None:
+            baseline = (elapsed, results)
+        label = 'потоки (GIL)' if processes == 0 else f'{processes} процесс(а/ов)'
+        same = 'да' if results == baseline[1] else 'НЕТ'
+        print(f"{label:>18}: {count / elapsed:8.1f} стр/с  (x{baseline[0] / elapsed:.2f}, "
+              f"результаты совпадают: {same})")
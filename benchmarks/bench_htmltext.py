@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк извлечения текста: BeautifulSoup + decompose против htmltext
+
+Прежний путь check_url строил полное дерево BeautifulSoup и удалял из
+него script/style/nav/footer/header; htmltext отбрасывает их при разборе.
+
+Запуск: python benchmarks/bench_htmltext.py [размер_МБ]
+"""
+
+import html
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from bench_tokenizer import best_of, make_text  # noqa: E402
+from htmltext import PAGE_SKIP_TAGS, extract_text  # noqa: E402
+
+
+def legacy_extract(page):
+    """Прежняя реализация check_url"""
+    soup = BeautifulSoup(page, 'html.parser')
+    for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
+        tag.decompose()
+    text = soup.get_text(separator=' ', strip=True)
+    title = soup.find('title')
+    return text, (title.get_text() if title else None)
+
+
+def make_page(size_bytes, seed=168):
+    """Страница с меню, скриптами, стилями, ссылками и вложенной разметкой"""
+    rnd = random.Random(seed)
+    paragraphs = make_text(size_bytes, seed=seed).split('\n')
+    menu = '<nav><ul>' + ''.join(f'<li><a href="/p{i}">Раздел {i}</a></li>' for i in range(20)) + '</ul></nav>'
+    parts = ['<!DOCTYPE html><html><head><title>Тестовая страница &amp; SEO</title>',
+             '<style>body { font: 14px sans-serif }</style><script>var x = "<p>";</script></head>',
+             f'<body><header>{menu}</header>']
+    for paragraph in paragraphs:
+        if not paragraph:
+            continue
+        words = html.escape(paragraph).split(' ')
+        if len(words) > 4 and rnd.random() < 0.5:
+            words[1] = f'<b>{words[1]}</b>'
+            words[3] = f'<a href="https://example.com/{rnd.randint(0, 999)}">{words[3]}</a>'
+        parts.append(f'<div class="block"><p>{" ".join(words)}</p><!-- блок --></div>')
+        if rnd.random() < 0.05:
+            parts.append('<script>track("view");</script><img src="/i.png" alt=""><br>')
+    parts.append(f'<footer>{menu}&copy; 2024</footer></body></html>')
+    return ''.join(parts)
+
+
+if __name__ == '__main__':
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    page = make_page(int(size_mb * 1024 * 1024))
+
+    same = legacy_extract(page) == extract_text(page, PAGE_SKIP_TAGS)
+    legacy_time = best_of(legacy_extract, page, repeat=3)
+    new_time = best_of(extract_text, page, repeat=3)
+
+    print(f"Страница: {len(page.encode('utf-8')) / 1024 / 1024:.2f} МБ HTML")
+    print(f"BeautifulSoup + decompose: {legacy_time * 1000:8.1f} мс")
+    print(f"htmltext.extract_text:     {new_time * 1000:8.1f} мс  (x{legacy_time / new_time:.2f})")
+    print(f"Текст и title совпадают: {'да' if same else 'НЕТ'}")
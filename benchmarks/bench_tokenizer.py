@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Микробенчмарк: count_tokens (слова между ссылками и телефонами) против прежней очистки + findall
+
+Запуск: python benchmarks/bench_tokenizer.py [размер_МБ]
+"""
+
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from checker import SCRIPT_CYRILLIC, count_tokens  # noqa: E402
+
+
+def legacy_tokenize(text):
+    """Прежняя реализация check_text: два re.sub, findall и re.search на слово"""
+    text = re.sub(r'https?://[^\s]+', ' ', text)
+    text = re.sub(r'\+?\d[\d\s\-\(\)]{7,}', ' ', text)
+    all_words = re.findall(r'\b[а-яёА-ЯЁa-zA-Z][а-яёА-ЯЁa-zA-Z\-]*\b', text)
+    latin = {word for word in all_words if re.search(r'[a-zA-Z]', word)}
+    return Counter(all_words), latin
+
+
+def make_text(size_bytes, seed=168):
+    """Текст из словарных слов с латиницей, ссылками и телефонами"""
+    rnd = random.Random(seed)
+    dict_file = Path(__file__).resolve().parent.parent / 'dictionaries' / 'orfograf_words.txt'
+    words = dict_file.read_text(encoding='utf-8').split()[:20000]
+    extras = ['SEO', 'email', 'онлайн-маркетинг', 'Hello', 'бизнес-ланч', 'Привет-World',
+              'https://example.com/path?q=1', '+7 (999) 123-45-67', '8-800-555-35-35', 'ООО']
+    parts = []
+    size = 0
+    while size < size_bytes:
+        word = rnd.choice(extras) if rnd.random() < 0.05 else rnd.choice(words)
+        if rnd.random() < 0.1:
+            word = word.capitalize()
+        sep = rnd.choice([' ', ' ', ' ', ', ', '. ', '\n'])
+        parts.append(word + sep)
+        size += len(word.encode('utf-8')) + len(sep)
+    return ''.join(parts)
+
+
+def best_of(func, text, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    text = make_text(int(size_mb * 1024 * 1024))
+
+    legacy_counts, legacy_latin = legacy_tokenize(text)
+    word_counts, scripts = count_tokens(text)
+    latin = {word for word, script in scripts.items() if script != SCRIPT_CYRILLIC}
+    same = legacy_counts == word_counts and legacy_latin == latin
+
+    legacy_time = best_of(legacy_tokenize, text)
+    new_time = best_of(count_tokens, text)
+
+    print(f"Текст: {len(text.encode('utf-8')) / 1024 / 1024:.2f} МБ, "
+          f"слов: {sum(word_counts.values()):,}, уникальных: {len(word_counts):,}")
+    print(f"Прежняя реализация:  {legacy_time * 1000:8.1f} мс")
+    print(f"count_tokens:        {new_time * 1000:8.1f} мс  (x{legacy_time / new_time:.2f})")
+    print(f"Результаты совпадают: {'да' if same else 'НЕТ'}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Повторяющиеся абзацы (шапка, меню, подвал) в пакетной проверке и обходе.
+
+Страница проверяется по абзацам (htmltext.extract_blocks): вердикт
+абзаца (checker.text_verdicts) кэшируется по (версия словарей, хеш абзаца),
+поэтому одинаковый на всех страницах сайта текст разбирается и
+классифицируется один раз, а результат страницы собирается из
+вердиктов абзацев (checker.merge_verdicts).
+
+Абзац, встретившийся на BOILERPLATE_MIN_PAGES и более страницах одного
+хоста в пакете или задании, считается общим текстом сайта: его нарушения
+показываются один раз в отчёте по хосту, а из результатов страниц
+исключаются.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from fetcher import url_host
+
+# На скольких страницах хоста абзац должен повториться
+BOILERPLATE_MIN_PAGES = int(os.environ.get('BOILERPLATE_MIN_PAGES', 2))
+# Кэш вердиктов абзацев (число абзацев)
+BLOCK_CACHE_SIZE = int(os.environ.get('BLOCK_CACHE_SIZE', 20000))
+
+# Категории нарушений в результате check_text
+VIOLATION_KEYS = ('latin_words', 'unknown_cyrillic', 'nenormative_words')
+
+
+def block_digest(block):
+    """128-битный хеш абзаца (хеши хранятся для каждой страницы задания)"""
+    return hashlib.blake2b(block.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def block_violations(verdicts):
+    """Нарушения абзаца из text_verdicts ({категория: {слово: число}}) или None"""
+    _, latin, unknown, nenormative, mixed = verdicts
+    if not (latin or unknown or nenormative):
+        return None
+    return {'latin_words': dict(latin), 'unknown_cyrillic': dict(unknown),
+            'nenormative_words': dict(nenormative), 'mixed_script_words': sorted(mixed)}
+
+
+def page_blocks(digests, verdicts):
+    """Сведения об абзацах страницы: хеши по порядку и нарушения абзацев с ними"""
+    violations = {}
+    for digest, verdict in zip(digests, verdicts):
+        found = block_violations(verdict)
+        if found is not None:
+            violations[digest] = found
+    return {'digests': digests, 'violations': violations}
+
+
+class BlockCache:
+    """Потокобезопасный LRU-кэш text_verdicts абзацев по (версия, хеш)"""
+
+    def __init__(self, maxsize=BLOCK_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, version, digests):
+        """{хеш: вердикт} для найденных в кэше"""
+        found = {}
+        with self._lock:
+            for digest in digests:
+                key = (version, digest)
+                verdicts = self._data.get(key)
+                if verdicts is None:
+                    self.misses += 1
+                    continue
+                self._data.move_to_end(key)
+                found[digest] = verdicts
+                self.hits += 1
+        return found
+
+    def put_many(self, version, verdicts):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for digest, value in verdicts.items():
+                self._data[(version, digest)] = value
+                self._data.move_to_end((version, digest))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class Boilerplate:
+    """Общие абзацы страниц пакета или задания по хостам"""
+
+    def __init__(self, min_pages=BOILERPLATE_MIN_PAGES):
+        self.min_pages = max(2, min_pages)
+        # хост -> число страниц, хост -> {хеш: число страниц с абзацем}
+        self._pages = {}
+        self._counts = {}
+        # хеш -> нарушения абзаца (только абзацы с нарушениями)
+        self._violations = {}
+
+    def add(self, url, blocks):
+        """Учёт абзацев страницы (page_blocks)"""
+        host = url_host(url)
+        counts = self._counts.setdefault(host, {})
+        for digest in set(blocks['digests']):
+            counts[digest] = counts.get(digest, 0) + 1
+        self._pages[host] = self._pages.get(host, 0) + 1
+        self._violations.update(blocks['violations'])
+
+    def add_counts(self, host, pages, counts, violations):
+        """Готовые счётчики абзацев хоста (задания хранят их в SQLite)"""
+        self._pages[host] = pages
+        self._counts[host] = counts
+        self._violations.update(violations)
+
+    def shared(self, host):
+        """{хеш: число страниц} общих абзацев хоста"""
+        return {digest: pages for digest, pages in self._counts.get(host, {}).items()
+                if pages >= self.min_pages}
+
+    def strip(self, url, result, blocks):
+        """Результат страницы без нарушений из общих абзацев хоста.
+
+        Слово остаётся, если встречается и в собственном тексте страницы;
+        total_words и unique_words - по всей странице.
+        """
+        shared = self.shared(url_host(url))
+        own = [digest for digest in blocks['digests'] if digest not in shared]
+        boilerplate = len(blocks['digests']) - len(own)
+        result = dict(result, boilerplate={'blocks': boilerplate})
+        if not boilerplate:
+            result['boilerplate']['violations_count'] = 0
+            return result
+        occurrences = {key: {} for key in VIOLATION_KEYS}
+        mixed = set()
+        for digest in own:
+            found = blocks['violations'].get(digest)
+            if found is None:
+                continue
+            for key in VIOLATION_KEYS:
+                target = occurrences[key]
+                for word, count in found[key].items():
+                    target[word] = target.get(word, 0) + count
+            mixed.update(found['mixed_script_words'])
+        violations = sum(len(words) for words in occurrences.values())
+        result.update({
+            'latin_words': sorted(occurrences['latin_words']),
+            'unknown_cyrillic': sorted(occurrences['unknown_cyrillic']),
+            'nenormative_words': sorted(occurrences['nenormative_words']),
+            'latin_count': len(occurrences['latin_words']),
+            'unknown_count': len(occurrences['unknown_cyrillic']),
+            'nenormative_count': len(occurrences['nenormative_words']),
+            'violations_count': violations,
+            'law_compliant': violations == 0,
+            'mixed_script_words': sorted(mixed & set(occurrences['latin_words'])),
+            'occurrences': {key: dict(sorted(words.items())) for key, words in occurrences.items()}
+        })
+        result['boilerplate']['violations_count'] = self._shared_violations(shared, blocks['digests'])
+        return result
+
+    def _shared_violations(self, shared, digests):
+        """Число разных слов-нарушений в общих абзацах страницы"""
+        words = set()
+        for digest in set(digests):
+            found = self._violations.get(digest) if digest in shared else None
+            if found is not None:
+                for key in VIOLATION_KEYS:
+                    words.update((key, word) for word in found[key])
+        return len(words)
+
+    def report(self):
+        """Отчёт по хостам: общие абзацы и их нарушения (каждый абзац один раз)"""
+        hosts = []
+        for host in sorted(self._counts):
+            shared = self.shared(host)
+            if not shared:
+                continue
+            words = {key: {} for key in VIOLATION_KEYS}
+            for digest, pages in shared.items():
+                found = self._violations.get(digest)
+                if found is None:
+                    continue
+                for key in VIOLATION_KEYS:
+                    for word in found[key]:
+                        # На скольких страницах хоста слово пришло из общего текста
+                        words[key][word] = max(words[key].get(word, 0), pages)
+            violations = sum(len(found) for found in words.values())
+            hosts.append({
+                'host': host,
+                'pages': self._pages[host],
+                'blocks': len(shared),
+                'latin_words': sorted(words['latin_words']),
+                'unknown_cyrillic': sorted(words['unknown_cyrillic']),
+                'nenormative_words': sorted(words['nenormative_words']),
+                'violations_count': violations,
+                'law_compliant': violations == 0,
+                'pages_with_word': {key: dict(sorted(found.items())) for key, found in words.items()}
+            })
+        return hosts
+
@@ -2,477 +2,874 @@
 # -*- coding: utf-8 -*-
 """Класс проверки текста - ИСПРАВЛЕННАЯ ВЕРСИЯ"""
 
+import importlib.util
+import logging
+import os
 import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
 import sys
 
-try:
-    import pymorphy3
-    MORPH_AVAILABLE = True
-except:
-    MORPH_AVAILABLE = False
+from lexicon import (ALLOWED_MASK, DICTIONARY_FILES, NORMATIVE_MASK, SNAPSHOT_NAME,
+                     SOURCE_COMMON, SOURCE_FOREIGN, SOURCE_NENORMATIVE, TABLE_BACKENDS,
+                     Lexicon, LexiconSnapshot, LexiconView, SnapshotError, build_snapshot,
+                     make_table, read_dictionary_file, source_names, sources_digest)
+from memstats import deep_sizeof
 
-class RussianLanguageChecker:
-    def __init__(self):
-        self.normative_words = set()
-        self.foreign_allowed = set()
-        self.nenormative_words = set()
-        
-        print("\n" + "="*60)
-        print("ИНИЦИАЛИЗАЦИЯ RussianLanguageChecker")
-        print("="*60)
-        
-        # Морфология
-        if MORPH_AVAILABLE:
-            try:
-                self.morph = pymorphy3.MorphAnalyzer()
-                print("✓ pymorphy3 загружен")
-            except Exception as e:
-                self.morph = None
-                print(f"⚠️ pymorphy3 ошибка: {e}")
+# pymorphy3 импортируется лениво (load_morph) - импорт и загрузка словарей
+# заметно удлиняют старт
+MORPH_AVAILABLE = importlib.util.find_spec('pymorphy3') is not None
+
+logger = logging.getLogger(__name__)
+# Без настройки логирования в приложении чекер ничего не выводит
+logger.addHandler(logging.NullHandler())
+
+# Вердикты классификации слова
+VERDICT_NENORMATIVE = 'nenormative'
+VERDICT_LATIN = 'latin'
+VERDICT_KNOWN = 'known'
+VERDICT_UNKNOWN = 'unknown'
+
+# Письменность слова
+SCRIPT_CYRILLIC = 'cyrillic'
+SCRIPT_LATIN = 'latin'
+SCRIPT_MIXED = 'mixed'
+
+# Токенизатор: ссылки и телефоны вырезаются до поиска слов (как прежние
+# два re.sub), слова ищутся только в промежутках между ними
+URL_RE = re.compile(r'https?://[^\s]+')
+PHONE_RE = re.compile(r'\+?\d[\d\s\-\(\)]{7,}')
+WORD_RE = re.compile(r'\b[а-яёА-ЯЁa-zA-Z][а-яёА-ЯЁa-zA-Z\-]*\b')
+LATIN_RE = re.compile(r'[a-zA-Z]')
+
+# Представление словаря в памяти: compact (отсортированный блок UTF-8,
+# бинарный поиск) или dict (быстрее, но в разы больше памяти)
+LEXICON_BACKEND = os.environ.get('LEXICON_BACKEND', 'compact')
+
+# Размер кэша вердиктов (число слов)
+VERDICT_CACHE_SIZE = int(os.environ.get('VERDICT_CACHE_SIZE', 100000))
+
+# Сколько недавних слов переклассифицировать новым словарём до подмены,
+# чтобы после перезагрузки запросы не попадали в холодный кэш
+RELOAD_WARM_WORDS = int(os.environ.get('RELOAD_WARM_WORDS', 20000))
+
+# Процессы пула проверки (checkpool.py) форкаются внутри pool_fork():
+# в них не перезапускаются фоновые потоки родителя
+_fork_state = threading.local()
+
+
+@contextmanager
+def pool_fork():
+    """Контекст порождения процессов пула проверки"""
+    _fork_state.active = True
+    try:
+        yield
+    finally:
+        _fork_state.active = False
+
+
+def forked_for_pool():
+    """Текущий процесс только что порождён внутри pool_fork()"""
+    return getattr(_fork_state, 'active', False)
+
+
+# Служебные слова, которые не проверяются
+SKIP_WORDS = frozenset({'и', 'в', 'на', 'по', 'от', 'до', 'из', 'к', 'с', 'у', 'о',
+                        'но', 'да', 'не', 'за', 'об', 'во', 'а', 'я'})
+
+# Базовые слова - расширенный набор частых русских слов
+COMMON_WORDS = frozenset({
+    # Предлоги и союзы
+    'и', 'в', 'на', 'по', 'от', 'до', 'из', 'к', 'с', 'у', 'о', 'об', 'при',
+    'но', 'да', 'не', 'за', 'во', 'а', 'под', 'про', 'для', 'без', 'через',
+    'над', 'перед', 'между', 'около', 'после', 'вместо', 'вдоль', 'возле',
+    'внутри', 'вне', 'исключая', 'включая', 'согласно', 'благодаря',
+    'вопреки', 'навстречу', 'наперекор', 'несмотря', 'со', 'подо',
+    
+    # Местоимения
+    'я', 'ты', 'он', 'она', 'оно', 'мы', 'вы', 'они',
+    'меня', 'тебя', 'его', 'её', 'нас', 'вас', 'их',
+    'мне', 'тебе', 'ему', 'ей', 'нам', 'вам', 'им',
+    'мной', 'тобой', 'им', 'ей', 'нами', 'вами', 'ими',
+    'мой', 'твой', 'свой', 'наш', 'ваш', 'их',
+    'моя', 'твоя', 'своя', 'наша', 'ваша',
+    'моё', 'твоё', 'своё', 'наше', 'ваше',
+    'мои', 'твои', 'свои', 'наши', 'ваши',
+    'это', 'этот', 'эта', 'эти', 'тот', 'та', 'то', 'те',
+    'который', 'которые', 'которая', 'которое', 'которого', 'которым',
+    'весь', 'вся', 'все', 'всё', 'всем', 'всеми',
+    'себя', 'себе', 'собой', 'сам', 'сама', 'сами', 'само',
+    'кто', 'что', 'какой', 'какая', 'какие', 'чей', 'чья',
+    'никто', 'ничто', 'некого', 'нечего',
+    
+    # Частицы и наречия
+    'же', 'бы', 'ли', 'пусть', 'пускай', 'таки', 'ведь', 'даже', 'только',
+    'так', 'также', 'очень', 'более', 'менее', 'совсем', 'почти',
+    'там', 'тут', 'здесь', 'где', 'куда', 'откуда', 'везде', 'никуда',
+    'сейчас', 'тогда', 'всегда', 'никогда', 'иногда', 'часто', 'редко',
+    'быстро', 'медленно', 'хорошо', 'плохо', 'легко', 'трудно', 'просто',
+    'вместе', 'отдельно', 'особо', 'специально', 'примерно', 'точно',
+    'именно', 'особенно', 'например', 'вообще', 'вероятно', 'видимо',
+    
+    # Числительные
+    'один', 'одна', 'одно', 'два', 'две', 'три', 'четыре', 'пять',
+    'шесть', 'семь', 'восемь', 'девять', 'десять', 'ноль',
+    'первый', 'второй', 'третий', 'четвёртый', 'пятый',
+    'одиннадцать', 'двенадцать', 'двадцать', 'тридцать', 'сорок',
+    'пятьдесят', 'сто', 'тысяча', 'миллион', 'миллиард',
+    'полтора', 'оба', 'обе', 'сколько', 'столько', 'несколько',
+    
+    # Прилагательные частые
+    'большой', 'большая', 'большое', 'большие',
+    'маленький', 'маленькая', 'маленькое',
+    'хороший', 'хорошая', 'хорошее', 'хорошие',
+    'плохой', 'плохая', 'плохое',
+    'новый', 'новая', 'новое', 'новые',
+    'старый', 'старая', 'старое',
+    'молодой', 'молодая', 'молодое',
+    'красивый', 'красивая', 'красивое',
+    'высокий', 'высокая', 'высокое',
+    'низкий', 'низкая', 'низкое',
+    'длинный', 'длинная', 'длинное',
+    'короткий', 'короткая', 'короткое',
+    'широкий', 'широкая', 'широкое',
+    'узкий', 'узкая', 'узкое',
+    'тяжёлый', 'тяжёлая', 'лёгкий', 'лёгкая',
+    'сильный', 'сильная', 'слабый', 'слабая',
+    'быстрый', 'быстрая', 'медленный', 'медленная',
+    'горячий', 'горячая', 'холодный', 'холодная',
+    'весёлый', 'весёлая', 'грустный', 'грустная',
+    'умный', 'умная', 'глупый', 'глупая',
+    'смелый', 'смелая', 'трусливый',
+    'честный', 'честная', 'бесчестный',
+    'добрый', 'добрая', 'злой', 'злая',
+    'чистый', 'чистая', 'грязный', 'грязная',
+    'богатый', 'богатая', 'бедный', 'бедная',
+    'дорогой', 'дорогая', 'дешёвый', 'дешёвая',
+    'важный', 'важная', 'нужный', 'нужная',
+    'полезный', 'полезная', 'вредный', 'вредная',
+    'разный', 'разная', 'разное', 'разные',
+    'всеобщий', 'общий', 'частный', 'частная',
+    'главный', 'главная', 'основной', 'основная',
+    'простой', 'простая', 'сложный', 'сложная',
+    'ясный', 'ясная', 'понятный', 'понятная',
+    'интересный', 'интересная', 'скучный', 'скучная',
+    'приятный', 'приятная', 'неприятный',
+    'удобный', 'удобная', 'неудобный',
+    'возможный', 'возможная', 'невозможный',
+    'верный', 'верная', 'неверный', 'неверная',
+    'полный', 'полная', 'пустой', 'пустая',
+    'открытый', 'открытая', 'закрытый', 'закрытая',
+    'свободный', 'свободная', 'занятый', 'занятая',
+    'готовый', 'готовая', 'готовые',
+    'правильный', 'правильная', 'неправильный',
+    'современный', 'современная', 'старомодный',
+    'необходимый', 'необходимая', 'нужный',
+    'технический', 'техническая', 'технологический',
+    'профессиональный', 'профессиональная',
+    'практический', 'практическая', 'теоретический',
+    'реальный', 'реальная', 'нереальный', 'фактический',
+    'прекрасный', 'прекрасная', 'отличный', 'отличная',
+    'замечательный', 'замечательная', 'превосходный',
+    'серьёзный', 'серьёзная', 'весёлый', 'весёлая',
+    'спокойный', 'спокойная', 'нервный', 'нервная',
+    'активный', 'активная', 'пассивный', 'пассивная',
+    'позитивный', 'позитивная', 'негативный', 'негативная',
+    'конкретный', 'конкретная', 'абстрактный',
+    'прямой', 'прямая', 'косвенный',
+    'первичный', 'первичная', 'вторичный', 'вторичная',
+    'внутренний', 'внутренняя', 'внешний', 'внешняя',
+    'местный', 'местная', 'общий', 'местное',
+    'федеральный', 'федеральная', 'региональный',
+    'национальный', 'национальная', 'международный',
+    'социальный', 'социальная', 'экономический', 'экономическая',
+    'политический', 'политическая', 'культурный', 'культурная',
+    'исторический', 'историческая', 'географический',
+    'биологический', 'химический', 'физический',
+    'математический', 'логический', 'психологический',
+    'медицинский', 'медицинская', 'юридический', 'юридическая',
+    'коммерческий', 'коммерческая', 'финансовый', 'финансовая',
+    
+    # Глаголы частые
+    'быть', 'есть', 'являться', 'оказываться', 'становиться',
+    'иметь', 'обладать', 'владеть', 'пользоваться', 'использовать',
+    'делать', 'сделать', 'выполнять', 'выполнить', 'осуществлять',
+    'говорить', 'сказать', 'рассказывать', 'рассказать', 'объяснять',
+    'знать', 'понимать', 'узнавать', 'узнать', 'учить', 'учиться',
+    'думать', 'думать', 'считать', 'полагать', 'верить', 'надеяться',
+    'видеть', 'смотреть', 'увидеть', 'замечать', 'наблюдать',
+    'слышать', 'слушать', 'услышать',
+    'читать', 'писать', 'переписывать', 'записывать',
+    'брать', 'взять', 'давать', 'дать', 'получать', 'получить',
+    'ходить', 'идти', 'приходить', 'прийти', 'уходить', 'уйти',
+    'ездить', 'ехать', 'приезжать', 'приехать', 'уезжать', 'уехать',
+    'бежать', 'бегать', 'лететь', 'летать', 'плавать', 'плыть',
+    'стоять', 'сидеть', 'лежать', 'висеть', 'валяться',
+    'жить', 'проживать', 'существовать', 'находиться', 'располагаться',
+    'работать', 'трудиться', 'заниматься', 'устраиваться',
+    'учиться', 'учить', 'обучаться', 'преподавать',
+    'отдыхать', 'спать', 'лёг', 'легла', 'засыпать', 'просыпаться',
+    'есть', 'кушать', 'пить', 'поить', 'кормить', 'питаться',
+    'покупать', 'купить', 'продавать', 'продать', 'торговать',
+    'платить', 'заплатить', 'тратить', 'потратить', 'копить',
+    'искать', 'искал', 'искала', 'находить', 'найти',
+    'терять', 'потерять', 'теряться', 'терял', 'теряла',
+    'открывать', 'открыть', 'закрывать', 'закрыть',
+    'начинать', 'начать', 'кончать', 'кончить', 'заканчивать',
+    'продолжать', 'продолжить', 'останавливаться', 'остановиться',
+    'входить', 'войти', 'выходить', 'выйти', 'приходить', 'прийти',
+    'подходить', 'подойти', 'уходить', 'уйти', 'проходить', 'пройти',
+    'возвращаться', 'вернуться', 'приходить', 'прийти',
+    'спрашивать', 'спросить', 'отвечать', 'ответить',
+    'звонить', 'позвонить', 'звать', 'позвать', 'кричать', 'крикнуть',
+    'молчать', 'промолчать', 'говорить', 'сказать', 'повторять',
+    'понимать', 'понять', 'осознавать', 'осознать',
+    'забывать', 'забыть', 'помнить', 'вспоминать', 'вспомнить',
+    'узнавать', 'узнать', 'узнавал', 'узнавала',
+    'помогать', 'помочь', 'помог', 'помогла',
+    'мешать', 'помешать', 'мешал', 'мешала',
+    'любить', 'полюбить', 'нравиться', 'понравиться',
+    'хотеть', 'захотеть', 'хотел', 'хотела', 'желать',
+    'мочь', 'смочь', 'мог', 'могла', 'могли',
+    'должен', 'должна', 'должны', 'должно',
+    'нужно', 'нужен', 'нужна', 'нужны',
+    'можно', 'нельзя', 'надо', 'необходимо',
+    'давать', 'дать', 'дарить', 'подарить', 'отдавать', 'отдать',
+    'брать', 'взять', 'забирать', 'забрать', 'отбирать', 'отобрать',
+    'держать', 'подержать', 'держал', 'держала',
+    'ловить', 'поймать', 'ловил', 'ловила',
+    'бросать', 'бросить', 'кидать', 'кинуть',
+    'падать', 'упасть', 'валиться', 'рушиться',
+    'подниматься', 'подняться', 'поднимать', 'поднять',
+    'опускаться', 'опуститься', 'опускать', 'опустить',
+    'расти', 'вырасти', 'вырастать', 'уменьшаться', 'увеличиваться',
+    'меняться', 'измениться', 'изменяться', 'превращаться', 'стать',
+    'создавать', 'создать', 'творить', 'сотворить', 'делать', 'сделать',
+    'строить', 'построить', 'строил', 'строила',
+    'ломать', 'сломать', 'ломал', 'ломала',
+    'чинить', 'починить', 'ремонтировать', 'отремонтировать',
+    'чистить', 'почистить', 'мыть', 'помыть', 'стирать', 'постирать',
+    'готовить', 'приготовить', 'варить', 'сварить', 'жарить', 'зажарить',
+    'резать', 'порезать', 'резал', 'резала', 'крошить', 'покрошить',
+    'кусать', 'укусить', 'кусал', 'кусала',
+    'ударять', 'ударить', 'ударил', 'ударила', 'бить', 'побить',
+    'трогать', 'тронуть', 'трогал', 'трогала', 'щупать', 'пощупать',
+    'чувствовать', 'почувствовать', 'ощущать', 'почувствовал',
+    'видеть', 'увидеть', 'видал', 'видела', 'зреть', 'узреть',
+    'смотреть', 'посмотреть', 'смотрел', 'смотрела', 'глядеть', 'поглядеть',
+    'следить', 'проследить', 'следил', 'следила', 'наблюдать', 'понаблюдать',
+    'ждать', 'подождать', 'ждал', 'ждала', 'ожидать', 'предполагать',
+    'надеяться', 'понадеяться', 'надеялся', 'надеялась',
+    'бояться', 'побояться', 'боялся', 'боялась', 'страшиться',
+    'радоваться', 'обрадоваться', 'радовался', 'радовалась',
+    'грустить', 'погрустить', 'грустил', 'грустила', 'печалиться',
+    'смеяться', 'рассмеяться', 'смеялся', 'смеялась', 'хохотать',
+    'плакать', 'заплакать', 'плакал', 'плакала', 'рыдать',
+    'улыбаться', 'улыбнуться', 'улыбался', 'улыбалась', 'сиять', 'сиял',
+    'сердиться', 'рассердиться', 'сердился', 'сердилась', 'злиться', 'разозлиться',
+    'удивляться', 'удивиться', 'удивлялся', 'удивлялась', 'изумляться',
+    'волноваться', 'поволноваться', 'волновался', 'волновалась', 'беспокоиться',
+    'успокаиваться', 'успокоиться', 'успокоил', 'успокоила',
+    
+    # Существительные частые
+    'человек', 'человека', 'люди', 'людей', 'лицо', 'лица',
+    'мужчина', 'мужчины', 'женщина', 'женщины', 'мальчик', 'мальчики',
+    'девочка', 'девочки', 'ребёнок', 'ребёнка', 'дети', 'детей',
+    'сын', 'сына', 'сыновья', 'дочь', 'дочери', 'дочка', 'родители',
+    'мать', 'матери', 'мама', 'мамы', 'отец', 'отца', 'папа', 'папы',
+    'брат', 'брата', 'братья', 'сестра', 'сестры', 'бабушка', 'дедушка',
+    'семья', 'семьи', 'род', 'рода', 'родня', 'родственники',
+    'друг', 'друга', 'друзья', 'подруга', 'подруги', 'товарищ', 'знакомый',
+    'сосед', 'соседа', 'соседи', 'гость', 'гостя', 'гости',
+    'хозяин', 'хозяина', 'хозяйка', 'господин', 'госпожа',
+    'народ', 'народы', 'население', 'жители', 'граждане',
+    'товарищ', 'коллега', 'коллеги', 'начальник', 'начальника', 'шеф', 'босс',
+    'работник', 'работника', 'работники', 'сотрудник', 'сотрудники',
+    'учитель', 'учителя', 'учительница', 'преподаватель', 'профессор',
+    'врач', 'врача', 'доктор', 'медсестра', 'медбрат',
+    'инженер', 'программист', 'менеджер', 'директор', 'бухгалтер',
+    'юрист', 'адвокат', 'судья', 'полицейский', 'милиционер',
+    'продавец', 'продавца', 'кассир', 'официант', 'официантка',
+    'водитель', 'водителя', 'пилот', 'стюардесса', 'проводник',
+    'дом', 'дома', 'квартира', 'квартиры', 'комната', 'комнаты',
+    'кухня', 'кухни', 'ванная', 'туалет', 'прихожая', 'коридор',
+    'окно', 'окна', 'дверь', 'двери', 'стена', 'стены', 'потолок', 'пол',
+    'крыша', 'фундамент', 'лестница', 'балкон', 'лифт',
+    'город', 'города', 'городок', 'посёлок', 'деревня', 'село',
+    'страна', 'страны', 'государство', 'республика', 'область', 'край',
+    'улица', 'улицы', 'проспект', 'проезд', 'переулок', 'площадь',
+    'мост', 'мосты', 'туннель', 'дорога', 'дороги', 'трасса', 'шоссе',
+    'машина', 'машины', 'автомобиль', 'автомобили', 'машинка',
+    'автобус', 'троллейбус', 'трамвай', 'такси', 'метро',
+    'поезд', 'поезда', 'вагон', 'вагоны', 'платформа', 'станция',
+    'самолёт', 'самолёты', 'вертолёт', 'аэропорт', 'взлёт', 'посадка',
+    'корабль', 'корабли', 'лодка', 'лодки', 'пароход', 'катер',
+    'велосипед', 'велосипеды', 'мотоцикл', 'мопед', 'самокат',
+    'время', 'времена', 'час', 'часы', 'минута', 'минуты', 'секунда',
+    'день', 'дня', 'дни', 'неделя', 'недели', 'месяц', 'месяцы',
+    'год', 'года', 'годы', 'век', 'века', 'время', 'эпоха', 'период',
+    'утро', 'утра', 'день', 'днём', 'вечер', 'вечера', 'ночь', 'ночи',
+    'сегодня', 'вчера', 'завтра', 'послезавтра', 'неделю', 'назад',
+    'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье',
+    'январь', 'февраль', 'март', 'апрель', 'май', 'июнь',
+    'июль', 'август', 'сентябрь', 'октябрь', 'ноябрь', 'декабрь',
+    'зима', 'весна', 'лето', 'осень',
+    'вещь', 'вещи', 'предмет', 'предметы', 'объект', 'объекты',
+    'продукт', 'продукты', 'товар', 'товары', 'вещество', 'вещества',
+    'еда', 'пища', 'кухня', 'блюдо', 'блюда', 'кушанье',
+    'хлеб', 'масло', 'молоко', 'мясо', 'рыба', 'курица', 'яйцо',
+    'сыр', 'творог', 'сметана', 'йогурт', 'кефир',
+    'фрукт', 'фрукты', 'яблоко', 'яблоки', 'груша', 'груши',
+    'апельсин', 'мандарин', 'лимон', 'банан', 'виноград',
+    'овощ', 'овощи', 'картошка', 'морковь', 'лук', 'чеснок',
+    'огурец', 'помидор', 'перец', 'капуста', 'свёкла',
+    'суп', 'супы', 'борщ', 'щи', 'каша', 'каши', 'макароны',
+    'вода', 'воды', 'сок', 'соки', 'чай', 'кофе', 'какао',
+    'сахар', 'соль', 'перец', 'мука', 'рис', 'гречка',
+    'одежда', 'одежды', 'платье', 'платья', 'костюм', 'костюмы',
+    'рубашка', 'рубашки', 'брюки', 'джинсы', 'юбка', 'юбки',
+    'куртка', 'куртки', 'пальто', 'плащ', 'шуба', 'шубы',
+    'обувь', 'туфли', 'ботинки', 'сапоги', 'кроссовки', 'тапочки',
+    'шапка', 'шапки', 'шарф', 'перчатки', 'варежки',
+    'цвет', 'цвета', 'красный', 'синий', 'зелёный', 'жёлтый',
+    'белый', 'чёрный', 'серый', 'коричневый', 'оранжевый', 'фиолетовый',
+    'форма', 'формы', 'размер', 'размеры', 'вес', 'длина', 'ширина',
+    'высота', 'глубина', 'объём', 'площадь', 'масса',
+    'часть', 'части', 'доля', 'кусок', 'куски', 'половина', 'четверть',
+    'группа', 'группы', 'команда', 'команды', 'отряд', 'бригада',
+    'система', 'системы', 'сеть', 'сети', 'структура', 'структуры',
+    'процесс', 'процессы', 'этап', 'этапы', 'стадия', 'стадии',
+    'проблема', 'проблемы', 'вопрос', 'вопросы', 'задача', 'задачи',
+    'тема', 'темы', 'предмет', 'предметы', 'область', 'области', 'сфера',
+    'цель', 'цели', 'задача', 'задачи', 'план', 'планы', 'программа',
+    'результат', 'результаты', 'итог', 'итоги', 'вывод', 'выводы',
+    'причина', 'причины', 'следствие', 'следствия', 'цель', 'цели',
+    'начало', 'начала', 'конец', 'концы', 'середина', 'середины',
+    'суть', 'сути', 'содержание', 'смысл', 'значение', 'значения',
+    'идея', 'идеи', 'мысль', 'мысли', 'понятие', 'понятия',
+    'способ', 'способы', 'метод', 'методы', 'приём', 'приёмы',
+    'средство', 'средства', 'инструмент', 'инструменты', 'орудие',
+    'условие', 'условия', 'требование', 'требования', 'правило', 'правила',
+    'закон', 'законы', 'норма', 'нормы', 'принцип', 'принципы',
+    'мера', 'меры', 'степень', 'уровень', 'уровни', 'стандарт',
+    'качество', 'качества', 'свойство', 'свойства', 'признак', 'признаки',
+    'вид', 'виды', 'тип', 'типы', 'форма', 'формы', 'класс', 'классы',
+    'разряд', 'категория', 'категории', 'классификация', 'сорт',
+    'пример', 'примеры', 'образец', 'образцы', 'экземпляр', 'экземпляры',
+    'аналог', 'аналоги', 'вариант', 'варианты', 'альтернатива', 'выбор',
+    'возможность', 'возможности', 'шанс', 'шансы', 'попытка', 'попытки',
+    'успех', 'удача', 'победа', 'провал', 'неудача', 'поражение',
+    'счастье', 'радость', 'веселье', 'восторг', 'удовольствие',
+    'горе', 'печаль', 'страдание', 'тоска', 'разочарование',
+    'страх', 'ужас', 'испуг', 'тревога', 'волнение', 'беспокойство',
+    'гнев', 'ярость', 'злость', 'раздражение', 'недовольство',
+    'любовь', 'любви', 'нежность', 'привязанность', 'симпатия',
+    'ненависть', 'отвращение', 'враждебность', 'зависть', 'ревность',
+    'дружба', 'друзья', 'приятель', 'приятели', 'знакомый', 'знакомые',
+    'уважение', 'почёт', 'авторитет', 'влияние', 'власть', 'сила',
+    'слабость', 'бессилие', 'зависимость', 'подчинение', 'подчинённость',
+    'свобода', 'свободы', 'независимость', 'самостоятельность', 'автономия',
+    'ответственность', 'долг', 'обязанность', 'обязательство',
+    'честь', 'достоинство', 'совесть', 'честность', 'правдивость',
+    'добро', 'зло', 'справедливость', 'несправедливость',
+    'красота', 'уродство', 'эстетика', 'гармония', 'пропорция',
+    'истина', 'ложь', 'обман', 'ошибка', 'заблуждение', 'иллюзия',
+    'реальность', 'действительность', 'факт', 'событие', 'явление',
+    'природа', 'природы', 'мир', 'миры', 'вселенная', 'космос',
+    'земля', 'земли', 'земля', 'почва', 'грунт', 'территория',
+    'небо', 'небеса', 'солнце', 'луна', 'звезда', 'звёзды',
+    'воздух', 'атмосфера', 'ветер', 'дождь', 'снег', 'туман',
+    'огонь', 'пламя', 'вода', 'льд', 'пар', 'дым',
+    'камень', 'камни', 'песок', 'грязь', 'глина', 'пыль',
+    'дерево', 'деревья', 'лес', 'леса', 'куст', 'кусты', 'трава',
+    'цветок', 'цветы', 'растение', 'растения', 'животное', 'животные',
+    'птица', 'птицы', 'рыба', 'рыбы', 'насекомое', 'насекомые',
+    'человечество', 'общество', 'цивилизация', 'культура', 'история',
+    'язык', 'языки', 'речь', 'слово', 'слова', 'текст', 'тексты',
+    'письмо', 'письма', 'письменность', 'литература', 'искусство',
+    'музыка', 'песня', 'песни', 'танец', 'танцы', 'живопись',
+    'наука', 'науки', 'знание', 'знания', 'образование', 'учёба',
+    'техника', 'технологии', 'промышленность', 'производство',
+    'торговля', 'коммерция', 'бизнес', 'предпринимательство',
+    'экономика', 'финансы', 'деньги', 'валюта', 'банк', 'банки',
+    'рынок', 'рынки', 'магазин', 'магазины', 'фирма', 'фирмы',
+    'компания', 'компании', 'организация', 'организации', 'учреждение',
+    'государство', 'власть', 'политика', 'правительство', 'администрация',
+    'закон', 'законы', 'право', 'суд', 'судебный', 'арест', 'тюрьма',
+    'армия', 'войска', 'воин', 'воины', 'солдат', 'солдаты',
+    'война', 'войны', 'битва', 'сражение', 'мир', 'перемирие',
+    'здоровье', 'болезнь', 'болезни', 'лекарство', 'лекарства',
+    'спорт', 'спорты', 'игра', 'игры', 'матч', 'соревнование',
+    'отдых', 'каникулы', 'праздник', 'праздники', 'юбилей',
+    'подарок', 'подарки', 'сюрприз', 'сюрпризы', 'празднование',
+    
+    # Имена собственные (распространённые)
+    'андрей', 'андрея', 'александр', 'александра', 'сергей', 'сергея',
+    'дмитрий', 'дмитрия', 'николай', 'николая', 'владимир', 'владимира',
+    'иван', 'ивана', 'пётр', 'петра', 'михаил', 'михаила',
+    'алексей', 'алексея', 'максим', 'максима', 'артём', 'артёма',
+    'даниил', 'даниила', 'кирилл', 'кирилла', 'матвей', 'матвея',
+    'елена', 'елены', 'ольга', 'ольги', 'мария', 'марии',
+    'анна', 'анны', 'надежда', 'надежды', 'людмила', 'людмилы',
+    'татьяна', 'татьяны', 'светлана', 'светланы', 'ирина', 'ирины',
+    'екатерина', 'екатерины', 'виктория', 'виктории', 'алина', 'алины',
+    'москва', 'москвы', 'питер', 'петербург', 'спб',
+    'россия', 'россии', 'русь', 'руси', 'советский', 'ссср',
+    'европа', 'европы', 'азия', 'америка', 'африка', 'австралия',
+    'англия', 'франция', 'германия', 'италия', 'испания', 'польша',
+    'украина', 'белоруссия', 'казахстан', 'грузия', 'армения',
+    'китай', 'япония', 'корея', 'индия', 'турция', 'египет',
+    'сша', 'сша', 'канада', 'мексика', 'бразилия', 'аргентина',
+    
+    # Сайты и бренды
+    'авито', 'яндекс', 'гугл', 'google', 'youtube', 'ютуб',
+    'вконтакте', 'vk', 'facebook', 'фейсбук', 'instagram', 'инстаграм',
+    'twitter', 'твиттер', 'telegram', 'телеграм', 'whatsapp', 'ватсап',
+    'twitch', 'твич', 'tiktok', 'тикток', 'ozon', 'озон',
+    'wildberries', 'вайлдберриз', 'aliexpress', 'алиэкспресс',
+    'сбер', 'сбербанк', 'тинькофф', 'альфа', 'втб', 'газпром',
+    'роснефть', 'лукойл', 'мтс', 'мегафон', 'билайн', 'теле2',
+    
+    # Профессии и должности
+    'менеджер', 'менеджера', 'менеджеры', 'руководитель', 'руководители',
+    'специалист', 'специалисты', 'эксперт', 'эксперты', 'консультант',
+    'аналитик', 'разработчик', 'программист', 'тестировщик', 'дизайнер',
+    'маркетолог', 'smm', 'seo', 'копирайтер', 'редактор', 'журналист',
+    'бухгалтер', 'экономист', 'финансист', 'аудитор', 'юрист', 'адвокат',
+    'менеджер', 'продавец', 'кассир', 'оператор', 'администратор',
+    'охранник', 'водитель', 'курьер', 'уборщица', 'горничная',
+    
+    # Технические термины (русские)
+    'компьютер', 'компьютера', 'ноутбук', 'ноутбука', 'планшет', 'телефон',
+    'смартфон', 'айфон', 'iphone', 'android', 'андроид', 'windows',
+    'виндовс', 'linux', 'линукс', 'программа', 'приложение', 'приложения',
+    'сайт', 'сайты', 'сервис', 'сервисы', 'платформа', 'платформы',
+    'база', 'базы', 'данные', 'информация', 'контент', 'контенты',
+    'файл', 'файлы', 'документ', 'документы', 'папка', 'папки',
+    'пароль', 'логин', 'аккаунт', 'профиль', 'страница', 'страницы',
+    'ссылка', 'ссылки', 'кнопка', 'кнопки', 'форма', 'формы',
+    'загрузка', 'скачивание', 'установка', 'настройка', 'обновление',
+    'версия', 'версии', 'лицензия', 'лицензии', 'подписка', 'подписки',
+    'тариф', 'тарифы', 'бесплатный', 'платный', 'триал', 'демо',
+    'сервер', 'сервера', 'хостинг', 'домен', 'домены', 'ip', 'айпи',
+    'браузер', 'браузеры', 'chrome', 'король', 'firefox', 'файрфокс',
+    'edge', 'эдж', 'safari', 'сафари', 'opera', 'опера',
+    'поиск', 'поиски', 'результат', 'результаты', 'фильтр', 'фильтры',
+    'сортировка', 'сортировки', 'категория', 'категории', 'раздел',
+    
+    # Маркетинг и бизнес
+    'бизнес', 'бизнеса', 'бизнесы', 'компания', 'компании', 'фирма',
+    'стартап', 'стартапы', 'проект', 'проекты', 'заказ', 'заказы',
+    'клиент', 'клиенты', 'заказчик', 'заказчики', 'партнёр', 'партнёры',
+    'инвестор', 'инвесторы', 'спонсор', 'спонсоры', 'рекламодатель',
+    'продажа', 'продажи', 'покупка', 'покупки', 'закупка', 'закупки',
+    'предложение', 'предложения', 'спрос', 'цена', 'цены', 'стоимость',
+    'скидка', 'скидки', 'распродажа', 'акция', 'акции', 'бонус',
+    'кэшбэк', 'кэшбек', 'кешбэк', 'баллы', 'промокод', 'купон',
+    'доставка', 'доставки', 'самовывоз', 'курьер', 'курьеры',
+    'оплата', 'оплаты', 'наличные', 'карта', 'карты', 'перевод',
+    'счёт', 'счета', 'чек', 'чеки', 'накладная', 'счет-фактура',
+    'договор', 'договоры', 'соглашение', 'соглашения', 'контракт',
+    'гарантия', 'гарантии', 'возврат', 'обмен', 'отмена', 'отмены',
+    'отзыв', 'отзывы', 'рейтинг', 'рейтинги', 'оценка', 'оценки',
+    'популярный', 'популярная', 'рекомендуемый', 'хит', 'хиты',
+    'новинка', 'новинки', 'топ', 'тренд', 'тренды', 'хайп',
+    
+    # Глаголы-бизнес
+    'заказывать', 'заказать', 'покупать', 'купить', 'продавать', 'продать',
+    'приобретать', 'приобрести', 'оплачивать', 'оплатить', 'расплачиваться',
+    'регистрироваться', 'зарегистрироваться', 'оформлять', 'оформить',
+    'подписываться', 'подписаться', 'оформлять', 'оформить', 'заполнять',
+    'отправлять', 'отправить', 'получать', 'получить', 'ждать', 'дожидаться',
+    'возвращать', 'вернуть', 'обменивать', 'обменять', 'отменять', 'отменить',
+    'бронировать', 'забронировать', 'резервировать', 'зарезервировать',
+    'проверять', 'проверить', 'подтверждать', 'подтвердить', 'уточнять',
+    'звонить', 'позвонить', 'писать', 'написать', 'спрашивать', 'спросить',
+    'жаловаться', 'пожаловаться', 'благодарить', 'поблагодарить', 'рекомендовать',
+    'советовать', 'посоветовать', 'предлагать', 'предложить', 'соглашаться',
+    'отказываться', 'отказаться', 'выбирать', 'выбрать', 'сравнивать',
+    'искать', 'находить', 'найти', 'терять', 'потерять', 'хранить',
+    'сохранять', 'сохранить', 'загружать', 'загрузить', 'скачивать',
+    'обновлять', 'обновить', 'менять', 'поменять', 'настраивать',
+    'включать', 'включить', 'выключать', 'выключить', 'открывать',
+    'закрывать', 'закрыть', 'добавлять', 'добавить', 'удалять', 'удалить',
+    'создавать', 'создать', 'составлять', 'составить', 'готовить',
+    'оформлять', 'оформить', 'выполнять', 'выполнить', 'завершать',
+    'начинать', 'начать', 'продолжать', 'продолжить', 'останавливаться',
+    'работать', 'трудиться', 'заниматься', 'зарабатывать', 'заработать',
+    'тратить', 'потратить', 'экономить', 'сэкономить', 'копить', 'накопить',
+    'инвестировать', 'вкладывать', 'вложить', 'снимать', 'снять',
+    'переводить', 'перевести', 'платить', 'заплатить', 'оплачивать',
+    'возвращать', 'вернуть', 'отдавать', 'отдать', 'занимать', 'занять',
+    'давать', 'дать', 'брать', 'взять', 'одалживать', 'одолжить',
+})
+
+
+def _token_gaps(text):
+    """Части текста между ссылками и телефонами.
+
+    Ссылки заменяются пробелом, как в прежней очистке: телефон может
+    захватить этот пробел. Границы частей - границы слов, как у пробела,
+    которым прежде заменялись вырезанные фрагменты.
+    """
+    if 'http' in text:
+        text = URL_RE.sub(' ', text)
+    pos = 0
+    for match in PHONE_RE.finditer(text):
+        yield text[pos:match.start()]
+        pos = match.end()
+    yield text[pos:]
+
+
+def count_tokens(text):
+    """Токенизация: слова WORD_RE в промежутках между ссылками и телефонами.
+
+    Возвращает Counter {слово: вхождения} и словарь {слово: письменность}.
+    Результат совпадает с прежними re.sub + findall, но телефоны не
+    вырезаются копированием всего текста. Письменность определяется один
+    раз на уникальное слово.
+    """
+    word_counts = Counter(chain.from_iterable(WORD_RE.findall(gap) for gap in _token_gaps(text)))
+    scripts = {}
+    for word in word_counts:
+        if word.isascii():
+            scripts[word] = SCRIPT_LATIN
+        elif LATIN_RE.search(word):
+            scripts[word] = SCRIPT_MIXED
         else:
-            self.morph = None
-            print("⚠️ pymorphy3 недоступен")
+            scripts[word] = SCRIPT_CYRILLIC
+    return word_counts, scripts
+
+
+def load_morph():
+    """Импорт pymorphy3 и создание анализатора (None, если недоступен)"""
+    if not MORPH_AVAILABLE:
+        logger.warning("pymorphy3 недоступен")
+        return None
+    try:
+        import pymorphy3
+        morph = pymorphy3.MorphAnalyzer()
+        logger.info("pymorphy3 загружен")
+        return morph
+    except Exception as e:
+        logger.warning("pymorphy3 ошибка: %s", e)
+        return None
+
+
+def find_dictionaries_path():
+    """Поиск папки словарей"""
+    # ВАЖНО: Все возможные пути
+    possible_paths = [
+        Path('dictionaries'),                    # dictionaries/
+        Path('.') / 'dictionaries',              # ./dictionaries/
+        Path(__file__).parent / 'dictionaries',  # рядом с checker.py
+        Path.cwd() / 'dictionaries',             # текущая директория
+    ]
+    for path in possible_paths:
+        if path.exists() and path.is_dir():
+            return path
+    return None
+
+
+class VerdictCache:
+    """Потокобезопасный LRU-кэш вердиктов по словам"""
+
+    def __init__(self, maxsize=VERDICT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def reset_lock(self):
+        """Новая блокировка в дочернем процессе: старую мог держать поток родителя"""
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def recent_words(self, limit):
+        """Слова последних обращений (от самых свежих) - для прогрева кэша"""
+        with self._lock:
+            keys = list(reversed(self._data))[:limit]
+        return [key[1] for key in keys]
+
+    def retain_version(self, version):
+        """Удаление вердиктов других версий словарей"""
+        with self._lock:
+            for key in [key for key in self._data if key[0] != version]:
+                del self._data[key]
+
+    def nbytes(self):
+        """Оценка памяти кэша (ключи; вердикты - общие константы)"""
+        with self._lock:
+            return sys.getsizeof(self._data) + sum(
+                sys.getsizeof(key) + sys.getsizeof(key[1]) for key in self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class RussianLanguageChecker:
+    def __init__(self, lexicon_backend=None, defer=False):
+        """defer=True - не загружать словари сразу (см. start_background_init)"""
+        self.lexicon_backend = lexicon_backend or LEXICON_BACKEND
+        if self.lexicon_backend not in TABLE_BACKENDS:
+            raise ValueError(f"LEXICON_BACKEND: {self.lexicon_backend}, ожидается {', '.join(TABLE_BACKENDS)}")
+        # Единый словарь: слово -> флаги источников (см. lexicon.py).
+        # Неизменяемый объект, перезагрузка подменяет ссылку атомарно
+        self.lexicon = Lexicon()
+        self.snapshot = None
+        self.dictionaries_loaded_at = None
+        self.verdict_cache = VerdictCache()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._watch_interval = None
+        self.morph = None
         
-        self.add_common_words()
-        self.load_dictionaries()
+        # Готовность и замеры фаз запуска (мс)
+        self.startup_timings = {}
+        self.startup_error = None
+        self._init_done = threading.Event()
+        self._init_lock = threading.Lock()
+        self._init_thread = None
+        # fork (воркеры gunicorn, пул проверки) может застать блокировки
+        # захваченными потоками родителя - в дочернем процессе они заменяются
+        os.register_at_fork(after_in_child=self._restart_init_after_fork)
         
-        print("\n" + "="*60)
-        print("ИТОГО ЗАГРУЖЕНО:")
-        print("="*60)
-        print(f"✓ Нормативные: {len(self.normative_words):,}")
-        print(f"✓ Иностранные: {len(self.foreign_allowed):,}")
-        print(f"✓ Ненормативные: {len(self.nenormative_words):,}")
-        print("="*60 + "\n")
-    
-    def add_common_words(self):
-        """Базовые слова - расширенный набор частых русских слов"""
-        common = {
-            # Предлоги и союзы
-            'и', 'в', 'на', 'по', 'от', 'до', 'из', 'к', 'с', 'у', 'о', 'об', 'при',
-            'но', 'да', 'не', 'за', 'во', 'а', 'под', 'про', 'для', 'без', 'через',
-            'над', 'перед', 'между', 'около', 'после', 'вместо', 'вдоль', 'возле',
-            'внутри', 'вне', 'исключая', 'включая', 'согласно', 'благодаря',
-            'вопреки', 'навстречу', 'наперекор', 'несмотря', 'со', 'подо',
-            
-            # Местоимения
-            'я', 'ты', 'он', 'она', 'оно', 'мы', 'вы', 'они',
-            'меня', 'тебя', 'его', 'её', 'нас', 'вас', 'их',
-            'мне', 'тебе', 'ему', 'ей', 'нам', 'вам', 'им',
-            'мной', 'тобой', 'им', 'ей', 'нами', 'вами', 'ими',
-            'мой', 'твой', 'свой', 'наш', 'ваш', 'их',
-            'моя', 'твоя', 'своя', 'наша', 'ваша',
-            'моё', 'твоё', 'своё', 'наше', 'ваше',
-            'мои', 'твои', 'свои', 'наши', 'ваши',
-            'это', 'этот', 'эта', 'эти', 'тот', 'та', 'то', 'те',
-            'который', 'которые', 'которая', 'которое', 'которого', 'которым',
-            'весь', 'вся', 'все', 'всё', 'всем', 'всеми',
-            'себя', 'себе', 'собой', 'сам', 'сама', 'сами', 'само',
-            'кто', 'что', 'какой', 'какая', 'какие', 'чей', 'чья',
-            'никто', 'ничто', 'некого', 'нечего',
-            
-            # Частицы и наречия
-            'же', 'бы', 'ли', 'пусть', 'пускай', 'таки', 'ведь', 'даже', 'только',
-            'так', 'также', 'очень', 'более', 'менее', 'совсем', 'почти',
-            'там', 'тут', 'здесь', 'где', 'куда', 'откуда', 'везде', 'никуда',
-            'сейчас', 'тогда', 'всегда', 'никогда', 'иногда', 'часто', 'редко',
-            'быстро', 'медленно', 'хорошо', 'плохо', 'легко', 'трудно', 'просто',
-            'вместе', 'отдельно', 'особо', 'специально', 'примерно', 'точно',
-            'именно', 'особенно', 'например', 'вообще', 'вероятно', 'видимо',
-            
-            # Числительные
-            'один', 'одна', 'одно', 'два', 'две', 'три', 'четыре', 'пять',
-            'шесть', 'семь', 'восемь', 'девять', 'десять', 'ноль',
-            'первый', 'второй', 'третий', 'четвёртый', 'пятый',
-            'одиннадцать', 'двенадцать', 'двадцать', 'тридцать', 'сорок',
-            'пятьдесят', 'сто', 'тысяча', 'миллион', 'миллиард',
-            'полтора', 'оба', 'обе', 'сколько', 'столько', 'несколько',
-            
-            # Прилагательные частые
-            'большой', 'большая', 'большое', 'большие',
-            'маленький', 'маленькая', 'маленькое',
-            'хороший', 'хорошая', 'хорошее', 'хорошие',
-            'плохой', 'плохая', 'плохое',
-            'новый', 'новая', 'новое', 'новые',
-            'старый', 'старая', 'старое',
-            'молодой', 'молодая', 'молодое',
-            'красивый', 'красивая', 'красивое',
-            'высокий', 'высокая', 'высокое',
-            'низкий', 'низкая', 'низкое',
-            'длинный', 'длинная', 'длинное',
-            'короткий', 'короткая', 'короткое',
-            'широкий', 'широкая', 'широкое',
-            'узкий', 'узкая', 'узкое',
-            'тяжёлый', 'тяжёлая', 'лёгкий', 'лёгкая',
-            'сильный', 'сильная', 'слабый', 'слабая',
-            'быстрый', 'быстрая', 'медленный', 'медленная',
-            'горячий', 'горячая', 'холодный', 'холодная',
-            'весёлый', 'весёлая', 'грустный', 'грустная',
-            'умный', 'умная', 'глупый', 'глупая',
-            'смелый', 'смелая', 'трусливый',
-            'честный', 'честная', 'бесчестный',
-            'добрый', 'добрая', 'злой', 'злая',
-            'чистый', 'чистая', 'грязный', 'грязная',
-            'богатый', 'богатая', 'бедный', 'бедная',
-            'дорогой', 'дорогая', 'дешёвый', 'дешёвая',
-            'важный', 'важная', 'нужный', 'нужная',
-            'полезный', 'полезная', 'вредный', 'вредная',
-            'разный', 'разная', 'разное', 'разные',
-            'всеобщий', 'общий', 'частный', 'частная',
-            'главный', 'главная', 'основной', 'основная',
-            'простой', 'простая', 'сложный', 'сложная',
-            'ясный', 'ясная', 'понятный', 'понятная',
-            'интересный', 'интересная', 'скучный', 'скучная',
-            'приятный', 'приятная', 'неприятный',
-            'удобный', 'удобная', 'неудобный',
-            'возможный', 'возможная', 'невозможный',
-            'верный', 'верная', 'неверный', 'неверная',
-            'полный', 'полная', 'пустой', 'пустая',
-            'открытый', 'открытая', 'закрытый', 'закрытая',
-            'свободный', 'свободная', 'занятый', 'занятая',
-            'готовый', 'готовая', 'готовые',
-            'правильный', 'правильная', 'неправильный',
-            'современный', 'современная', 'старомодный',
-            'необходимый', 'необходимая', 'нужный',
-            'технический', 'техническая', 'технологический',
-            'профессиональный', 'профессиональная',
-            'практический', 'практическая', 'теоретический',
-            'реальный', 'реальная', 'нереальный', 'фактический',
-            'прекрасный', 'прекрасная', 'отличный', 'отличная',
-            'замечательный', 'замечательная', 'превосходный',
-            'серьёзный', 'серьёзная', 'весёлый', 'весёлая',
-            'спокойный', 'спокойная', 'нервный', 'нервная',
-            'активный', 'активная', 'пассивный', 'пассивная',
-            'позитивный', 'позитивная', 'негативный', 'негативная',
-            'конкретный', 'конкретная', 'абстрактный',
-            'прямой', 'прямая', 'косвенный',
-            'первичный', 'первичная', 'вторичный', 'вторичная',
-            'внутренний', 'внутренняя', 'внешний', 'внешняя',
-            'местный', 'местная', 'общий', 'местное',
-            'федеральный', 'федеральная', 'региональный',
-            'национальный', 'национальная', 'международный',
-            'социальный', 'социальная', 'экономический', 'экономическая',
-            'политический', 'политическая', 'культурный', 'культурная',
-            'исторический', 'историческая', 'географический',
-            'биологический', 'химический', 'физический',
-            'математический', 'логический', 'психологический',
-            'медицинский', 'медицинская', 'юридический', 'юридическая',
-            'коммерческий', 'коммерческая', 'финансовый', 'финансовая',
-            
-            # Глаголы частые
-            'быть', 'есть', 'являться', 'оказываться', 'становиться',
-            'иметь', 'обладать', 'владеть', 'пользоваться', 'использовать',
-            'делать', 'сделать', 'выполнять', 'выполнить', 'осуществлять',
-            'говорить', 'сказать', 'рассказывать', 'рассказать', 'объяснять',
-            'знать', 'понимать', 'узнавать', 'узнать', 'учить', 'учиться',
-            'думать', 'думать', 'считать', 'полагать', 'верить', 'надеяться',
-            'видеть', 'смотреть', 'увидеть', 'замечать', 'наблюдать',
-            'слышать', 'слушать', 'услышать',
-            'читать', 'писать', 'переписывать', 'записывать',
-            'брать', 'взять', 'давать', 'дать', 'получать', 'получить',
-            'ходить', 'идти', 'приходить', 'прийти', 'уходить', 'уйти',
-            'ездить', 'ехать', 'приезжать', 'приехать', 'уезжать', 'уехать',
-            'бежать', 'бегать', 'лететь', 'летать', 'плавать', 'плыть',
-            'стоять', 'сидеть', 'лежать', 'висеть', 'валяться',
-            'жить', 'проживать', 'существовать', 'находиться', 'располагаться',
-            'работать', 'трудиться', 'заниматься', 'устраиваться',
-            'учиться', 'учить', 'обучаться', 'преподавать',
-            'отдыхать', 'спать', 'лёг', 'легла', 'засыпать', 'просыпаться',
-            'есть', 'кушать', 'пить', 'поить', 'кормить', 'питаться',
-            'покупать', 'купить', 'продавать', 'продать', 'торговать',
-            'платить', 'заплатить', 'тратить', 'потратить', 'копить',
-            'искать', 'искал', 'искала', 'находить', 'найти',
-            'терять', 'потерять', 'теряться', 'терял', 'теряла',
-            'открывать', 'открыть', 'закрывать', 'закрыть',
-            'начинать', 'начать', 'кончать', 'кончить', 'заканчивать',
-            'продолжать', 'продолжить', 'останавливаться', 'остановиться',
-            'входить', 'войти', 'выходить', 'выйти', 'приходить', 'прийти',
-            'подходить', 'подойти', 'уходить', 'уйти', 'проходить', 'пройти',
-            'возвращаться', 'вернуться', 'приходить', 'прийти',
-            'спрашивать', 'спросить', 'отвечать', 'ответить',
-            'звонить', 'позвонить', 'звать', 'позвать', 'кричать', 'крикнуть',
-            'молчать', 'промолчать', 'говорить', 'сказать', 'повторять',
-            'понимать', 'понять', 'осознавать', 'осознать',
-            'забывать', 'забыть', 'помнить', 'вспоминать', 'вспомнить',
-            'узнавать', 'узнать', 'узнавал', 'узнавала',
-            'помогать', 'помочь', 'помог', 'помогла',
-            'мешать', 'помешать', 'мешал', 'мешала',
-            'любить', 'полюбить', 'нравиться', 'понравиться',
-            'хотеть', 'захотеть', 'хотел', 'хотела', 'желать',
-            'мочь', 'смочь', 'мог', 'могла', 'могли',
-            'должен', 'должна', 'должны', 'должно',
-            'нужно', 'нужен', 'нужна', 'нужны',
-            'можно', 'нельзя', 'надо', 'необходимо',
-            'давать', 'дать', 'дарить', 'подарить', 'отдавать', 'отдать',
-            'брать', 'взять', 'забирать', 'забрать', 'отбирать', 'отобрать',
-            'держать', 'подержать', 'держал', 'держала',
-            'ловить', 'поймать', 'ловил', 'ловила',
-            'бросать', 'бросить', 'кидать', 'кинуть',
-            'падать', 'упасть', 'валиться', 'рушиться',
-            'подниматься', 'подняться', 'поднимать', 'поднять',
-            'опускаться', 'опуститься', 'опускать', 'опустить',
-            'расти', 'вырасти', 'вырастать', 'уменьшаться', 'увеличиваться',
-            'меняться', 'измениться', 'изменяться', 'превращаться', 'стать',
-            'создавать', 'создать', 'творить', 'сотворить', 'делать', 'сделать',
-            'строить', 'построить', 'строил', 'строила',
-            'ломать', 'сломать', 'ломал', 'ломала',
-            'чинить', 'починить', 'ремонтировать', 'отремонтировать',
-            'чистить', 'почистить', 'мыть', 'помыть', 'стирать', 'постирать',
-            'готовить', 'приготовить', 'варить', 'сварить', 'жарить', 'зажарить',
-            'резать', 'порезать', 'резал', 'резала', 'крошить', 'покрошить',
-            'кусать', 'укусить', 'кусал', 'кусала',
-            'ударять', 'ударить', 'ударил', 'ударила', 'бить', 'побить',
-            'трогать', 'тронуть', 'трогал', 'трогала', 'щупать', 'пощупать',
-            'чувствовать', 'почувствовать', 'ощущать', 'почувствовал',
-            'видеть', 'увидеть', 'видал', 'видела', 'зреть', 'узреть',
-            'смотреть', 'посмотреть', 'смотрел', 'смотрела', 'глядеть', 'поглядеть',
-            'следить', 'проследить', 'следил', 'следила', 'наблюдать', 'понаблюдать',
-            'ждать', 'подождать', 'ждал', 'ждала', 'ожидать', 'предполагать',
-            'надеяться', 'понадеяться', 'надеялся', 'надеялась',
-            'бояться', 'побояться', 'боялся', 'боялась', 'страшиться',
-            'радоваться', 'обрадоваться', 'радовался', 'радовалась',
-            'грустить', 'погрустить', 'грустил', 'грустила', 'печалиться',
-            'смеяться', 'рассмеяться', 'смеялся', 'смеялась', 'хохотать',
-            'плакать', 'заплакать', 'плакал', 'плакала', 'рыдать',
-            'улыбаться', 'улыбнуться', 'улыбался', 'улыбалась', 'сиять', 'сиял',
-            'сердиться', 'рассердиться', 'сердился', 'сердилась', 'злиться', 'разозлиться',
-            'удивляться', 'удивиться', 'удивлялся', 'удивлялась', 'изумляться',
-            'волноваться', 'поволноваться', 'волновался', 'волновалась', 'беспокоиться',
-            'успокаиваться', 'успокоиться', 'успокоил', 'успокоила',
-            
-            # Существительные частые
-            'человек', 'человека', 'люди', 'людей', 'лицо', 'лица',
-            'мужчина', 'мужчины', 'женщина', 'женщины', 'мальчик', 'мальчики',
-            'девочка', 'девочки', 'ребёнок', 'ребёнка', 'дети', 'детей',
-            'сын', 'сына', 'сыновья', 'дочь', 'дочери', 'дочка', 'родители',
-            'мать', 'матери', 'мама', 'мамы', 'отец', 'отца', 'папа', 'папы',
-            'брат', 'брата', 'братья', 'сестра', 'сестры', 'бабушка', 'дедушка',
-            'семья', 'семьи', 'род', 'рода', 'родня', 'родственники',
-            'друг', 'друга', 'друзья', 'подруга', 'подруги', 'товарищ', 'знакомый',
-            'сосед', 'соседа', 'соседи', 'гость', 'гостя', 'гости',
-            'хозяин', 'хозяина', 'хозяйка', 'господин', 'госпожа',
-            'народ', 'народы', 'население', 'жители', 'граждане',
-            'товарищ', 'коллега', 'коллеги', 'начальник', 'начальника', 'шеф', 'босс',
-            'работник', 'работника', 'работники', 'сотрудник', 'сотрудники',
-            'учитель', 'учителя', 'учительница', 'преподаватель', 'профессор',
-            'врач', 'врача', 'доктор', 'медсестра', 'медбрат',
-            'инженер', 'программист', 'менеджер', 'директор', 'бухгалтер',
-            'юрист', 'адвокат', 'судья', 'полицейский', 'милиционер',
-            'продавец', 'продавца', 'кассир', 'официант', 'официантка',
-            'водитель', 'водителя', 'пилот', 'стюардесса', 'проводник',
-            'дом', 'дома', 'квартира', 'квартиры', 'комната', 'комнаты',
-            'кухня', 'кухни', 'ванная', 'туалет', 'прихожая', 'коридор',
-            'окно', 'окна', 'дверь', 'двери', 'стена', 'стены', 'потолок', 'пол',
-            'крыша', 'фундамент', 'лестница', 'балкон', 'лифт',
-            'город', 'города', 'городок', 'посёлок', 'деревня', 'село',
-            'страна', 'страны', 'государство', 'республика', 'область', 'край',
-            'улица', 'улицы', 'проспект', 'проезд', 'переулок', 'площадь',
-            'мост', 'мосты', 'туннель', 'дорога', 'дороги', 'трасса', 'шоссе',
-            'машина', 'машины', 'автомобиль', 'автомобили', 'машинка',
-            'автобус', 'троллейбус', 'трамвай', 'такси', 'метро',
-            'поезд', 'поезда', 'вагон', 'вагоны', 'платформа', 'станция',
-            'самолёт', 'самолёты', 'вертолёт', 'аэропорт', 'взлёт', 'посадка',
-            'корабль', 'корабли', 'лодка', 'лодки', 'пароход', 'катер',
-            'велосипед', 'велосипеды', 'мотоцикл', 'мопед', 'самокат',
-            'время', 'времена', 'час', 'часы', 'минута', 'минуты', 'секунда',
-            'день', 'дня', 'дни', 'неделя', 'недели', 'месяц', 'месяцы',
-            'год', 'года', 'годы', 'век', 'века', 'время', 'эпоха', 'период',
-            'утро', 'утра', 'день', 'днём', 'вечер', 'вечера', 'ночь', 'ночи',
-            'сегодня', 'вчера', 'завтра', 'послезавтра', 'неделю', 'назад',
-            'понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье',
-            'январь', 'февраль', 'март', 'апрель', 'май', 'июнь',
-            'июль', 'август', 'сентябрь', 'октябрь', 'ноябрь', 'декабрь',
-            'зима', 'весна', 'лето', 'осень',
-            'вещь', 'вещи', 'предмет', 'предметы', 'объект', 'объекты',
-            'продукт', 'продукты', 'товар', 'товары', 'вещество', 'вещества',
-            'еда', 'пища', 'кухня', 'блюдо', 'блюда', 'кушанье',
-            'хлеб', 'масло', 'молоко', 'мясо', 'рыба', 'курица', 'яйцо',
-            'сыр', 'творог', 'сметана', 'йогурт', 'кефир',
-            'фрукт', 'фрукты', 'яблоко', 'яблоки', 'груша', 'груши',
-            'апельсин', 'мандарин', 'лимон', 'банан', 'виноград',
-            'овощ', 'овощи', 'картошка', 'морковь', 'лук', 'чеснок',
-            'огурец', 'помидор', 'перец', 'капуста', 'свёкла',
-            'суп', 'супы', 'борщ', 'щи', 'каша', 'каши', 'макароны',
-            'вода', 'воды', 'сок', 'соки', 'чай', 'кофе', 'какао',
-            'сахар', 'соль', 'перец', 'мука', 'рис', 'гречка',
-            'одежда', 'одежды', 'платье', 'платья', 'костюм', 'костюмы',
-            'рубашка', 'рубашки', 'брюки', 'джинсы', 'юбка', 'юбки',
-            'куртка', 'куртки', 'пальто', 'плащ', 'шуба', 'шубы',
-            'обувь', 'туфли', 'ботинки', 'сапоги', 'кроссовки', 'тапочки',
-            'шапка', 'шапки', 'шарф', 'перчатки', 'варежки',
-            'цвет', 'цвета', 'красный', 'синий', 'зелёный', 'жёлтый',
-            'белый', 'чёрный', 'серый', 'коричневый', 'оранжевый', 'фиолетовый',
-            'форма', 'формы', 'размер', 'размеры', 'вес', 'длина', 'ширина',
-            'высота', 'глубина', 'объём', 'площадь', 'масса',
-            'часть', 'части', 'доля', 'кусок', 'куски', 'половина', 'четверть',
-            'группа', 'группы', 'команда', 'команды', 'отряд', 'бригада',
-            'система', 'системы', 'сеть', 'сети', 'структура', 'структуры',
-            'процесс', 'процессы', 'этап', 'этапы', 'стадия', 'стадии',
-            'проблема', 'проблемы', 'вопрос', 'вопросы', 'задача', 'задачи',
-            'тема', 'темы', 'предмет', 'предметы', 'область', 'области', 'сфера',
-            'цель', 'цели', 'задача', 'задачи', 'план', 'планы', 'программа',
-            'результат', 'результаты', 'итог', 'итоги', 'вывод', 'выводы',
-            'причина', 'причины', 'следствие', 'следствия', 'цель', 'цели',
-            'начало', 'начала', 'конец', 'концы', 'середина', 'середины',
-            'суть', 'сути', 'содержание', 'смысл', 'значение', 'значения',
-            'идея', 'идеи', 'мысль', 'мысли', 'понятие', 'понятия',
-            'способ', 'способы', 'метод', 'методы', 'приём', 'приёмы',
-            'средство', 'средства', 'инструмент', 'инструменты', 'орудие',
-            'условие', 'условия', 'требование', 'требования', 'правило', 'правила',
-            'закон', 'законы', 'норма', 'нормы', 'принцип', 'принципы',
-            'мера', 'меры', 'степень', 'уровень', 'уровни', 'стандарт',
-            'качество', 'качества', 'свойство', 'свойства', 'признак', 'признаки',
-            'вид', 'виды', 'тип', 'типы', 'форма', 'формы', 'класс', 'классы',
-            'разряд', 'категория', 'категории', 'классификация', 'сорт',
-            'пример', 'примеры', 'образец', 'образцы', 'экземпляр', 'экземпляры',
-            'аналог', 'аналоги', 'вариант', 'варианты', 'альтернатива', 'выбор',
-            'возможность', 'возможности', 'шанс', 'шансы', 'попытка', 'попытки',
-            'успех', 'удача', 'победа', 'провал', 'неудача', 'поражение',
-            'счастье', 'радость', 'веселье', 'восторг', 'удовольствие',
-            'горе', 'печаль', 'страдание', 'тоска', 'разочарование',
-            'страх', 'ужас', 'испуг', 'тревога', 'волнение', 'беспокойство',
-            'гнев', 'ярость', 'злость', 'раздражение', 'недовольство',
-            'любовь', 'любви', 'нежность', 'привязанность', 'симпатия',
-            'ненависть', 'отвращение', 'враждебность', 'зависть', 'ревность',
-            'дружба', 'друзья', 'приятель', 'приятели', 'знакомый', 'знакомые',
-            'уважение', 'почёт', 'авторитет', 'влияние', 'власть', 'сила',
-            'слабость', 'бессилие', 'зависимость', 'подчинение', 'подчинённость',
-            'свобода', 'свободы', 'независимость', 'самостоятельность', 'автономия',
-            'ответственность', 'долг', 'обязанность', 'обязательство',
-            'честь', 'достоинство', 'совесть', 'честность', 'правдивость',
-            'добро', 'зло', 'справедливость', 'несправедливость',
-            'красота', 'уродство', 'эстетика', 'гармония', 'пропорция',
-            'истина', 'ложь', 'обман', 'ошибка', 'заблуждение', 'иллюзия',
-            'реальность', 'действительность', 'факт', 'событие', 'явление',
-            'природа', 'природы', 'мир', 'миры', 'вселенная', 'космос',
-            'земля', 'земли', 'земля', 'почва', 'грунт', 'территория',
-            'небо', 'небеса', 'солнце', 'луна', 'звезда', 'звёзды',
-            'воздух', 'атмосфера', 'ветер', 'дождь', 'снег', 'туман',
-            'огонь', 'пламя', 'вода', 'льд', 'пар', 'дым',
-            'камень', 'камни', 'песок', 'грязь', 'глина', 'пыль',
-            'дерево', 'деревья', 'лес', 'леса', 'куст', 'кусты', 'трава',
-            'цветок', 'цветы', 'растение', 'растения', 'животное', 'животные',
-            'птица', 'птицы', 'рыба', 'рыбы', 'насекомое', 'насекомые',
-            'человечество', 'общество', 'цивилизация', 'культура', 'история',
-            'язык', 'языки', 'речь', 'слово', 'слова', 'текст', 'тексты',
-            'письмо', 'письма', 'письменность', 'литература', 'искусство',
-            'музыка', 'песня', 'песни', 'танец', 'танцы', 'живопись',
-            'наука', 'науки', 'знание', 'знания', 'образование', 'учёба',
-            'техника', 'технологии', 'промышленность', 'производство',
-            'торговля', 'коммерция', 'бизнес', 'предпринимательство',
-            'экономика', 'финансы', 'деньги', 'валюта', 'банк', 'банки',
-            'рынок', 'рынки', 'магазин', 'магазины', 'фирма', 'фирмы',
-            'компания', 'компании', 'организация', 'организации', 'учреждение',
-            'государство', 'власть', 'политика', 'правительство', 'администрация',
-            'закон', 'законы', 'право', 'суд', 'судебный', 'арест', 'тюрьма',
-            'армия', 'войска', 'воин', 'воины', 'солдат', 'солдаты',
-            'война', 'войны', 'битва', 'сражение', 'мир', 'перемирие',
-            'здоровье', 'болезнь', 'болезни', 'лекарство', 'лекарства',
-            'спорт', 'спорты', 'игра', 'игры', 'матч', 'соревнование',
-            'отдых', 'каникулы', 'праздник', 'праздники', 'юбилей',
-            'подарок', 'подарки', 'сюрприз', 'сюрпризы', 'празднование',
-            
-            # Имена собственные (распространённые)
-            'андрей', 'андрея', 'александр', 'александра', 'сергей', 'сергея',
-            'дмитрий', 'дмитрия', 'николай', 'николая', 'владимир', 'владимира',
-            'иван', 'ивана', 'пётр', 'петра', 'михаил', 'михаила',
-            'алексей', 'алексея', 'максим', 'максима', 'артём', 'артёма',
-            'даниил', 'даниила', 'кирилл', 'кирилла', 'матвей', 'матвея',
-            'елена', 'елены', 'ольга', 'ольги', 'мария', 'марии',
-            'анна', 'анны', 'надежда', 'надежды', 'людмила', 'людмилы',
-            'татьяна', 'татьяны', 'светлана', 'светланы', 'ирина', 'ирины',
-            'екатерина', 'екатерины', 'виктория', 'виктории', 'алина', 'алины',
-            'москва', 'москвы', 'питер', 'петербург', 'спб',
-            'россия', 'россии', 'русь', 'руси', 'советский', 'ссср',
-            'европа', 'европы', 'азия', 'америка', 'африка', 'австралия',
-            'англия', 'франция', 'германия', 'италия', 'испания', 'польша',
-            'украина', 'белоруссия', 'казахстан', 'грузия', 'армения',
-            'китай', 'япония', 'корея', 'индия', 'турция', 'египет',
-            'сша', 'сша', 'канада', 'мексика', 'бразилия', 'аргентина',
-            
-            # Сайты и бренды
-            'авито', 'яндекс', 'гугл', 'google', 'youtube', 'ютуб',
-            'вконтакте', 'vk', 'facebook', 'фейсбук', 'instagram', 'инстаграм',
-            'twitter', 'твиттер', 'telegram', 'телеграм', 'whatsapp', 'ватсап',
-            'twitch', 'твич', 'tiktok', 'тикток', 'ozon', 'озон',
-            'wildberries', 'вайлдберриз', 'aliexpress', 'алиэкспресс',
-            'сбер', 'сбербанк', 'тинькофф', 'альфа', 'втб', 'газпром',
-            'роснефть', 'лукойл', 'мтс', 'мегафон', 'билайн', 'теле2',
-            
-            # Профессии и должности
-            'менеджер', 'менеджера', 'менеджеры', 'руководитель', 'руководители',
-            'специалист', 'специалисты', 'эксперт', 'эксперты', 'консультант',
-            'аналитик', 'разработчик', 'программист', 'тестировщик', 'дизайнер',
-            'маркетолог', 'smm', 'seo', 'копирайтер', 'редактор', 'журналист',
-            'бухгалтер', 'экономист', 'финансист', 'аудитор', 'юрист', 'адвокат',
-            'менеджер', 'продавец', 'кассир', 'оператор', 'администратор',
-            'охранник', 'водитель', 'курьер', 'уборщица', 'горничная',
-            
-            # Технические термины (русские)
-            'компьютер', 'компьютера', 'ноутбук', 'ноутбука', 'планшет', 'телефон',
-            'смартфон', 'айфон', 'iphone', 'android', 'андроид', 'windows',
-            'виндовс', 'linux', 'линукс', 'программа', 'приложение', 'приложения',
-            'сайт', 'сайты', 'сервис', 'сервисы', 'платформа', 'платформы',
-            'база', 'базы', 'данные', 'информация', 'контент', 'контенты',
-            'файл', 'файлы', 'документ', 'документы', 'папка', 'папки',
-            'пароль', 'логин', 'аккаунт', 'профиль', 'страница', 'страницы',
-            'ссылка', 'ссылки', 'кнопка', 'кнопки', 'форма', 'формы',
-            'загрузка', 'скачивание', 'установка', 'настройка', 'обновление',
-            'версия', 'версии', 'лицензия', 'лицензии', 'подписка', 'подписки',
-            'тариф', 'тарифы', 'бесплатный', 'платный', 'триал', 'демо',
-            'сервер', 'сервера', 'хостинг', 'домен', 'домены', 'ip', 'айпи',
-            'браузер', 'браузеры', 'chrome', 'король', 'firefox', 'файрфокс',
-            'edge', 'эдж', 'safari', 'сафари', 'opera', 'опера',
-            'поиск', 'поиски', 'результат', 'результаты', 'фильтр', 'фильтры',
-            'сортировка', 'сортировки', 'категория', 'категории', 'раздел',
+        if not defer:
+            self.initialize()
+
+    def initialize(self):
+        """Загрузка морфологии и словарей с замером времени каждой фазы"""
+        with self._init_lock:
+            if self._init_done.is_set():
+                return
+            started = time.perf_counter()
+            logger.info("Инициализация RussianLanguageChecker")
             
-            # Маркетинг и бизнес
-            'бизнес', 'бизнеса', 'бизнесы', 'компания', 'компании', 'фирма',
-            'стартап', 'стартапы', 'проект', 'проекты', 'заказ', 'заказы',
-            'клиент', 'клиенты', 'заказчик', 'заказчики', 'партнёр', 'партнёры',
-            'инвестор', 'инвесторы', 'спонсор', 'спонсоры', 'рекламодатель',
-            'продажа', 'продажи', 'покупка', 'покупки', 'закупка', 'закупки',
-            'предложение', 'предложения', 'спрос', 'цена', 'цены', 'стоимость',
-            'скидка', 'скидки', 'распродажа', 'акция', 'акции', 'бонус',
-            'кэшбэк', 'кэшбек', 'кешбэк', 'баллы', 'промокод', 'купон',
-            'доставка', 'доставки', 'самовывоз', 'курьер', 'курьеры',
-            'оплата', 'оплаты', 'наличные', 'карта', 'карты', 'перевод',
-            'счёт', 'счета', 'чек', 'чеки', 'накладная', 'счет-фактура',
-            'договор', 'договоры', 'соглашение', 'соглашения', 'контракт',
-            'гарантия', 'гарантии', 'возврат', 'обмен', 'отмена', 'отмены',
-            'отзыв', 'отзывы', 'рейтинг', 'рейтинги', 'оценка', 'оценки',
-            'популярный', 'популярная', 'рекомендуемый', 'хит', 'хиты',
-            'новинка', 'новинки', 'топ', 'тренд', 'тренды', 'хайп',
+            with self._startup_phase('morph'):
+                self.morph = load_morph()
+            with self._startup_phase('dictionaries'):
+                lexicon = self.load_dictionaries()
+            with self._startup_phase('common_words'):
+                self.add_common_words(lexicon)
+            self._swap_lexicon(lexicon)
             
-            # Глаголы-бизнес
-            'заказывать', 'заказать', 'покупать', 'купить', 'продавать', 'продать',
-            'приобретать', 'приобрести', 'оплачивать', 'оплатить', 'расплачиваться',
-            'регистрироваться', 'зарегистрироваться', 'оформлять', 'оформить',
-            'подписываться', 'подписаться', 'оформлять', 'оформить', 'заполнять',
-            'отправлять', 'отправить', 'получать', 'получить', 'ждать', 'дожидаться',
-            'возвращать', 'вернуть', 'обменивать', 'обменять', 'отменять', 'отменить',
-            'бронировать', 'забронировать', 'резервировать', 'зарезервировать',
-            'проверять', 'проверить', 'подтверждать', 'подтвердить', 'уточнять',
-            'звонить', 'позвонить', 'писать', 'написать', 'спрашивать', 'спросить',
-            'жаловаться', 'пожаловаться', 'благодарить', 'поблагодарить', 'рекомендовать',
-            'советовать', 'посоветовать', 'предлагать', 'предложить', 'соглашаться',
-            'отказываться', 'отказаться', 'выбирать', 'выбрать', 'сравнивать',
-            'искать', 'находить', 'найти', 'терять', 'потерять', 'хранить',
-            'сохранять', 'сохранить', 'загружать', 'загрузить', 'скачивать',
-            'обновлять', 'обновить', 'менять', 'поменять', 'настраивать',
-            'включать', 'включить', 'выключать', 'выключить', 'открывать',
-            'закрывать', 'закрыть', 'добавлять', 'добавить', 'удалять', 'удалить',
-            'создавать', 'создать', 'составлять', 'составить', 'готовить',
-            'оформлять', 'оформить', 'выполнять', 'выполнить', 'завершать',
-            'начинать', 'начать', 'продолжать', 'продолжить', 'останавливаться',
-            'работать', 'трудиться', 'заниматься', 'зарабатывать', 'заработать',
-            'тратить', 'потратить', 'экономить', 'сэкономить', 'копить', 'накопить',
-            'инвестировать', 'вкладывать', 'вложить', 'снимать', 'снять',
-            'переводить', 'перевести', 'платить', 'заплатить', 'оплачивать',
-            'возвращать', 'вернуть', 'отдавать', 'отдать', 'занимать', 'занять',
-            'давать', 'дать', 'брать', 'взять', 'одалживать', 'одолжить',
-        }
-        self.normative_words.update(common)
+            self.startup_timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info("Загружено: нормативные %s, иностранные %s, ненормативные %s",
+                        f"{len(self.normative_words):,}", f"{len(self.foreign_allowed):,}",
+                        f"{len(self.nenormative_words):,}")
+            logger.info("Фазы запуска, мс: %s", self.startup_timings)
+            self._init_done.set()
+
+    @contextmanager
+    def _startup_phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def start_background_init(self):
+        """Инициализация в фоновом потоке; готовность - свойство ready"""
+        if self._init_done.is_set() or (self._init_thread and self._init_thread.is_alive()):
+            return
+        # Поток не переживает fork: в дочернем процессе запускается заново
+        self._init_thread = threading.Thread(target=self._background_init,
+                                             name='checker-init', daemon=True)
+        self._init_thread.start()
+
+    def _background_init(self):
+        try:
+            self.initialize()
+        except Exception as e:
+            self.startup_error = str(e)
+            logger.exception("Ошибка инициализации чекера")
+            self._init_done.set()
+
+    def _restart_init_after_fork(self):
+        # Блокировки и события, которые в момент fork могли держать потоки
+        # родителя (загрузка, перезагрузка словарей, проверки); блокировки
+        # logging стандартная библиотека заменяет сама
+        self._init_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.verdict_cache.reset_lock()
+        done = self._init_done.is_set()
+        self._init_done = threading.Event()
+        if done:
+            self._init_done.set()
+        background_init = self._init_thread is not None
+        self._init_thread = None
+        self._watcher = None
+        if forked_for_pool():
+            # Процесс пула только проверяет тексты словарём родителя
+            self._watch_interval = None
+            return
+        if background_init and not done:
+            self.start_background_init()
+        if self._watch_interval:
+            self.start_watcher(self._watch_interval)
+
+    @property
+    def ready(self):
+        """Словари и морфология загружены"""
+        return self._init_done.is_set() and self.startup_error is None
+
+    def wait_ready(self, timeout=None):
+        """Ожидание окончания инициализации"""
+        if not self._init_done.wait(timeout):
+            raise TimeoutError("Чекер ещё загружается")
+        if self.startup_error:
+            raise RuntimeError(f"Чекер не инициализирован: {self.startup_error}")
+    
+    @property
+    def dict_version(self):
+        """Версия подключённых словарей"""
+        return self.lexicon.version
+
+    @property
+    def forms_expanded(self):
+        """Словоформы развёрнуты в снапшоте - словарные слова без pymorphy3"""
+        return self.lexicon.forms_expanded
+
+    def _swap_lexicon(self, lexicon):
+        """Атомарная подмена словаря: текущие запросы доживают на старом"""
+        self.lexicon = lexicon
+        self.snapshot = getattr(lexicon, 'snapshot', None)
+        self.dictionaries_loaded_at = time.time()
+        # Ключи старой версии уже не совпадут - просто освобождаем память
+        self.verdict_cache.retain_version(lexicon.version)
+
+    def _warm_verdicts(self, lexicon):
+        """Вердикты недавних слов по новому словарю - до подмены, вне запросов"""
+        if lexicon.version == self.lexicon.version:
+            return 0
+        words = self.verdict_cache.recent_words(RELOAD_WARM_WORDS)
+        for word in words:
+            self.verdict_cache.put((lexicon.version, word), self._classify(word, None, lexicon)[0])
+        return len(words)
+
+    def reload_dictionaries(self):
+        """Пересборка словаря вне пути запросов и атомарная подмена.
+
+        Новый Lexicon собирается полностью (снапшот или текстовые файлы
+        плюс базовые слова), кэш вердиктов прогревается под новую версию,
+        и только затем ссылка подменяется. Проверки, начатые раньше,
+        заканчиваются на старом словаре.
+        """
+        self.wait_ready()
+        with self._reload_lock:
+            started = time.perf_counter()
+            previous = self.lexicon.version
+            lexicon = self.load_dictionaries()
+            self.add_common_words(lexicon)
+            warmed = self._warm_verdicts(lexicon)
+            self._swap_lexicon(lexicon)
+            result = {
+                'previous_version': previous,
+                'version': lexicon.version,
+                'changed': previous != lexicon.version,
+                'warmed_words': warmed,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+        logger.info("Словари перезагружены: %s", result)
+        return result
+
+    def _dictionary_mtimes(self):
+        dict_path = find_dictionaries_path()
+        if not dict_path:
+            return {}
+        mtimes = {}
+        for filename in list(DICTIONARY_FILES) + [SNAPSHOT_NAME]:
+            try:
+                mtimes[filename] = (dict_path / filename).stat().st_mtime_ns
+            except OSError:
+                mtimes[filename] = None
+        return mtimes
+
+    def start_watcher(self, interval):
+        """Фоновая проверка mtime словарей раз в interval секунд и перезагрузка"""
+        self._watch_interval = interval
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name='dictionary-watcher', daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        seen = self._dictionary_mtimes()
+        while True:
+            time.sleep(interval)
+            current = self._dictionary_mtimes()
+            if current == seen or not self._init_done.is_set():
+                continue
+            seen = current
+            try:
+                self.reload_dictionaries()
+            except Exception:
+                logger.exception("Ошибка перезагрузки словарей")
+
+    @property
+    def normative_words(self):
+        """Нормативные слова (орфографический, орфоэпический, базовый словари)"""
+        return LexiconView(self.lexicon, NORMATIVE_MASK, SOURCE_COMMON)
+
+    @property
+    def foreign_allowed(self):
+        """Разрешённые иностранные слова"""
+        return LexiconView(self.lexicon, SOURCE_FOREIGN, SOURCE_FOREIGN)
+
+    @property
+    def nenormative_words(self):
+        """Ненормативная лексика"""
+        return LexiconView(self.lexicon, SOURCE_NENORMATIVE, SOURCE_NENORMATIVE)
+
+    def add_common_words(self, lexicon):
+        """Базовые слова - расширенный набор частых русских слов"""
+        common = COMMON_WORDS
+        if lexicon.forms_expanded:
+            # Все словоформы уже в снапшоте (build-index с pymorphy3)
+            logger.info("Базовый словарь: %s слов (словоформы в снапшоте)", len(common))
+            return
+        
+        lexicon.update(common, SOURCE_COMMON)
         
         # Добавляем словоформы через pymorphy3
         if self.morph:
@@ -483,212 +880,387 @@ class RussianLanguageChecker:
                     if parsed:
                         for p in parsed:
                             # Добавляем все формы слова
-                            self.normative_words.add(p.word.lower())
+                            lexicon.add(p.word.lower(), SOURCE_COMMON)
                             forms_added += 1
                 except:
                     pass
-            print(f"✓ Базовый словарь: {len(common)} слов + {forms_added} словоформ")
+            logger.info("Базовый словарь: %s слов + %s словоформ", len(common), forms_added)
         else:
-            print(f"✓ Базовый словарь: {len(common)} слов")
+            logger.info("Базовый словарь: %s слов", len(common))
     
     def load_dictionaries(self):
-        """Загрузка словарей"""
-        # ВАЖНО: Все возможные пути
-        possible_paths = [
-            Path('dictionaries'),                    # dictionaries/
-            Path('.') / 'dictionaries',              # ./dictionaries/
-            Path(__file__).parent / 'dictionaries',  # рядом с checker.py
-            Path.cwd() / 'dictionaries',             # текущая директория
-        ]
-        
-        dict_path = None
-        for path in possible_paths:
-            if path.exists() and path.is_dir():
-                dict_path = path
-                print(f"✓ Найдена папка словарей: {path.absolute()}")
-                break
+        """Новый Lexicon: из снапшота через mmap, иначе из текстовых файлов.
+
+        Текущий словарь чекера не трогается - подключение через _swap_lexicon.
+        """
+        dict_path = find_dictionaries_path()
         
         if not dict_path:
-            print("⚠️ ПАПКА dictionaries НЕ НАЙДЕНА!")
-            print("   Проверьте, что папка dictionaries/ существует")
-            print("   Текущая директория:", Path.cwd())
-            return
+            logger.error("Папка dictionaries не найдена (текущая директория: %s)", Path.cwd())
+            return Lexicon()
+        logger.info("Найдена папка словарей: %s", dict_path.absolute())
         
-        # Загружаем файлы
-        files_to_load = {
-            'orfograf_words.txt': 'normative_words',
-            'orfoep_words.txt': 'normative_words',
-            'foreign_words.txt': 'foreign_allowed',
-            'Nenormativnye_slova.txt': 'nenormative_words'
-        }
+        lexicon = self.load_snapshot(dict_path)
+        if lexicon is not None:
+            return lexicon
         
+        entries = {}
         loaded = 0
-        for filename, target_attr in files_to_load.items():
+        for filename, source in DICTIONARY_FILES.items():
             filepath = dict_path / filename
             
             if not filepath.exists():
-                print(f"⚠️ Файл не найден: {filename}")
+                logger.warning("Файл не найден: %s", filename)
                 continue
             
             try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    words = set()
-                    line_count = 0
-                    for line in f:
-                        line_count += 1
-                        word = line.strip().lower()
-                        if word and not word.startswith('#') and len(word) > 1:
-                            words.add(word)
-                    
-                    if words:
-                        getattr(self, target_attr).update(words)
-                        print(f"✓ {filename}: {len(words):,} слов (строк: {line_count})")
-                        loaded += 1
-                    else:
-                        print(f"⚠️ {filename}: файл пуст")
+                words, line_count = read_dictionary_file(filepath)
+                if words:
+                    for word in words:
+                        entries[word] = entries.get(word, 0) | source
+                    logger.info("%s: %s слов (строк: %s)", filename, f"{len(words):,}", line_count)
+                    loaded += 1
+                else:
+                    logger.warning("%s: файл пуст", filename)
             
             except Exception as e:
-                print(f"❌ Ошибка загрузки {filename}: {e}")
+                logger.error("Ошибка загрузки %s: %s", filename, e)
         
-        print(f"\nЗагружено файлов: {loaded}/{len(files_to_load)}")
+        logger.info("Загружено файлов: %s/%s", loaded, len(DICTIONARY_FILES))
+        version = sources_digest(dict_path, COMMON_WORDS).hex()[:12]
+        return Lexicon(make_table(entries, self.lexicon_backend), version=version)
     
+    def load_snapshot(self, dict_path):
+        """Lexicon из бинарного снапшота (python checker.py build-index) или None"""
+        try:
+            snapshot = LexiconSnapshot.open(dict_path / SNAPSHOT_NAME, dict_path=dict_path,
+                                            common_words=COMMON_WORDS)
+        except SnapshotError as e:
+            logger.info("Снапшот не используется: %s", e)
+            return None
+        except Exception as e:
+            logger.error("Ошибка чтения снапшота: %s", e)
+            return None
+        
+        if self.lexicon_backend == 'compact':
+            table = snapshot.table
+        else:
+            table = make_table(snapshot.table.items(), self.lexicon_backend)
+        # Развёрнутый снапшот даёт другие вердикты без pymorphy3 - своя версия
+        version = snapshot.version + ('x' if snapshot.forms_expanded else '')
+        lexicon = Lexicon(table, version=version, forms_expanded=snapshot.forms_expanded)
+        lexicon.snapshot = snapshot
+        expanded = ", словоформы развёрнуты" if snapshot.forms_expanded else ""
+        logger.info("Снапшот %s (mmap, версия %s%s)", snapshot.path.name, snapshot.version, expanded)
+        return lexicon
+    
+    def memory_usage(self):
+        """Оценка памяти структур чекера в байтах"""
+        lexicon = self.lexicon
+        table = lexicon.table
+        morph_bytes = None
+        if self.morph is not None:
+            try:
+                # Словари pymorphy3 загружаются в память целиком
+                morph_path = Path(self.morph.dictionary.path)
+                morph_bytes = sum(f.stat().st_size for f in morph_path.iterdir() if f.is_file())
+            except Exception:
+                pass
+        return {
+            'lexicon': {
+                'backend': self.lexicon_backend,
+                'entries': len(table) if table is not None else 0,
+                'bytes': table.nbytes if table is not None else 0,
+                'mmap': bool(table is not None and table.mapped),
+                'extra_entries': len(lexicon.extra),
+                'extra_bytes': deep_sizeof(lexicon.extra)
+            },
+            'verdict_cache': {
+                'entries': self.verdict_cache.stats()['size'],
+                'bytes': self.verdict_cache.nbytes()
+            },
+            'pymorphy3': {
+                'bytes': morph_bytes
+            }
+        }
+
+    def _parse_best(self, word_lower):
+        """Лучший разбор pymorphy3 или None"""
+        if self.morph:
+            try:
+                parsed = self.morph.parse(word_lower)
+                if parsed:
+                    return parsed[0]
+            except:
+                pass
+        return None
+
     def is_known_word(self, word):
         """Проверка известности слова с максимально мягкой логикой"""
+        lexicon = self.lexicon
         word_lower = word.lower()
-        
-        # Проверяем в словарях
-        if word_lower in self.normative_words or word_lower in self.foreign_allowed:
+        flags = lexicon.get(word_lower)
+        if flags & ALLOWED_MASK:
             return True
+        return self._known_reason(word, word_lower, flags, self._parse_best(word_lower), lexicon) is not None
+
+    def _known_reason(self, word, word_lower, flags, best_parse, lexicon):
+        """Почему слово считается известным (None - неизвестно)"""
+        # Проверяем в словарях
+        if flags & ALLOWED_MASK:
+            return 'dictionary'
         
         # Проверяем через pymorphy3 - максимально мягкие условия
-        if self.morph:
+        if best_parse is not None:
             try:
-                parsed = self.morph.parse(word_lower)
-                if parsed:
-                    # Берём лучший разбор
-                    best_parse = parsed[0]
-                    # Если есть хоть какой-то разбор с ненулевой вероятностью
-                    # или любой tag (часть речи или имя собственное)
-                    if best_parse.score >= 0 or best_parse.tag:
-                        # Если распознано как имя собственное - тоже нормально
-                        if 'Name' in best_parse.tag or 'Surn' in best_parse.tag or 'Patr' in best_parse.tag:
-                            return True
-                        # Если распознано как географическое название
-                        if 'Geox' in best_parse.tag:
-                            return True
-                        # Если распознано как организация
-                        if 'Orgn' in best_parse.tag:
-                            return True
-                        # Если есть любая часть речи
-                        if best_parse.tag.POS:
-                            return True
-                        # Если нормальная форма есть в словаре
-                        normal_form = best_parse.normal_form
-                        if normal_form in self.normative_words:
-                            return True
+                # Если есть хоть какой-то разбор с ненулевой вероятностью
+                # или любой tag (часть речи или имя собственное)
+                if best_parse.score >= 0 or best_parse.tag:
+                    # Если распознано как имя собственное - тоже нормально
+                    if 'Name' in best_parse.tag or 'Surn' in best_parse.tag or 'Patr' in best_parse.tag:
+                        return 'morph_name'
+                    # Если распознано как географическое название
+                    if 'Geox' in best_parse.tag:
+                        return 'morph_geo'
+                    # Если распознано как организация
+                    if 'Orgn' in best_parse.tag:
+                        return 'morph_org'
+                    # Если есть любая часть речи
+                    if best_parse.tag.POS:
+                        return 'morph_pos'
+                    # Если нормальная форма есть в словаре
+                    if lexicon.get(best_parse.normal_form) & NORMATIVE_MASK:
+                        return 'morph_normal_form'
             except:
                 pass
         
         # Аббревиатуры (все заглавные, до 10 символов)
         if word.isupper() and len(word) <= 10:
-            return True
+            return 'abbreviation'
             
         # Слова с заглавной буквы (вероятно, имена собственные)
         if word[0].isupper() and len(word) > 1:
             # Если похоже на имя или название
-            return True
+            return 'capitalized'
         
         # Слова с дефисом (составные)
         if '-' in word:
             parts = word_lower.split('-')
-            # Если хотя бы одна часть известна
+            # Если хотя бы одна часть известна - одна проверка на часть
             for part in parts:
-                if len(part) > 1 and (part in self.normative_words or part in self.foreign_allowed):
-                    return True
+                if len(part) > 1 and lexicon.get(part) & ALLOWED_MASK:
+                    return 'compound'
         
-        return False
+        return None
     
     def is_nenormative(self, word):
         """Проверка ненормативности"""
+        lexicon = self.lexicon
         word_lower = word.lower()
-        
-        if word_lower in self.nenormative_words:
+        flags = lexicon.get(word_lower)
+        if flags & SOURCE_NENORMATIVE:
+            return True
+        if lexicon.forms_expanded and flags & NORMATIVE_MASK:
+            return False
+        return self._is_nenormative(flags, self._parse_best(word_lower), lexicon)
+
+    def _is_nenormative(self, flags, best_parse, lexicon):
+        """Проверка ненормативности по флагам и готовому разбору"""
+        if flags & SOURCE_NENORMATIVE:
             return True
         
-        if self.morph:
-            try:
-                parsed = self.morph.parse(word_lower)
-                if parsed and parsed[0].normal_form in self.nenormative_words:
-                    return True
-            except:
-                pass
+        if best_parse is not None and lexicon.get(best_parse.normal_form) & SOURCE_NENORMATIVE:
+            return True
         
         return False
-    
-    def check_text(self, text):
-        """Проверка текста"""
-        if not text or not text.strip():
-            return {
-                'latin_words': [],
-                'unknown_cyrillic': [],
-                'nenormative_words': [],
-                'latin_count': 0,
-                'unknown_count': 0,
-                'nenormative_count': 0,
-                'violations_count': 0,
-                'law_compliant': True,
-                'total_words': 0,
-                'unique_words': 0
-            }
+
+    def classify_word(self, word, script=None, lexicon=None):
+        """Вердикт для слова: nenormative / latin / known / unknown.
+
+        Результат кэшируется по (версия словарей, слово). Регистр входит
+        в ключ, так как от него зависят правила для аббревиатур и имён.
+        script - письменность из count_tokens, если уже известна;
+        lexicon - словарь, зафиксированный на время проверки текста.
+        """
+        if lexicon is None:
+            lexicon = self.lexicon
+        key = (lexicon.version, word)
+        verdict = self.verdict_cache.get(key)
+        if verdict is None:
+            verdict = self._classify(word, script, lexicon)[0]
+            self.verdict_cache.put(key, verdict)
+        return verdict
+
+    def _classify(self, word, script, lexicon):
+        """Классификация слова: одна проверка словаря и не более одного разбора.
+
+        Возвращает (вердикт, флаги источников, причина).
+        """
+        word_lower = word.lower()
+        flags = lexicon.get(word_lower)
+        best_parse = None
+        # Со снапшотом развёрнутых словоформ словарные слова не разбираются:
+        # их ненормативные формы уже помечены SOURCE_NENORMATIVE
+        if not flags & SOURCE_NENORMATIVE and not (lexicon.forms_expanded and flags & NORMATIVE_MASK):
+            best_parse = self._parse_best(word_lower)
+        
+        if self._is_nenormative(flags, best_parse, lexicon):
+            return VERDICT_NENORMATIVE, flags, 'nenormative'
         
-        # Очистка
-        text = re.sub(r'https?://[^\s]+', ' ', text)
-        text = re.sub(r'\+?\d[\d\s\-\(\)]{7,}', ' ', text)
+        if script is None:
+            script = SCRIPT_LATIN if LATIN_RE.search(word) else SCRIPT_CYRILLIC
+        if script != SCRIPT_CYRILLIC:
+            return VERDICT_LATIN, flags, script
         
-        all_words = re.findall(r'\b[а-яёА-ЯЁa-zA-Z][а-яёА-ЯЁa-zA-Z\-]*\b', text)
+        reason = self._known_reason(word, word_lower, flags, best_parse, lexicon)
+        if reason is not None:
+            return VERDICT_KNOWN, flags, reason
         
-        latin_words = []
-        unknown_cyrillic = []
-        nenormative_found = []
+        return VERDICT_UNKNOWN, flags, None
+
+    def explain_word(self, word):
+        """Вердикт для слова с источниками и причиной"""
+        if not self._init_done.is_set():
+            self.wait_ready()
+        lexicon = self.lexicon
+        verdict, flags, reason = self._classify(word, None, lexicon)
+        return {
+            'dict_version': lexicon.version,
+            'word': word,
+            'verdict': verdict,
+            'sources': source_names(flags),
+            'reason': reason
+        }
+    
+    def check_text(self, text):
+        """Проверка текста.
+
+        Слова считаются одним проходом count_tokens, каждая уникальная
+        форма классифицируется один раз - стоимость зависит от размера
+        словаря текста, а не от его длины. В 'occurrences' возвращается
+        число вхождений каждого найденного нарушения, в 'mixed_script_words' -
+        слова латиницей вперемешку с кириллицей (входят и в latin_words).
+        Словарь фиксируется на всю проверку, его версия - в 'dict_version'.
+        """
+        if not self._init_done.is_set():
+            self.wait_ready()
+        lexicon = self.lexicon
+        if not text or not text.strip():
+            return make_result(lexicon.version, {}, {}, {}, {}, ())
+        return make_result(lexicon.version, *self.text_verdicts(text, lexicon))
+
+    def text_verdicts(self, text, lexicon=None):
+        """Подсчёт и классификация слов текста без сборки результата.
+
+        Возвращает (счётчик слов, латиница, неизвестные, ненормативные,
+        слова смешанного письма); нарушения - словари слово -> число
+        вхождений. Для частей текста, разделённых пробелом, результаты
+        складываются (см. merge_verdicts).
+        """
+        if lexicon is None:
+            if not self._init_done.is_set():
+                self.wait_ready()
+            lexicon = self.lexicon
+        word_counts, scripts = count_tokens(text)
         
-        skip = {'и', 'в', 'на', 'по', 'от', 'до', 'из', 'к', 'с', 'у', 'о',
-                'но', 'да', 'не', 'за', 'об', 'во', 'а', 'я'}
+        latin_words = {}
+        unknown_cyrillic = {}
+        nenormative_found = {}
         
-        for word in all_words:
-            if len(word) == 1 or word.lower() in skip:
+        for word, count in word_counts.items():
+            if len(word) == 1 or word.lower() in SKIP_WORDS:
                 continue
             
-            if self.is_nenormative(word):
-                nenormative_found.append(word)
-                continue
-            
-            if re.search(r'[a-zA-Z]', word):
-                latin_words.append(word)
-                continue
-            
-            if not self.is_known_word(word):
-                unknown_cyrillic.append(word)
-        
-        latin_words = sorted(list(set(latin_words)))
-        unknown_cyrillic = sorted(list(set(unknown_cyrillic)))
-        nenormative_found = sorted(list(set(nenormative_found)))
+            verdict = self.classify_word(word, scripts[word], lexicon)
+            if verdict == VERDICT_NENORMATIVE:
+                nenormative_found[word] = count
+            elif verdict == VERDICT_LATIN:
+                latin_words[word] = count
+            elif verdict == VERDICT_UNKNOWN:
+                unknown_cyrillic[word] = count
         
-        return {
-            'latin_words': latin_words,
-            'unknown_cyrillic': unknown_cyrillic,
-            'nenormative_words': nenormative_found,
-            'latin_count': len(latin_words),
-            'unknown_count': len(unknown_cyrillic),
-            'nenormative_count': len(nenormative_found),
-            'violations_count': len(latin_words) + len(unknown_cyrillic) + len(nenormative_found),
-            'law_compliant': (len(latin_words) + len(unknown_cyrillic) + len(nenormative_found)) == 0,
-            'total_words': len(all_words),
-            'unique_words': len(set(all_words))
+        mixed = [w for w in latin_words if scripts[w] == SCRIPT_MIXED]
+        return word_counts, latin_words, unknown_cyrillic, nenormative_found, mixed
+
+
+def make_result(version, word_counts, latin_words, unknown_cyrillic, nenormative_found, mixed):
+    """Результат check_text по подсчёту слов и найденным нарушениям"""
+    violations = len(latin_words) + len(unknown_cyrillic) + len(nenormative_found)
+    return {
+        'dict_version': version,
+        'latin_words': sorted(latin_words),
+        'unknown_cyrillic': sorted(unknown_cyrillic),
+        'nenormative_words': sorted(nenormative_found),
+        'latin_count': len(latin_words),
+        'unknown_count': len(unknown_cyrillic),
+        'nenormative_count': len(nenormative_found),
+        'violations_count': violations,
+        'law_compliant': violations == 0,
+        'total_words': sum(word_counts.values()),
+        'unique_words': len(word_counts),
+        'mixed_script_words': sorted(mixed),
+        'occurrences': {
+            'latin_words': dict(sorted(latin_words.items())),
+            'unknown_cyrillic': dict(sorted(unknown_cyrillic.items())),
+            'nenormative_words': dict(sorted(nenormative_found.items()))
         }
+    }
+
+
+def merge_verdicts(parts):
+    """Сложение text_verdicts частей текста в text_verdicts всего текста"""
+    word_counts = Counter()
+    latin_words, unknown_cyrillic, nenormative_found, mixed = {}, {}, {}, set()
+    for counts, latin, unknown, nenormative, part_mixed in parts:
+        word_counts.update(counts)
+        for merged, found in ((latin_words, latin), (unknown_cyrillic, unknown),
+                              (nenormative_found, nenormative)):
+            for word, count in found.items():
+                merged[word] = merged.get(word, 0) + count
+        mixed.update(part_mixed)
+    return word_counts, latin_words, unknown_cyrillic, nenormative_found, mixed
+
+
+def build_index(force=False):
+    """CLI: компиляция словарей в бинарный снапшот"""
+    dict_path = find_dictionaries_path()
+    if not dict_path:
+        print("⚠️ ПАПКА dictionaries НЕ НАЙДЕНА!")
+        return 1
+    
+    morph = load_morph()
+    
+    if not force:
+        try:
+            snapshot = LexiconSnapshot.open(dict_path / SNAPSHOT_NAME, dict_path=dict_path,
+                                            common_words=COMMON_WORDS)
+            if snapshot.forms_expanded or morph is None:
+                print(f"✓ Снапшот актуален: {snapshot.path} (версия {snapshot.version})")
+                return 0
+        except SnapshotError:
+            pass
+    
+    if morph is not None:
+        print("Развёртывание словоформ через pymorphy3 (однократно, может занять несколько минут)...")
+    else:
+        print("⚠️ pymorphy3 недоступен - словоформы не развёрнуты")
+    out_path = build_snapshot(dict_path, morph=morph, common_words=COMMON_WORDS)
+    snapshot = LexiconSnapshot.open(out_path, dict_path=dict_path, common_words=COMMON_WORDS)
+    print(f"✓ Снапшот собран: {out_path} ({out_path.stat().st_size:,} байт, версия {snapshot.version})")
+    lexicon = Lexicon(snapshot.table)
+    print(f"  Всего форм: {len(snapshot.table):,}")
+    print(f"  Нормативные: {lexicon.count(NORMATIVE_MASK):,}")
+    print(f"  Иностранные: {lexicon.count(SOURCE_FOREIGN):,}")
+    print(f"  Ненормативные: {lexicon.count(SOURCE_NENORMATIVE):,}")
+    return 0
 
 
 # Тест при запуске
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == 'build-index':
+        sys.exit(build_index(force='--force' in sys.argv[2:]))
+    
     print("\n" + "="*60)
     print("ТЕСТИРОВАНИЕ RussianLanguageChecker")
     print("="*60)
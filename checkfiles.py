@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Проверка локальных файлов из командной строки (без Flask и HTTP).
+
+Словари загружаются один раз, процессы пула (checkpool.CheckPool)
+порождаются fork-ом и наследуют готовый чекер; файлы читаются и
+проверяются в процессах пачками. Входы - файлы, каталоги (рекурсивно,
+по расширениям --ext), шаблоны glob (в кавычках, с ** для подкаталогов)
+и '-' - текст из stdin. Результаты идут в stdout по мере готовности
+(JSON Lines или CSV) в порядке входов, сводка - в stderr.
+
+Код выхода: 0 - нарушений нет, 1 - есть нарушения, 2 - часть файлов
+не прочитана (удобно как проверка в CI).
+
+    python checkfiles.py site/ 'docs/**/*.txt' --processes 8 > results.jsonl
+    cat text.txt | python checkfiles.py - --format csv
+"""
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+EXIT_CLEAN = 0
+EXIT_VIOLATIONS = 1
+EXIT_ERRORS = 2
+
+DEFAULT_EXTENSIONS = '.txt,.html,.htm'
+STDIN = '-'
+
+# Колонки CSV; списки слов - через пробел
+CSV_FIELDS = ('path', 'success', 'law_compliant', 'violations_count', 'latin_count', 'unknown_count',
+              'nenormative_count', 'total_words', 'latin_words', 'unknown_cyrillic', 'nenormative_words',
+              'error')
+
+
+def iter_paths(inputs, extensions):
+    """Пути файлов по входам: файл как есть, каталог - рекурсивно, иначе glob"""
+    for item in inputs:
+        if item == STDIN:
+            continue
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in extensions:
+                        yield os.path.join(root, name)
+        elif os.path.exists(item) or not any(char in item for char in '*?['):
+            # Несуществующий файл даст ошибку чтения в результатах
+            yield item
+        else:
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield path
+
+
+class Output:
+    """Запись результатов в JSON Lines или CSV и счётчики для сводки"""
+
+    def __init__(self, stream, fmt='jsonl'):
+        self.stream = stream
+        self.writer = None
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, CSV_FIELDS, extrasaction='ignore')
+            self.writer.writeheader()
+        self.files = 0
+        self.violations = 0
+        self.errors = 0
+        self.words = 0
+        self.bytes = 0
+
+    def write(self, path, result, error):
+        self.files += 1
+        if error is not None:
+            self.errors += 1
+        else:
+            self.words += result['total_words']
+            self.bytes += result.get('file_bytes', 0)
+            if not result['law_compliant']:
+                self.violations += 1
+        if self.writer is None:
+            record = {'path': path, 'success': error is None}
+            record.update({'result': result} if error is None else {'error': error})
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            return
+        row = {'path': path, 'success': error is None, 'error': error or ''}
+        if error is None:
+            row.update(result)
+            for key in ('latin_words', 'unknown_cyrillic', 'nenormative_words'):
+                row[key] = ' '.join(result[key])
+        self.writer.writerow(row)
+
+    def exit_code(self):
+        if self.errors:
+            return EXIT_ERRORS
+        return EXIT_VIOLATIONS if self.violations else EXIT_CLEAN
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проверка текстовых и HTML-файлов на соответствие закону о русском языке")
+    parser.add_argument('inputs', nargs='*', default=[STDIN],
+                        help="файлы, каталоги, шаблоны glob или '-' (stdin, по умолчанию)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl', help="формат результатов")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="процессов проверки (0 - в текущем процессе)")
+    parser.add_argument('--ext', default=DEFAULT_EXTENSIONS,
+                        help=f"расширения файлов в каталогах (по умолчанию {DEFAULT_EXTENSIONS})")
+    args = parser.parse_args(argv)
+    extensions = {ext if ext.startswith('.') else '.' + ext
+                  for ext in (part.strip().lower() for part in args.ext.split(',')) if ext}
+
+    from checker import RussianLanguageChecker
+    from checkpool import CheckPool
+
+    started = time.perf_counter()
+    checker = RussianLanguageChecker()
+    checker.wait_ready()
+    loaded = time.perf_counter()
+    check_pool = CheckPool(checker, args.processes)
+    output = Output(sys.stdout, args.format)
+    try:
+        if STDIN in args.inputs:
+            text = sys.stdin.read()
+            output.write(STDIN, check_pool.check_text(text), None)
+        for path, result, error in check_pool.check_files(iter_paths(args.inputs, extensions)):
+            output.write(path, result, error)
+    finally:
+        sys.stdout.flush()
+        check_pool.shutdown()
+    elapsed = time.perf_counter() - loaded
+    rate = f"{output.files / elapsed:.1f} файл/с, {output.bytes / elapsed / 1024 / 1024:.2f} МБ/с" if elapsed else ''
+    print(f"Файлов: {output.files}, с нарушениями: {output.violations}, ошибок: {output.errors}, "
+          f"слов: {output.words}; словари {loaded - started:.1f} с, проверка {elapsed:.2f} с, {rate}",
+          file=sys.stderr)
+    return output.exit_code()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Пул процессов для CPU-этапа пакетной проверки.
+
+Разбор HTML (BeautifulSoup) и check_text - чистый Python, под GIL
+потоки его не распараллеливают. Загрузка страниц остаётся в потоках
+BatchFetcher, а разбор и проверка уходят в процессы пула. Процессы
+порождаются fork-ом и наследуют готовый чекер (словари, pymorphy3,
+кэш вердиктов) без повторной загрузки; после перезагрузки словарей
+пул пересоздаётся.
+
+Страницы пакета проверяются по абзацам: вердикты абзацев кэшируются
+(boilerplate.BlockCache), и общие для страниц сайта шапка, меню и подвал
+разбираются один раз.
+
+CHECK_PROCESSES=N - число процессов (0 - проверка в потоке загрузки).
+Замер: python benchmarks/bench_checkpool.py
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+from boilerplate import BlockCache, block_digest, page_blocks
+from checker import make_result, merge_verdicts, pool_fork
+from fetcher import page_text
+from htmltext import (BATCH_SKIP_TAGS, BLOCK_SEPARATOR, PAGE_SKIP_TAGS, decode_page, extract_blocks,
+                      read_page_bytes)
+
+CHECK_PROCESSES = int(os.environ.get('CHECK_PROCESSES', 0))
+# Файлов в одной задаче пула (check_files): меньше обменов между процессами
+CHECK_FILES_BATCH = int(os.environ.get('CHECK_FILES_BATCH', 32))
+# Файлы, которые разбираются как HTML; остальные проверяются как текст
+HTML_FILE_EXTENSIONS = frozenset({'.html', '.htm', '.xhtml', '.shtml'})
+
+# Чекер в процессе пула - унаследован от родителя при fork
+_worker_checker = None
+
+
+def _init_worker(checker):
+    global _worker_checker
+    _worker_checker = checker
+
+
+def _check_html(html):
+    return _worker_checker.check_text(page_text(html))
+
+
+def _check_text(text):
+    return _worker_checker.check_text(text)
+
+
+def _block_verdicts(blocks):
+    return [_worker_checker.text_verdicts(block) for block in blocks]
+
+
+def _extract_body(body, content_type, links=False, page=False):
+    """Текст страницы по байтам тела: (абзацы через BLOCK_SEPARATOR, title, сведения).
+
+    links=True - в сведения попадают и href ссылок страницы; page=True -
+    текст как у /api/check-url (PAGE_SKIP_TAGS: без меню, шапки и подвала).
+    """
+    html, encoding, method = decode_page(body, content_type)
+    info = {'page_encoding': encoding, 'encoding_method': method}
+    blocks, title, found_links = extract_blocks(html, PAGE_SKIP_TAGS if page else BATCH_SKIP_TAGS, links)
+    if links:
+        info['links'] = found_links
+    return BLOCK_SEPARATOR.join(blocks), title, info
+
+
+def _with_title(info, title):
+    return dict(info, page_title=title if title is not None else 'Без названия')
+
+
+def _check_file(checker, path):
+    """(путь, результат, ошибка) для локального файла: HTML - по тексту страницы"""
+    try:
+        with open(path, 'rb') as f:
+            body = f.read()
+    except OSError as e:
+        return path, None, str(e)
+    if os.path.splitext(path)[1].lower() in HTML_FILE_EXTENSIONS:
+        text, _, info = _extract_body(body, None)
+    else:
+        text, encoding, method = decode_page(body)
+        info = {'page_encoding': encoding, 'encoding_method': method}
+    result = checker.check_text(text)
+    result.update(info, file_bytes=len(body))
+    return path, result, None
+
+
+def _check_files(paths):
+    return [_check_file(_worker_checker, path) for path in paths]
+
+
+class CheckPool:
+    """Разбор и проверка HTML в пуле процессов, наследующих чекер"""
+
+    def __init__(self, checker, processes=CHECK_PROCESSES):
+        self.checker = checker
+        self.processes = processes
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._version = None
+        # Вердикты абзацев по (версия словарей, хеш)
+        self.blocks = BlockCache()
+
+    def _get_executor(self):
+        """Пул текущего процесса и текущей версии словарей"""
+        version = self.checker.dict_version
+        with self._lock:
+            if self._executor is not None and (self._pid != os.getpid() or self._version != version):
+                if self._pid == os.getpid():
+                    self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._executor is None:
+                executor = ProcessPoolExecutor(max_workers=self.processes,
+                                               mp_context=multiprocessing.get_context('fork'),
+                                               initializer=_init_worker, initargs=(self.checker,))
+                # С fork все процессы порождаются первой задачей - здесь же
+                with pool_fork():
+                    executor.submit(os.getpid).result()
+                self._executor = executor
+                self._pid = os.getpid()
+                self._version = version
+            return self._executor
+
+    def check_html(self, html):
+        """Результат check_text для HTML страницы"""
+        if self.processes <= 0:
+            return self.checker.check_text(page_text(html))
+        return self._submit(_check_html, html)
+
+    def check_text(self, text):
+        """check_text в процессе пула"""
+        if self.processes <= 0:
+            return self.checker.check_text(text)
+        return self._submit(_check_text, text)
+
+    def extract_response(self, response, links=False, page=False):
+        """Текст загруженного ответа (htmltext.decode_page + extract_blocks).
+
+        Тело читается потоком с лимитом MAX_PAGE_BYTES и защитой от бомб
+        (htmltext.read_page_bytes), кодировка определяется по байтам, а не
+        угадыванием response.text; декодирование и разбор идут в процессе пула.
+        """
+        content_type = response.headers.get('Content-Type')
+        body, read_info = read_page_bytes(response)
+        if self.processes <= 0:
+            text, title, info = _extract_body(body, content_type, links, page)
+        else:
+            text, title, info = self._submit(_extract_body, body, content_type, links, page)
+        return text, title, dict(read_info, **info)
+
+    def check_page(self, url, fetch, cache=None, links=False, page=False):
+        """Проверка страницы пакета: fetch(headers) -> ответ, cache - PageCache.
+
+        Проверяются только абзацы, которых нет в кэше вердиктов; в
+        result['blocks'] - хеши абзацев и их нарушения (boilerplate.page_blocks).
+        links=True - href ссылок страницы возвращаются в result['links'];
+        page=True - текст страницы извлекается как у /api/check-url.
+        """
+        def load(response):
+            return self.extract_response(response, links, page)
+
+        if cache is None:
+            text, title, info = load(fetch())
+        else:
+            kind = 'crawl-blocks' if links else 'page-blocks' if page else 'batch-blocks'
+            text, title, info, cache_info = cache.fetch(url, kind, fetch, load)
+            info = dict(info, cache=cache_info)
+        return self._check_blocks(text, _with_title(info, title))
+
+    def check_body(self, body, content_type=None):
+        """Проверка страницы по байтам тела (архивы без загрузки, ingest.py)"""
+        if self.processes <= 0:
+            text, title, info = _extract_body(body, content_type)
+        else:
+            text, title, info = self._submit(_extract_body, body, content_type)
+        return self._check_blocks(text, _with_title(info, title))
+
+    def check_files(self, paths, batch=CHECK_FILES_BATCH):
+        """(путь, результат, ошибка) для файлов в порядке paths.
+
+        Файлы читаются и проверяются в процессах пула пачками по batch;
+        paths может быть ленивым, в работе не больше 2 * processes пачек.
+        """
+        paths = iter(paths)
+        if self.processes <= 0:
+            for path in paths:
+                yield _check_file(self.checker, path)
+            return
+        if not self.checker.ready:
+            self.checker.wait_ready()
+        executor = self._get_executor()
+        pending = deque()
+        for chunk in iter(lambda: list(islice(paths, batch)), []):
+            pending.append(executor.submit(_check_files, chunk))
+            if len(pending) >= self.processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _check_blocks(self, text, info):
+        """Результат по тексту из абзацев (BLOCK_SEPARATOR) и сведениям о странице"""
+        blocks = [block for block in text.split(BLOCK_SEPARATOR) if block]
+        digests = [block_digest(block) for block in blocks]
+        version, verdicts = self.block_verdicts(blocks, digests)
+        result = make_result(version, *merge_verdicts(verdicts))
+        result.update(info)
+        result['blocks'] = page_blocks(digests, verdicts)
+        return result
+
+    def block_verdicts(self, blocks, digests):
+        """(версия словарей, text_verdicts каждого абзаца); новые - в пуле процессов"""
+        if not self.checker.ready:
+            self.checker.wait_ready()
+        lexicon = self.checker.lexicon
+        version = lexicon.version
+        found = self.blocks.get_many(version, set(digests))
+        missing = {digest: block for digest, block in zip(digests, blocks) if digest not in found}
+        if missing:
+            if self.processes <= 0:
+                computed = [self.checker.text_verdicts(block, lexicon) for block in missing.values()]
+            else:
+                computed = self._submit(_block_verdicts, list(missing.values()))
+            computed = dict(zip(missing, computed))
+            self.blocks.put_many(version, computed)
+            found.update(computed)
+        return version, [found[digest] for digest in digests]
+
+    def _submit(self, func, *args):
+        if not self.checker.ready:
+            # Процессы должны унаследовать уже загруженные словари
+            self.checker.wait_ready()
+        executor = self._get_executor()
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            # Процесс пула упал - пересоздаём пул и повторяем один раз
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return self._get_executor().submit(func, *args).result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Обход сайта: страницы из robots.txt/sitemap.xml и ссылок сайта.
+
+Обход - задание очереди (jobs.py, вид crawl): список URL задания и есть
+граница обхода (frontier), он хранится в SQLite, поэтому обход можно
+остановить (cancel) и продолжить (resume) с места остановки. Страницы
+проверяются тем же путём, что и пакетная проверка (CheckPool.check_page).
+
+Перед проверкой обработчик один раз читает robots.txt (правила,
+Crawl-delay, Sitemap:) и sitemap.xml, включая индексы sitemap и .gz;
+robots.txt с ответом 401/403 закрывает весь сайт, как в RobotFileParser.
+С follow_links в границу добавляются ссылки проверенных страниц того же
+хоста. URL нормализуются, повторы отбрасываются.
+"""
+
+import io
+import logging
+import os
+import zlib
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+from fetcher import BatchFetcher, normalize_url
+from htmltext import PageTooLarge, read_page_bytes
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Лимит страниц одного обхода
+CRAWL_MAX_PAGES = int(os.environ.get('CRAWL_MAX_PAGES', 20000))
+# Пауза между запросами к хосту (секунды); Crawl-delay из robots.txt
+# увеличивает её, но не больше CRAWL_MAX_DELAY
+CRAWL_DELAY = float(os.environ.get('CRAWL_DELAY', 0.5))
+CRAWL_MAX_DELAY = float(os.environ.get('CRAWL_MAX_DELAY', 10))
+CRAWL_CONCURRENCY = int(os.environ.get('CRAWL_CONCURRENCY', 4))
+# Сколько файлов sitemap читать и их максимальный размер после распаковки
+CRAWL_MAX_SITEMAPS = int(os.environ.get('CRAWL_MAX_SITEMAPS', 50))
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+
+# Ссылки на файлы, а не страницы - в обход не попадают
+SKIP_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.pdf', '.zip', '.rar',
+    '.gz', '.7z', '.tar', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.mp3', '.mp4',
+    '.avi', '.mov', '.webm', '.css', '.js', '.json', '.xml', '.txt', '.exe', '.dmg', '.apk'
+})
+
+ROBOTS_AGENT = '*'
+
+
+def site_host(url):
+    """Хост для сравнения: нижний регистр, без www."""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def crawl_root(url):
+    """Нормализованный стартовый URL обхода"""
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    return normalize_url(url)
+
+
+def read_sitemap_body(body):
+    """Тело sitemap с распаковкой gzip (с лимитом размера)"""
+    if body[:2] != b'\x1f\x8b':
+        return body[:SITEMAP_MAX_BYTES]
+    return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, SITEMAP_MAX_BYTES)
+
+
+def parse_sitemap(body):
+    """(ссылки на вложенные sitemap, ссылки на страницы) из XML sitemap"""
+    sitemaps, pages = [], []
+    try:
+        for _, element in ElementTree.iterparse(io.BytesIO(read_sitemap_body(body)), events=('end',)):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'sitemap' or tag == 'url':
+                loc = next((child.text for child in element if child.tag.rsplit('}', 1)[-1] == 'loc'), None)
+                if loc and loc.strip():
+                    (sitemaps if tag == 'sitemap' else pages).append(loc.strip())
+                element.clear()
+    except (ElementTree.ParseError, zlib.error) as e:
+        logger.info("Sitemap не разобран: %s", e)
+    return sitemaps, pages
+
+
+class SiteCrawler:
+    """Поиск страниц сайта и их проверка для заданий обхода"""
+
+    def __init__(self, store, check_pool, cache=None, fetcher=None):
+        self.store = store
+        self.check_pool = check_pool
+        self.cache = cache
+        self.fetcher = fetcher or BatchFetcher(max_workers=CRAWL_CONCURRENCY, per_host=CRAWL_CONCURRENCY,
+                                               host_delay=CRAWL_DELAY)
+
+    def _fetch(self, url):
+        """(код ответа, содержимое) служебного файла; содержимое None, если не получено"""
+        try:
+            response = self.fetcher.fetch(url)
+        except Exception as e:
+            logger.info("Не загружен %s: %s", url, e)
+            return None, None
+        status = response.status_code
+        if status != 200:
+            response.close()
+            return status, None
+        try:
+            body, _ = read_page_bytes(response, SITEMAP_MAX_BYTES)
+        except PageTooLarge as e:
+            logger.info("Не загружен %s: %s", url, e)
+            return status, None
+        return status, body
+
+    def _get(self, url):
+        """Содержимое служебного файла (robots.txt, sitemap) или None"""
+        return self._fetch(url)[1]
+
+    def _robots(self, options):
+        robots = RobotFileParser()
+        if options.get('robots_status') in (401, 403):
+            # Как RobotFileParser.read: доступ к robots.txt закрыт - закрыт и сайт
+            robots.disallow_all = True
+        else:
+            robots.parse(options.get('robots', '').splitlines())
+        return robots
+
+    def accept(self, url, root, robots):
+        """Нормализованный URL, если он входит в обход, иначе None"""
+        url, _ = urldefrag(url.strip())
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or site_host(url) != site_host(root):
+            return None
+        if os.path.splitext(parts.path)[1].lower() in SKIP_EXTENSIONS:
+            return None
+        if not robots.can_fetch(ROBOTS_AGENT, url):
+            return None
+        return normalize_url(url)
+
+    def discover(self, job_id, root, options):
+        """robots.txt и sitemap: правила, пауза и стартовая граница обхода"""
+        parts = urlsplit(root)
+        status, robots_body = self._fetch(f"{parts.scheme}://{parts.netloc}/robots.txt")
+        options['robots'] = robots_body.decode('utf-8', errors='replace') if robots_body else ''
+        options['robots_status'] = status
+        robots = self._robots(options)
+        delay = robots.crawl_delay(ROBOTS_AGENT)
+        options['delay'] = min(max(CRAWL_DELAY, float(delay or 0)), CRAWL_MAX_DELAY)
+
+        queue = list(robots.site_maps() or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"])
+        seen = set()
+        pages = [root]
+        while queue and len(seen) < CRAWL_MAX_SITEMAPS and len(pages) < options['max_pages']:
+            sitemap_url = queue.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            body = self._get(sitemap_url)
+            if body is None:
+                continue
+            nested, locs = parse_sitemap(body)
+            queue.extend(nested)
+            pages.extend(locs)
+
+        accepted = [url for url in (self.accept(url, root, robots) for url in pages) if url]
+        added = self.store.add_urls(job_id, accepted, options['max_pages'])
+        options['discovered'] = True
+        options['sitemaps'] = len(seen)
+        self.store.set_options(job_id, options)
+        logger.info("Обход %s: sitemap %s, страниц %s, пауза %s с", root, len(seen), added, options['delay'])
+
+    def prepare(self, job_id):
+        """(fetcher, process) для задания обхода; при первом запуске - discover"""
+        job = self.store.get(job_id)
+        options = self.store.options(job_id)
+        if not options.get('discovered'):
+            self.discover(job_id, job['root'], options)
+        self.fetcher.host_delay = options['delay']
+        robots = self._robots(options)
+        follow_links = options.get('follow_links', False)
+
+        def process(url, fetch):
+            result = self.check_pool.check_page(url, fetch, self.cache, links=follow_links)
+            links = result.pop('links', None)
+            if links:
+                accepted = (self.accept(urljoin(url, link), job['root'], robots) for link in links)
+                self.store.add_urls(job_id, [link for link in accepted if link], options['max_pages'])
+            return result
+
+        return self.fetcher, process
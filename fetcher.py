@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Параллельная загрузка страниц для пакетной проверки.
+
+Ограниченный пул потоков поверх общей requests.Session: соединения
+переиспользуются (keep-alive), число одновременных загрузок ограничено
+глобально и на каждый хост, у всего пакета есть общий дедлайн.
+
+Временные ошибки повторяются с паузой (бюджет повторов и размыкатель
+по хостам - hosthealth.py): мёртвый или перегруженный хост быстро
+отключается и не задерживает остальной пакет до своего таймаута.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hosthealth import FETCH_BACKOFF_MAX, FETCH_RETRIES, RETRY_STATUSES, HostHealth, backoff, retry_after
+from htmltext import BATCH_SKIP_TAGS, extract_text
+
+# Одновременных загрузок в пакете и на один хост
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', 10))
+BATCH_PER_HOST = int(os.environ.get('BATCH_PER_HOST', 4))
+# Общий лимит времени пакета (секунды)
+BATCH_DEADLINE = float(os.environ.get('BATCH_DEADLINE', 60))
+# Таймаут установки соединения (секунды) - недоступный хост виден сразу
+FETCH_CONNECT_TIMEOUT = float(os.environ.get('FETCH_CONNECT_TIMEOUT', 3.05))
+
+
+def url_host(url):
+    """Хост URL для лимитов и учёта (netloc в нижнем регистре)"""
+    return urlsplit(url).netloc.lower()
+
+
+def normalize_url(url):
+    """URL для сравнения: регистр схемы и хоста, порт по умолчанию, фрагмент"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+def page_text(html):
+    """Видимый текст страницы пакетной проверки (без script и style)"""
+    return extract_text(html, BATCH_SKIP_TAGS)[0]
+
+
+class DeadlineExceeded(Exception):
+    """Пакет не уложился в общий лимит времени"""
+
+
+class BatchFetcher:
+    """Загрузка списка URL пулом потоков с лимитами и общим дедлайном"""
+
+    def __init__(self, max_workers=BATCH_CONCURRENCY, per_host=BATCH_PER_HOST,
+                 timeout=10, headers=None, host_delay=0, health=None, retries=FETCH_RETRIES):
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        # Размыкатель, бюджет повторов и время ответа по хостам
+        self.health = health or HostHealth()
+        # Минимальный интервал между запросами к одному хосту (секунды)
+        self.host_delay = host_delay
+        self._next_request = {}
+        self.headers = headers or {'User-Agent': 'Mozilla/5.0'}
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._session = None
+        self._session_pid = None
+
+    @property
+    def session(self):
+        """Сессия процесса: после fork (воркер gunicorn) создаётся заново"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.max_workers,
+                                          pool_maxsize=self.per_host)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+                    self._session_pid = pid
+                    self._host_slots = {}
+        return self._session
+
+    def _host_slot(self, url):
+        host = url_host(url)
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _wait_turn(self, url, deadline):
+        """Пауза host_delay между запросами к хосту (вежливость обхода)"""
+        host = url_host(url)
+        with self._lock:
+            now = time.monotonic()
+            turn = max(now, self._next_request.get(host, 0))
+            if deadline is not None and turn > deadline:
+                raise DeadlineExceeded("Превышен общий лимит времени пакета")
+            self._next_request[host] = turn + self.host_delay
+        if turn > now:
+            time.sleep(turn - now)
+
+    def fetch(self, url, deadline=None, headers=None):
+        """GET с учётом лимита хоста; таймаут не выходит за дедлайн пакета.
+
+        Ошибки соединения и ответы 429/502/503/504 повторяются (не больше
+        retries раз, пока хватает бюджета хоста и времени до дедлайна);
+        после повторов возвращается последний ответ. Если цепь хоста
+        разомкнута - сразу HostUnavailable.
+        """
+        session = self.session
+        host = url_host(url)
+        # Не ждём слот хоста, если цепь уже разомкнута
+        self.health.allow(host, claim=False)
+        slot = self._host_slot(url)
+        if deadline is None:
+            slot.acquire()
+        elif not slot.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise DeadlineExceeded("Превышен общий лимит времени пакета")
+        try:
+            attempt = 0
+            while True:
+                if self.host_delay:
+                    self._wait_turn(url, deadline)
+                response, error, pause = self._attempt(session, url, host, deadline, headers)
+                retryable = (response.status_code in RETRY_STATUSES if response is not None
+                             else isinstance(error, requests.ConnectionError)
+                             and not isinstance(error, requests.exceptions.SSLError))
+                wait = pause if pause is not None else backoff(attempt)
+                if (not retryable or attempt >= self.retries or wait > FETCH_BACKOFF_MAX
+                        or (deadline is not None and time.monotonic() + wait >= deadline)
+                        or not self.health.take_retry(host)):
+                    if error is not None:
+                        raise error
+                    return response
+                if response is not None:
+                    response.close()
+                time.sleep(wait)
+                attempt += 1
+        finally:
+            slot.release()
+
+    def _attempt(self, session, url, host, deadline, headers):
+        """Одна попытка GET: (ответ или None, ошибка или None, Retry-After)"""
+        # Пока ждали слот или паузу, цепь могла разомкнуться
+        self.health.allow(host)
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0.1))
+        started = time.monotonic()
+        try:
+            # Тело читает получатель - потоком и с лимитом (htmltext.read_page_bytes)
+            response = session.get(url, timeout=(min(FETCH_CONNECT_TIMEOUT, timeout), timeout),
+                                   headers=headers, stream=True)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self.health.failure(host, time.monotonic() - started, e)
+            return None, e, None
+        except Exception:
+            self.health.release(host)
+            raise
+        elapsed = time.monotonic() - started
+        if response.status_code < 500 and response.status_code not in RETRY_STATUSES:
+            self.health.success(host, elapsed)
+            return response, None, None
+        pause = retry_after(response) if response.status_code in (429, 503) else None
+        # Долгий Retry-After - не ждём, а не трогаем хост всё это время
+        self.health.failure(host, elapsed, f"HTTP {response.status_code}",
+                            pause if pause is not None and pause > FETCH_BACKOFF_MAX else None)
+        return response, None, pause
+
+    def iter_completed(self, urls, process, deadline=BATCH_DEADLINE):
+        """Загрузка и обработка URL параллельно, по мере готовности.
+
+        process(url, fetch) выполняется в потоке пула; fetch(headers)
+        загружает url с учётом лимитов и дедлайна (заголовки - для
+        условных запросов кэша). Выдаёт тройки (индекс в urls, результат, исключение) - одно из
+        последних двух None. Не уложившиеся в дедлайн URL выдаются в конце
+        с DeadlineExceeded.
+        """
+        if not urls:
+            return
+        deadline_at = time.monotonic() + deadline if deadline else None
+
+        def run(url):
+            return process(url, lambda headers=None: self.fetch(url, deadline_at, headers))
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)),
+                                      thread_name_prefix='batch-fetch')
+        try:
+            futures = {executor.submit(run, url): index for index, url in enumerate(urls)}
+            pending = set(futures)
+            try:
+                for future in as_completed(futures, timeout=deadline if deadline else None):
+                    pending.discard(future)
+                    error = future.exception()
+                    yield futures[future], (None if error else future.result()), error
+            except FuturesTimeout:
+                pass
+            for future in sorted(pending, key=futures.get):
+                yield futures[future], None, DeadlineExceeded("Превышен общий лимит времени пакета")
+        finally:
+            # Не дождавшиеся дедлайна загрузки не задерживают ответ
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, urls, process, deadline=BATCH_DEADLINE):
+        """Как iter_completed, но список пар (результат, исключение) в порядке urls"""
+        outcomes = [None] * len(urls)
+        for index, result, error in self.iter_completed(urls, process, deadline):
+            outcomes[index] = (result, error)
+        return outcomes
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Конфигурация gunicorn: чекер загружается один раз в мастере.
+
+С preload_app приложение (и RussianLanguageChecker со словарями и
+pymorphy3) импортируется в мастере до fork. Перед fork объекты
+замораживаются gc.freeze(), чтобы сборщик мусора в воркерах не трогал
+их заголовки и не вызывал копирование страниц (copy-on-write).
+
+Фоновые потоки (слежение за словарями; задания и мониторинг при
+JOBS_INLINE=1) в мастере не запускаются: fork не должен заставать потоки
+с захваченными блокировками, а мастер - менять общие страницы. Их
+запускает post_fork в каждом воркере (app.start_background). Задания и
+мониторинг по умолчанию обрабатывает один процесс worker (python jobs.py).
+
+Отключить: GUNICORN_PRELOAD=0. Отчёт о памяти: GET /api/admin/memory
+или python memstats.py <pid мастера>.
+"""
+
+import gc
+import os
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+if preload_app:
+    # Без сборок мусора в мастере при импорте приложения - меньше грязных страниц
+    gc.disable()
+    os.environ['DEFER_BACKGROUND'] = '1'
+
+
+def when_ready(server):
+    if preload_app:
+        gc.freeze()
+        # Замороженные объекты сборщик больше не обходит
+        gc.enable()
+        server.log.info("Чекер предзагружен, заморожено объектов: %s", gc.get_freeze_count())
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        import app
+        app.start_background()
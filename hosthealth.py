@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Состояние хостов для исходящих загрузок: размыкатель и бюджет повторов.
+
+Каждый хост считается отдельно. После HOST_FAILURES ошибок подряд
+(соединение, таймаут, 5xx, 429) цепь хоста размыкается: остальные его
+URL сразу получают HostUnavailable, а не ждут таймаут. Через
+HOST_COOLDOWN секунд пропускается один пробный запрос; успех замыкает
+цепь, ошибка снова размыкает её (пауза удваивается до HOST_MAX_COOLDOWN).
+
+Повторы (временные ошибки, 429/503 с Retry-After) ограничены бюджетом:
+не больше FETCH_RETRY_RATIO от числа запросов к хосту плюс
+FETCH_RETRY_MIN, чтобы повторы не добивали и так перегруженный хост.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Ошибок подряд до размыкания и пауза до пробного запроса (секунды)
+HOST_FAILURES = int(os.environ.get('HOST_FAILURES', 5))
+HOST_COOLDOWN = float(os.environ.get('HOST_COOLDOWN', 30))
+HOST_MAX_COOLDOWN = float(os.environ.get('HOST_MAX_COOLDOWN', 300))
+# Повторов одного запроса, доля повторов от запросов к хосту и запас
+FETCH_RETRIES = int(os.environ.get('FETCH_RETRIES', 2))
+FETCH_RETRY_RATIO = float(os.environ.get('FETCH_RETRY_RATIO', 0.2))
+FETCH_RETRY_MIN = int(os.environ.get('FETCH_RETRY_MIN', 3))
+# Пауза перед повтором: база * 2^попытка со случайным разбросом, не больше максимума
+FETCH_BACKOFF = float(os.environ.get('FETCH_BACKOFF', 0.5))
+FETCH_BACKOFF_MAX = float(os.environ.get('FETCH_BACKOFF_MAX', 5))
+
+# Ответы, после которых запрос стоит повторить
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Состояние цепи хоста
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class HostUnavailable(Exception):
+    """Цепь хоста разомкнута - запрос не выполнялся"""
+
+
+def retry_after(response):
+    """Пауза из заголовка Retry-After (секунды) или None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt):
+    """Пауза перед повтором номер attempt (с 0): full jitter"""
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF * 2 ** attempt))
+
+
+class _Host:
+    __slots__ = ('state', 'failures', 'open_until', 'cooldown', 'probing', 'requests', 'errors',
+                 'retries', 'rejected', 'elapsed', 'max_elapsed', 'last_error')
+
+    def __init__(self):
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.cooldown = HOST_COOLDOWN
+        self.probing = False
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.elapsed = 0.0
+        self.max_elapsed = 0.0
+        self.last_error = None
+
+
+class HostHealth:
+    """Размыкатель, бюджет повторов и время ответа по хостам"""
+
+    def __init__(self, failures=HOST_FAILURES, cooldown=HOST_COOLDOWN, max_cooldown=HOST_MAX_COOLDOWN,
+                 retry_ratio=FETCH_RETRY_RATIO, retry_min=FETCH_RETRY_MIN):
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.retry_ratio = retry_ratio
+        self.retry_min = retry_min
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = _Host()
+            entry.cooldown = self.cooldown
+        return entry
+
+    def allow(self, host, claim=True):
+        """Можно ли сейчас обращаться к хосту; иначе HostUnavailable.
+
+        claim=False - только проверка, без занятия пробного запроса.
+        """
+        with self._lock:
+            entry = self._host(host)
+            if entry.state == CIRCUIT_CLOSED:
+                return
+            now = time.monotonic()
+            if entry.state == CIRCUIT_OPEN and now >= entry.open_until:
+                entry.state = CIRCUIT_HALF_OPEN
+                entry.probing = False
+            if entry.state == CIRCUIT_HALF_OPEN and not entry.probing:
+                # Один пробный запрос, остальные ждут его исхода
+                entry.probing = claim
+                return
+            entry.rejected += 1
+            wait = max(entry.open_until - now, 0)
+            reason = f": {entry.last_error}" if entry.last_error else ''
+        raise HostUnavailable(f"Хост {host} недоступен, повтор через {wait:.0f} с{reason}")
+
+    def success(self, host, elapsed):
+        with self._lock:
+            entry = self._host(host)
+            self._account(entry, elapsed)
+            entry.failures = 0
+            entry.state = CIRCUIT_CLOSED
+            entry.cooldown = self.cooldown
+            entry.probing = False
+
+    def failure(self, host, elapsed, error, pause=None):
+        """Ошибка запроса; pause - сколько хост просил не обращаться (Retry-After)"""
+        with self._lock:
+            entry = self._host(host)
+            self._account(entry, elapsed)
+            entry.errors += 1
+            entry.failures += 1
+            entry.last_error = str(error)[:200]
+            now = time.monotonic()
+            if entry.state == CIRCUIT_HALF_OPEN:
+                # Пробный запрос не прошёл - пауза длиннее
+                entry.cooldown = min(entry.cooldown * 2, self.max_cooldown)
+                self._open(entry, now + entry.cooldown)
+            elif entry.failures >= self.failures:
+                self._open(entry, now + entry.cooldown)
+            if pause:
+                self._open(entry, max(entry.open_until, now + min(pause, self.max_cooldown)))
+
+    def release(self, host):
+        """Запрос не дошёл до хоста (ошибка не сетевая) - исход не учитывается"""
+        with self._lock:
+            self._host(host).probing = False
+
+    def _open(self, entry, until):
+        entry.state = CIRCUIT_OPEN
+        entry.open_until = until
+        entry.probing = False
+
+    def _account(self, entry, elapsed):
+        entry.requests += 1
+        entry.elapsed += elapsed
+        entry.max_elapsed = max(entry.max_elapsed, elapsed)
+
+    def take_retry(self, host):
+        """Списать повтор из бюджета хоста; False - бюджет исчерпан"""
+        with self._lock:
+            entry = self._host(host)
+            if entry.state == CIRCUIT_OPEN:
+                return False
+            if entry.retries >= entry.requests * self.retry_ratio + self.retry_min:
+                return False
+            entry.retries += 1
+            return True
+
+    def _report(self, host, entry):
+        return {
+            'host': host,
+            'state': entry.state,
+            'requests': entry.requests,
+            'errors': entry.errors,
+            'retries': entry.retries,
+            'rejected': entry.rejected,
+            'avg_ms': round(entry.elapsed * 1000 / entry.requests, 1) if entry.requests else 0,
+            'max_ms': round(entry.max_elapsed * 1000, 1),
+            'last_error': entry.last_error
+        }
+
+    def report(self, hosts=None):
+        """Сводка по хостам (по всем или только по hosts), медленные первыми"""
+        with self._lock:
+            items = [(host, entry) for host, entry in self._hosts.items() if hosts is None or host in hosts]
+            rows = [self._report(host, entry) for host, entry in items]
+        return sorted(rows, key=lambda row: row['max_ms'], reverse=True)
+
+    def stats(self, limit=20):
+        rows = self.report()
+        return {
+            'hosts': len(rows),
+            'open': sum(1 for row in rows if row['state'] != CIRCUIT_CLOSED),
+            'slowest': rows[:limit]
+        }
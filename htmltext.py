@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Быстрое извлечение текста из HTML без построения дерева.
+
+Потоковый токенизатор html.parser: пропускаемые элементы (script, style,
+nav, ...) отбрасываются прямо при разборе, текст копится списком строк.
+Результат совпадает с BeautifulSoup(html, 'html.parser') + decompose()
++ get_text(separator=' ', strip=True): закрывающий тег закрывает
+ближайший открытый с тем же именем, пустые элементы не открываются,
+комментарии, doctype и содержимое template/rt/rp в текст не входят.
+
+Ответ читается потоком с лимитом байт (MAX_PAGE_BYTES): страница
+обрезается на лимите, а слишком сильно сжатый ответ (декомпрессионная
+бомба) отклоняется.
+
+Кодировка определяется по байтам, без угадывания requests по всему
+телу: заголовок Content-Type, BOM, <meta charset> в первых SNIFF_BYTES,
+и только затем детектор charset_normalizer на префиксе DETECT_BYTES.
+"""
+
+import codecs
+import os
+import re
+from email.message import Message
+from html.parser import HTMLParser
+
+try:
+    import charset_normalizer
+except ImportError:  # зависимость requests, но может отсутствовать
+    charset_normalizer = None
+
+# Лимит распакованного тела страницы (байты)
+MAX_PAGE_BYTES = int(os.environ.get('MAX_PAGE_BYTES', 5 * 1024 * 1024))
+# Максимальная степень сжатия ответа (распакованные / полученные байты)
+MAX_COMPRESSION_RATIO = int(os.environ.get('MAX_COMPRESSION_RATIO', 100))
+READ_CHUNK = 64 * 1024
+
+# Где искать <meta charset> и сколько байт отдавать детектору
+SNIFF_BYTES = 4096
+DETECT_BYTES = 64 * 1024
+DEFAULT_ENCODING = 'utf-8'
+
+# Способ определения кодировки (encoding_method в результате)
+CHARSET_HEADER = 'header'
+CHARSET_BOM = 'bom'
+CHARSET_META = 'meta'
+CHARSET_DETECTED = 'detected'
+CHARSET_DEFAULT = 'default'
+
+BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+META_CHARSET_RE = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+# Что удаляет check_url и что удаляет пакетная проверка
+PAGE_SKIP_TAGS = frozenset({'script', 'style', 'nav', 'footer', 'header'})
+BATCH_SKIP_TAGS = frozenset({'script', 'style'})
+
+# Строки внутри этих элементов BeautifulSoup не отдаёт в get_text()
+HIDDEN_STRING_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+
+# Разделитель абзацев в тексте, сохраняемом по абзацам (кэш страниц)
+BLOCK_SEPARATOR = '\n\n'
+
+# Блочные элементы - границы абзацев текста (extract_blocks)
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'table', 'tr', 'td', 'th', 'section', 'article', 'aside', 'main', 'header', 'footer',
+    'nav', 'blockquote', 'pre', 'figure', 'figcaption', 'address', 'form', 'br', 'hr'
+})
+
+# Пустые элементы (HTMLTreeBuilder.empty_element_tags) - не открываются
+VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+})
+
+
+def _codec_name(label):
+    """Каноническое имя кодека или None для неизвестной метки"""
+    try:
+        return codecs.lookup(label.strip()).name
+    except (LookupError, AttributeError):
+        return None
+
+
+def header_charset(content_type):
+    """Кодировка из заголовка Content-Type (без подстановки ISO-8859-1)"""
+    if not content_type:
+        return None
+    message = Message()
+    message['content-type'] = content_type
+    return _codec_name(message.get_content_charset() or '')
+
+
+def sniff_charset(head):
+    """(кодировка, способ) по началу тела: BOM, <meta>, детектор, умолчание"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, CHARSET_BOM
+    match = META_CHARSET_RE.search(head[:SNIFF_BYTES])
+    if match:
+        encoding = _codec_name(match.group(1).decode('ascii'))
+        if encoding is not None:
+            # utf-16 в <meta> ASCII-совместимого документа означает utf-8
+            return ('utf-8' if encoding.startswith('utf-16') else encoding), CHARSET_META
+    if charset_normalizer is not None and head:
+        best = charset_normalizer.from_bytes(head[:DETECT_BYTES]).best()
+        if best is not None and _codec_name(best.encoding):
+            return _codec_name(best.encoding), CHARSET_DETECTED
+    return DEFAULT_ENCODING, CHARSET_DEFAULT
+
+
+def page_charset(content_type, head):
+    """(кодировка, способ): заголовок, затем sniff_charset по началу тела"""
+    encoding = header_charset(content_type)
+    if encoding is not None:
+        return encoding, CHARSET_HEADER
+    return sniff_charset(head)
+
+
+def decode_page(body, content_type=None):
+    """(текст, кодировка, способ) для тела страницы в байтах"""
+    encoding, method = page_charset(content_type, body[:DETECT_BYTES])
+    return body.decode(encoding, errors='replace'), encoding, method
+
+
+class PageTooLarge(Exception):
+    """Ответ похож на декомпрессионную бомбу"""
+
+
+class TextExtractor(HTMLParser):
+    """Текст страницы и первый title за один проход токенизатора"""
+
+    def __init__(self, skip_tags=PAGE_SKIP_TAGS, collect_links=False, collect_blocks=False):
+        super().__init__(convert_charrefs=True)
+        self.hidden_tags = frozenset(skip_tags) | HIDDEN_STRING_TAGS
+        self.parts = []
+        self.title = None
+        # Текст между тегами приходит кусками (границы feed) - склеиваем
+        self._data = []
+        # Открытые элементы и сколько из них скрывают текст
+        self._stack = []
+        self._hidden = 0
+        self._title_depth = None
+        self._title_parts = None
+        # href ссылок <a> в порядке появления (для обхода сайта)
+        self.links = [] if collect_links else None
+        # Индексы parts, с которых начинаются абзацы (блочные элементы)
+        self.breaks = [] if collect_blocks else None
+
+    def _flush(self):
+        # Как endData: соседние куски текста - одна строка
+        if self._data:
+            data = ''.join(self._data).strip()
+            self._data = []
+            if data:
+                self.parts.append(data)
+
+    def _block_break(self):
+        if not self.breaks or self.breaks[-1] != len(self.parts):
+            self.breaks.append(len(self.parts))
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if self.breaks is not None and tag in BLOCK_TAGS:
+            self._block_break()
+        if tag == 'a' and self.links is not None:
+            href = dict(attrs).get('href')
+            if href:
+                self.links.append(href)
+        if tag in VOID_TAGS:
+            return
+        self._stack.append(tag)
+        if tag in self.hidden_tags:
+            self._hidden += 1
+        elif tag == 'title' and self.title is None and self._title_depth is None and not self._hidden:
+            self._title_depth = len(self._stack)
+            self._title_parts = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if self.breaks is not None and tag in BLOCK_TAGS:
+            self._block_break()
+        # Как _popToTag: закрываем до ближайшего открытого с тем же именем
+        for position in range(len(self._stack) - 1, -1, -1):
+            if self._stack[position] == tag:
+                break
+        else:
+            return
+        for name in self._stack[position:]:
+            if name in self.hidden_tags:
+                self._hidden -= 1
+        del self._stack[position:]
+        if self._title_depth is not None and len(self._stack) < self._title_depth:
+            self.title = ''.join(self._title_parts)
+            self._title_depth = self._title_parts = None
+
+    def handle_data(self, data):
+        if self._hidden:
+            return
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        self._data.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # <![CDATA[...]]> - в BeautifulSoup это CData, входит в get_text()
+        if data.startswith('CDATA['):
+            self.handle_data(data[6:])
+            self._flush()
+
+    def result(self):
+        self.close()
+        self._flush()
+        if self._title_parts is not None:
+            # title не закрыт до конца документа
+            self.title = ''.join(self._title_parts)
+        return ' '.join(self.parts)
+
+    def blocks(self):
+        """Текст по абзацам (после result): ' '.join(blocks) == result()"""
+        bounds = [0] + (self.breaks or []) + [len(self.parts)]
+        return [' '.join(self.parts[start:end]) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def extract_text(html, skip_tags=PAGE_SKIP_TAGS):
+    """(текст, title или None) из готовой строки HTML"""
+    extractor = TextExtractor(skip_tags)
+    extractor.feed(html)
+    return extractor.result(), extractor.title
+
+
+def extract_blocks(html, skip_tags=PAGE_SKIP_TAGS, links=False):
+    """(абзацы текста, title или None, href ссылок или None) из строки HTML"""
+    extractor = TextExtractor(skip_tags, collect_links=links, collect_blocks=True)
+    extractor.feed(html)
+    extractor.result()
+    return extractor.blocks(), extractor.title, extractor.links
+
+
+def _read_capped(response, max_bytes, info):
+    """Куски тела ответа не больше max_bytes в сумме, с защитой от бомб"""
+    received = 0
+    for chunk in response.iter_content(READ_CHUNK):
+        if received + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - received]
+            info['page_truncated'] = True
+        received += len(chunk)
+        # Сколько сжатых байт уже прочитано из сокета
+        wire = response.raw.tell() if hasattr(response.raw, 'tell') else 0
+        if wire and received > READ_CHUNK and received > wire * MAX_COMPRESSION_RATIO:
+            raise PageTooLarge(f"Степень сжатия ответа больше {MAX_COMPRESSION_RATIO}:1")
+        yield chunk
+        if info['page_truncated']:
+            return
+
+
+def read_page_bytes(response, max_bytes=MAX_PAGE_BYTES):
+    """Тело ответа requests (stream=True) не больше max_bytes: (байты, сведения).
+
+    Лимит и защита от бомб - как у read_page_text; в сведениях
+    page_truncated - обрезано ли тело по лимиту.
+    """
+    info = {'page_truncated': False}
+    try:
+        body = b''.join(_read_capped(response, max_bytes, info))
+    finally:
+        response.close()
+    return body, info
+
+
+def read_page_text(response, skip_tags=PAGE_SKIP_TAGS, max_bytes=MAX_PAGE_BYTES):
+    """Потоковое извлечение текста из ответа requests (stream=True).
+
+    Возвращает (текст, title или None, сведения о странице): обрезана ли
+    по лимиту, кодировка и способ её определения. Без charset в заголовке
+    буферизуется только начало тела; дальше текст декодируется и
+    разбирается по мере чтения.
+    """
+    extractor = TextExtractor(skip_tags)
+    info = {'page_truncated': False}
+    try:
+        chunks = _read_capped(response, max_bytes, info)
+        head = bytearray()
+        encoding = header_charset(response.headers.get('Content-Type'))
+        if encoding is not None:
+            method = CHARSET_HEADER
+        else:
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= DETECT_BYTES:
+                    break
+            encoding, method = sniff_charset(bytes(head))
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        extractor.feed(decoder.decode(bytes(head)))
+        for chunk in chunks:
+            extractor.feed(decoder.decode(chunk))
+        extractor.feed(decoder.decode(b'', final=True))
+    finally:
+        response.close()
+    info['page_encoding'] = encoding
+    info['encoding_method'] = method
+    return extractor.result(), extractor.title, info
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Дисковый кэш загруженных страниц с условной перепроверкой.
+
+Хранится не HTML, а уже извлечённый текст (и title, кодировка) вместе
+с ETag/Last-Modified. Повторная загрузка идёт с If-None-Match /
+If-Modified-Since: на 304 нет ни скачивания, ни разбора HTML.
+
+PAGE_CACHE_MAX_AGE - сколько секунд после проверки запись отдаётся без
+запроса к серверу (0 - перепроверять всегда); PAGE_CACHE_MAX_STALE -
+сколько секунд запись живёт и может выручить при ошибке сервера;
+PAGE_CACHE_MAX_BYTES - лимит текста в кэше, сверх него вытесняются
+давно не использованные записи (0 - кэш выключен).
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+PAGE_CACHE_DB = os.environ.get('PAGE_CACHE_DB', str(Path(__file__).parent / 'page_cache.sqlite3'))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+PAGE_CACHE_MAX_AGE = float(os.environ.get('PAGE_CACHE_MAX_AGE', 0))
+PAGE_CACHE_MAX_STALE = float(os.environ.get('PAGE_CACHE_MAX_STALE', 86400))
+
+# Состояние кэша для страницы (cache.status в результате)
+CACHE_MISS = 'miss'          # записи не было - страница загружена
+CACHE_UPDATED = 'updated'    # запись была, сервер отдал новую страницу
+CACHE_HIT = 'hit'            # запись свежая - запроса к серверу не было
+CACHE_REVALIDATED = 'revalidated'  # сервер ответил 304
+CACHE_STALE = 'stale'        # сервер недоступен - отдана старая запись
+CACHE_BYPASS = 'bypass'      # ответ не кэшируется (не 200)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL,
+    title TEXT,
+    info TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    validated_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (url, kind)
+);
+CREATE INDEX IF NOT EXISTS pages_used ON pages (used_at);
+"""
+
+
+class PageCache:
+    """Текст страниц по (URL, вид извлечения) в SQLite"""
+
+    def __init__(self, path=PAGE_CACHE_DB, max_bytes=PAGE_CACHE_MAX_BYTES,
+                 max_age=PAGE_CACHE_MAX_AGE, max_stale=PAGE_CACHE_MAX_STALE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_stale = max_stale
+        if self.enabled:
+            with self._connect() as db:
+                db.execute('PRAGMA journal_mode=WAL')
+                db.executescript(SCHEMA)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @contextmanager
+    def _connect(self):
+        # Соединения не переживают fork и не делятся между потоками
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.row_factory = sqlite3.Row
+            with db:
+                yield db
+
+    def _get(self, url, kind):
+        with self._connect() as db:
+            return db.execute('SELECT * FROM pages WHERE url = ? AND kind = ?', (url, kind)).fetchone()
+
+    def _touch(self, url, kind, validated=False):
+        now = time.time()
+        with self._connect() as db:
+            if validated:
+                db.execute('UPDATE pages SET used_at = ?, validated_at = ? WHERE url = ? AND kind = ?',
+                           (now, now, url, kind))
+            else:
+                db.execute('UPDATE pages SET used_at = ? WHERE url = ? AND kind = ?', (now, url, kind))
+
+    def _store(self, url, kind, text, title, info, etag, last_modified):
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       (url, kind, text, title, json.dumps(info), etag, last_modified,
+                        size, now, now, now))
+            self._evict(db, now)
+
+    def _evict(self, db, now):
+        """Удаление просроченных и вытеснение давно не использованных записей"""
+        db.execute('DELETE FROM pages WHERE validated_at < ?', (now - self.max_stale,))
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for row in db.execute('SELECT url, kind, size FROM pages ORDER BY used_at'):
+            if total <= self.max_bytes:
+                break
+            victims.append((row['url'], row['kind']))
+            total -= row['size']
+        db.executemany('DELETE FROM pages WHERE url = ? AND kind = ?', victims)
+
+    def _cached(self, entry, status, now):
+        return (entry['text'], entry['title'], json.loads(entry['info']),
+                {'status': status, 'age': round(now - entry['fetched_at'], 1)})
+
+    def fetch(self, url, kind, get, load):
+        """Текст страницы через кэш.
+
+        get(headers) выполняет GET с дополнительными заголовками,
+        load(response) извлекает из ответа (текст, title, сведения).
+        Возвращает (текст, title, сведения, {'status', 'age'}).
+        """
+        if not self.enabled:
+            text, title, info = load(get({}))
+            return text, title, info, {'status': CACHE_BYPASS, 'age': 0}
+
+        entry = self._get(url, kind)
+        now = time.time()
+        if entry is not None and now - entry['validated_at'] > self.max_stale:
+            entry = None
+        if entry is not None and now - entry['validated_at'] <= self.max_age:
+            self._touch(url, kind)
+            return self._cached(entry, CACHE_HIT, now)
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = get(headers)
+        except Exception:
+            if entry is None:
+                raise
+            self._touch(url, kind)
+            return self._cached(entry, CACHE_STALE, now)
+
+        if entry is not None and (response.status_code == 304 or response.status_code >= 500):
+            response.close()
+            revalidated = response.status_code == 304
+            self._touch(url, kind, validated=revalidated)
+            return self._cached(entry, CACHE_REVALIDATED if revalidated else CACHE_STALE, now)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        text, title, info = load(response)
+        if response.status_code != 200 or not (etag or last_modified or self.max_age > 0):
+            return text, title, info, {'status': CACHE_BYPASS, 'age': 0}
+        self._store(url, kind, text, title, info, etag, last_modified)
+        return text, title, info, {'status': CACHE_UPDATED if entry is not None else CACHE_MISS, 'age': 0}
+
+    def stats(self):
+        if not self.enabled:
+            return {'enabled': False}
+        with self._connect() as db:
+            entries, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages').fetchone()
+        return {
+            'enabled': True,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'max_age': self.max_age,
+            'max_stale': self.max_stale
+        }
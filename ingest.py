@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Проверка архивов сайтов без обращения к живому сайту.
+
+Источники: WARC (.warc, .warc.gz), zip-архив зеркала, каталог с HTML.
+Записи читаются потоком по одной: в памяти только текущая страница
+(не больше MAX_PAGE_BYTES), чужие записи (картинки, скрипты, revisit)
+пропускаются без чтения тела, где поток позволяет seek.
+
+HTML идёт тем же путём, что и пакетная проверка (CheckPool: определение
+кодировки, извлечение текста по абзацам, вердикты абзацев с кэшем -
+повторяющиеся шапки и подвалы сайта проверяются один раз). Разбор и
+проверка - в пуле процессов, результаты - JSON Lines по мере готовности.
+
+    python ingest.py site.warc.gz -o results.jsonl
+    python ingest.py mirror.zip --base-url https://example.com/ --processes 8
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from htmltext import MAX_PAGE_BYTES
+
+try:
+    import brotli
+except ImportError:  # Content-Encoding: br в WARC встречается редко
+    brotli = None
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+READ_CHUNK = 1024 * 1024
+# Файлы зеркал, которые считаются HTML (без расширения - по началу файла)
+HTML_EXTENSIONS = frozenset({'.html', '.htm', '.xhtml', '.shtml'})
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+HTML_SNIFF = (b'<!doctype html', b'<html')
+
+# Страница из архива: тело уже ограничено MAX_PAGE_BYTES
+Page = namedtuple('Page', 'url content_type body info')
+
+
+class ArchiveError(Exception):
+    """Файл не является архивом поддерживаемого формата"""
+
+
+def is_html(content_type):
+    return bool(content_type) and content_type.split(';', 1)[0].strip().lower() in HTML_TYPES
+
+
+def looks_like_html(head):
+    return head.lstrip()[:64].lower().startswith(HTML_SNIFF)
+
+
+class _Block:
+    """Окно потока на length байт: чтение, строки и пропуск остатка"""
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, limit=65536):
+        line = self.stream.readline(min(limit, self.remaining))
+        self.remaining -= len(line)
+        return line
+
+    def skip(self):
+        if self.remaining <= 0:
+            return
+        if self.stream.seekable() and not isinstance(self.stream, gzip.GzipFile):
+            self.stream.seek(self.remaining, os.SEEK_CUR)
+            self.remaining = 0
+            return
+        while self.remaining > 0 and self.read(READ_CHUNK):
+            pass
+
+
+def _read_headers(stream):
+    """Заголовки до пустой строки: {имя в нижнем регистре: значение}"""
+    headers = {}
+    while True:
+        line = stream.readline()
+        if not line or not line.strip():
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+def _read_capped(read, info):
+    """Тело из read(n) не больше MAX_PAGE_BYTES (с отметкой page_truncated)"""
+    body = read(MAX_PAGE_BYTES + 1)
+    info['page_truncated'] = len(body) > MAX_PAGE_BYTES
+    return body[:MAX_PAGE_BYTES]
+
+
+def _dechunk(block):
+    """Куски тела с Transfer-Encoding: chunked (если оно действительно такое)"""
+    while block.remaining > 0:
+        line = block.readline()
+        try:
+            size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            # Запись уже без chunked, а заголовок остался - тело как есть
+            yield line
+            yield from iter(lambda: block.read(READ_CHUNK), b'')
+            return
+        if size == 0:
+            return
+        while size > 0:
+            chunk = block.read(min(size, READ_CHUNK))
+            if not chunk:
+                return
+            size -= len(chunk)
+            yield chunk
+        block.readline()
+
+
+def _bounded(decompressor):
+    return lambda data: decompressor.decompress(data, MAX_PAGE_BYTES + 1)
+
+
+def _decode_content(chunks, encoding, info):
+    """Распаковка Content-Encoding с лимитом MAX_PAGE_BYTES на результат"""
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        # 47: zlib или gzip по заголовку; выход за вызов не больше лимита страницы
+        decompress = _bounded(zlib.decompressobj(47))
+    elif encoding == 'br':
+        if brotli is None:
+            raise ArchiveError("Content-Encoding: br - нужен пакет brotli")
+        decompress = brotli.Decompressor().process
+    elif encoding in ('', 'identity'):
+        decompress = None
+    else:
+        raise ArchiveError(f"Неизвестный Content-Encoding: {encoding}")
+    body = bytearray()
+    for chunk in chunks:
+        if decompress is not None:
+            try:
+                chunk = decompress(chunk)
+            except zlib.error:
+                if body or encoding != 'deflate':
+                    raise
+                # deflate без обёртки zlib (так отдают некоторые серверы)
+                decompress = _bounded(zlib.decompressobj(-zlib.MAX_WBITS))
+                chunk = decompress(chunk)
+        body += chunk
+        if len(body) > MAX_PAGE_BYTES:
+            info['page_truncated'] = True
+            return bytes(body[:MAX_PAGE_BYTES])
+    info['page_truncated'] = False
+    return bytes(body)
+
+
+def iter_warc(path):
+    """(заголовки WARC, _Block тела) по записям; несжатый или .gz по записям"""
+    with open(path, 'rb') as raw:
+        gzipped = raw.read(2) == b'\x1f\x8b'
+    stream = gzip.open(path, 'rb') if gzipped else open(path, 'rb')
+    with stream:
+        while True:
+            line = stream.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b'WARC/'):
+                raise ArchiveError(f"{path}: ожидалась запись WARC, получено {line[:40]!r}")
+            headers = _read_headers(stream)
+            block = _Block(stream, int(headers.get('content-length', 0)))
+            try:
+                yield headers, block
+            finally:
+                block.skip()
+
+
+def warc_pages(path, stats):
+    """HTML-страницы WARC: ответы 2xx (response) и сохранённые файлы (resource)"""
+    for headers, block in iter_warc(path):
+        stats['records'] += 1
+        kind = headers.get('warc-type')
+        url = headers.get('warc-target-uri', '').strip('<>')
+        info = {'warc_date': headers.get('warc-date')}
+        if kind == 'response' and headers.get('content-type', '').startswith('application/http'):
+            status_line = block.readline().split(None, 2)
+            http = _read_headers(block)
+            status = int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+            content_type = http.get('content-type')
+            if not 200 <= status < 300 or not is_html(content_type):
+                stats['skipped'] += 1
+                continue
+            chunks = (_dechunk(block) if 'chunked' in http.get('transfer-encoding', '').lower()
+                      else iter(lambda: block.read(READ_CHUNK), b''))
+            try:
+                body = _decode_content(chunks, http.get('content-encoding', '').strip().lower(), info)
+            except (ArchiveError, zlib.error) as e:
+                stats['errors'] += 1
+                yield Page(url, content_type, None, dict(info, error=str(e)))
+                continue
+        elif kind == 'resource' and is_html(headers.get('content-type')):
+            content_type = headers.get('content-type')
+            body = _read_capped(block.read, info)
+        else:
+            stats['skipped'] += 1
+            continue
+        yield Page(url, content_type, body, info)
+
+
+def file_url(relpath, base_url=None):
+    """URL файла зеркала: base_url + путь, или хост из первого каталога (wget -m)"""
+    relpath = relpath.replace(os.sep, '/').lstrip('/')
+    if base_url:
+        return base_url.rstrip('/') + '/' + quote(relpath)
+    host = relpath.split('/', 1)[0]
+    if '.' in host and ' ' not in host and os.path.splitext(host)[1].lower() not in HTML_EXTENSIONS:
+        return 'http://' + quote(relpath)
+    return relpath
+
+
+def _file_page(name, opener, base_url, stats):
+    """Page файла зеркала или None (не HTML)"""
+    stats['records'] += 1
+    extension = os.path.splitext(name)[1].lower()
+    if extension and extension not in HTML_EXTENSIONS:
+        stats['skipped'] += 1
+        return None
+    info = {}
+    with opener() as stream:
+        body = _read_capped(stream.read, info)
+    if not extension and not looks_like_html(body[:1024]):
+        stats['skipped'] += 1
+        return None
+    return Page(file_url(name, base_url), None, body, info)
+
+
+def zip_pages(path, base_url, stats):
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            page = _file_page(member.filename, lambda: archive.open(member), base_url, stats)
+            if page is not None:
+                yield page
+
+
+def directory_pages(path, base_url, stats):
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            page = _file_page(os.path.relpath(full, path), lambda: open(full, 'rb'), base_url, stats)
+            if page is not None:
+                yield page
+
+
+def archive_pages(path, stats, base_url=None):
+    """Страницы архива любого поддерживаемого вида"""
+    if os.path.isdir(path):
+        return directory_pages(path, base_url, stats)
+    if zipfile.is_zipfile(path):
+        return zip_pages(path, base_url, stats)
+    return warc_pages(path, stats)
+
+
+def ingest(paths, out, check_pool, workers, base_url=None, boilerplate=None):
+    """Проверка страниц архивов с записью JSON Lines в out; возвращает счётчики.
+
+    Архив читается в этом потоке, проверка - в workers потоках, которые
+    отдают разбор и классификацию пулу процессов check_pool. Очередь
+    ограничена, поэтому в памяти не больше 2 * workers страниц.
+    """
+    stats = {'records': 0, 'skipped': 0, 'checked': 0, 'errors': 0}
+    lock = threading.Lock()
+    window = threading.BoundedSemaphore(workers * 2)
+
+    def write(record):
+        line = json.dumps(record, ensure_ascii=False)
+        with lock:
+            out.write(line + '\n')
+
+    def check(page, source):
+        try:
+            result = check_pool.check_body(page.body, page.content_type)
+            blocks = result.pop('blocks')
+            result.update((key, value) for key, value in page.info.items() if value is not None)
+            with lock:
+                stats['checked'] += 1
+                if boilerplate is not None:
+                    boilerplate.add(page.url, blocks)
+            write({'url': page.url, 'success': True, 'result': result, 'source': source})
+        except Exception as e:
+            with lock:
+                stats['errors'] += 1
+            write({'url': page.url, 'success': False, 'error': str(e), 'source': source})
+        finally:
+            window.release()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+        for path in paths:
+            source = os.path.basename(os.path.normpath(path))
+            for page in archive_pages(path, stats, base_url):
+                if page.body is None:
+                    write({'url': page.url, 'success': False, 'error': page.info['error'], 'source': source})
+                    continue
+                window.acquire()
+                executor.submit(check, page, source)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проверка архивов сайтов (WARC, zip, каталог) в JSON Lines")
+    parser.add_argument('paths', nargs='+', help="файлы .warc/.warc.gz/.zip или каталоги")
+    parser.add_argument('-o', '--output', default='-', help="файл результатов (по умолчанию stdout)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="процессов разбора и проверки (0 - в потоках)")
+    parser.add_argument('--base-url', help="URL корня для файлов zip/каталога")
+    parser.add_argument('--boilerplate', metavar='FILE',
+                        help="отчёт об общих абзацах сайтов (JSON)")
+    args = parser.parse_args(argv)
+
+    from boilerplate import Boilerplate
+    from checker import RussianLanguageChecker
+    from checkpool import CheckPool
+
+    check_pool = CheckPool(RussianLanguageChecker(), args.processes)
+    boilerplate = Boilerplate() if args.boilerplate else None
+    workers = max(args.processes, 1) * 2
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    started = time.perf_counter()
+    try:
+        stats = ingest(args.paths, out, check_pool, workers, args.base_url, boilerplate)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        check_pool.shutdown()
+    elapsed = time.perf_counter() - started
+    if boilerplate is not None:
+        with open(args.boilerplate, 'w', encoding='utf-8') as f:
+            json.dump(boilerplate.report(), f, ensure_ascii=False, indent=2)
+    size = sum(os.path.getsize(path) for path in args.paths if os.path.isfile(path))
+    print(f"Записей: {stats['records']}, проверено страниц: {stats['checked']}, пропущено: {stats['skipped']}, "
+          f"ошибок: {stats['errors']}; {elapsed:.1f} с, {stats['checked'] / elapsed if elapsed else 0:.1f} стр/с"
+          + (f", {size / elapsed / 1024 / 1024:.1f} МБ/с" if size and elapsed else ''), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    sys.exit(main())
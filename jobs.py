@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Фоновые задания аудита больших списков URL.
+
+Задание и результаты каждого URL хранятся в SQLite (JOBS_DB), поэтому
+переживают перезапуск воркеров: обработчик берёт задание в аренду
+(lease) и продлевает её после каждой порции URL. Если процесс умер,
+аренда истекает и задание продолжает другой обработчик - с первого
+непроверенного URL.
+
+Обработчик по умолчанию - отдельный процесс python jobs.py (worker в
+Procfile, вместе с мониторингом страниц), чтобы не делить CPU с
+HTTP-воркерами и не запускаться в каждом из них. JOBS_INLINE=1 -
+обработчик в каждом процессе приложения.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from boilerplate import BOILERPLATE_MIN_PAGES, Boilerplate
+from fetcher import url_host
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+JOBS_DB = os.environ.get('JOBS_DB', str(Path(__file__).parent / 'jobs.sqlite3'))
+# Максимум URL в одном задании
+JOBS_MAX_URLS = int(os.environ.get('JOBS_MAX_URLS', 10000))
+# URL за одну порцию (между проверками отмены и продлением аренды)
+JOBS_CHUNK = int(os.environ.get('JOBS_CHUNK', 50))
+# Аренда задания обработчиком (секунды) - больше времени одной порции
+JOBS_LEASE = float(os.environ.get('JOBS_LEASE', 300))
+# Пауза между опросами очереди (секунды)
+JOBS_POLL = float(os.environ.get('JOBS_POLL', 2))
+
+# Состояния задания
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+JOB_FAILED = 'failed'
+
+# Виды заданий: готовый список URL или обход сайта (crawler.py)
+KIND_URLS = 'urls'
+KIND_CRAWL = 'crawl'
+
+# Состояния URL в задании
+URL_PENDING = 'pending'
+URL_DONE = 'done'
+URL_FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL,
+    error TEXT,
+    kind TEXT NOT NULL DEFAULT 'urls',
+    root TEXT,
+    options TEXT
+);
+CREATE TABLE IF NOT EXISTS job_urls (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    blocks TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE TABLE IF NOT EXISTS job_blocks (
+    job_id TEXT NOT NULL,
+    host TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    violations TEXT,
+    PRIMARY KEY (job_id, host, digest)
+);
+CREATE INDEX IF NOT EXISTS job_urls_pending ON job_urls (job_id, status, idx);
+CREATE INDEX IF NOT EXISTS job_urls_url ON job_urls (job_id, url);
+"""
+
+# Колонки, добавленные после первой версии схемы
+MIGRATIONS = (
+    ('jobs', 'kind', "ALTER TABLE jobs ADD COLUMN kind TEXT NOT NULL DEFAULT 'urls'"),
+    ('jobs', 'root', 'ALTER TABLE jobs ADD COLUMN root TEXT'),
+    ('jobs', 'options', 'ALTER TABLE jobs ADD COLUMN options TEXT'),
+    ('job_urls', 'blocks', 'ALTER TABLE job_urls ADD COLUMN blocks TEXT'),
+)
+
+
+class JobError(Exception):
+    """Недопустимая операция с заданием"""
+
+
+class JobStore:
+    """Задания и их результаты в SQLite (одно соединение на операцию)"""
+
+    def __init__(self, path=JOBS_DB):
+        self.path = path
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            for table, column, statement in MIGRATIONS:
+                columns = {row['name'] for row in db.execute(f'PRAGMA table_info({table})')}
+                if columns and column not in columns:
+                    db.execute(statement)
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Соединения не переживают fork и не делятся между потоками
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.row_factory = sqlite3.Row
+            with db:
+                yield db
+
+    def create(self, urls):
+        """Новое задание в очереди; возвращает его описание"""
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            raise JobError("urls должен быть списком строк")
+        if not urls:
+            raise JobError("Список URL пуст")
+        if len(urls) > JOBS_MAX_URLS:
+            raise JobError(f"Слишком много URL: {len(urls)}, максимум {JOBS_MAX_URLS}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute('INSERT INTO jobs (id, status, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                       (job_id, JOB_QUEUED, len(urls), now, now))
+            db.executemany('INSERT INTO job_urls (job_id, idx, url, status) VALUES (?, ?, ?, ?)',
+                           ((job_id, index, url, URL_PENDING) for index, url in enumerate(urls)))
+        return self.get(job_id)
+
+    def create_crawl(self, root, options):
+        """Задание обхода сайта: URL добавляются обработчиком по мере обхода"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute('INSERT INTO jobs (id, status, total, created_at, updated_at, kind, root, options) '
+                       'VALUES (?, ?, 0, ?, ?, ?, ?, ?)',
+                       (job_id, JOB_QUEUED, now, now, KIND_CRAWL, root, json.dumps(options)))
+        return self.get(job_id)
+
+    def add_urls(self, job_id, urls, limit):
+        """Добавление новых URL без повторов, всего не больше limit; число добавленных"""
+        added = 0
+        with self._connect() as db:
+            # BEGIN IMMEDIATE - номера idx от total без гонки между потоками обхода
+            db.execute('BEGIN IMMEDIATE')
+            total = db.execute('SELECT total FROM jobs WHERE id = ?', (job_id,)).fetchone()['total']
+            for url in urls:
+                if total >= limit:
+                    break
+                if db.execute('SELECT 1 FROM job_urls WHERE job_id = ? AND url = ?', (job_id, url)).fetchone():
+                    continue
+                db.execute('INSERT INTO job_urls (job_id, idx, url, status) VALUES (?, ?, ?, ?)',
+                           (job_id, total, url, URL_PENDING))
+                total += 1
+                added += 1
+            db.execute('UPDATE jobs SET total = ?, updated_at = ? WHERE id = ?', (total, time.time(), job_id))
+        return added
+
+    def options(self, job_id):
+        with self._connect() as db:
+            row = db.execute('SELECT options FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return json.loads(row['options']) if row and row['options'] else {}
+
+    def set_options(self, job_id, options):
+        with self._connect() as db:
+            db.execute('UPDATE jobs SET options = ? WHERE id = ?', (json.dumps(options), job_id))
+
+    def get(self, job_id):
+        """Состояние задания со счётчиками или None"""
+        with self._connect() as db:
+            job = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(db.execute('SELECT status, COUNT(*) FROM job_urls WHERE job_id = ? GROUP BY status',
+                                     (job_id,)).fetchall())
+        completed = counts.get(URL_DONE, 0) + counts.get(URL_FAILED, 0)
+        return {
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'root': job['root'],
+            'status': job['status'],
+            'total': job['total'],
+            'completed': completed,
+            'successful': counts.get(URL_DONE, 0),
+            'failed': counts.get(URL_FAILED, 0),
+            'pending': counts.get(URL_PENDING, 0),
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'finished_at': job['finished_at'],
+            'error': job['error']
+        }
+
+    def results(self, job_id, offset=0, limit=100, strip_boilerplate=True):
+        """Страница проверенных URL в порядке списка задания.
+
+        strip_boilerplate - нарушения из общих абзацев сайта исключаются
+        из результатов страниц (они - в отчёте boilerplate).
+        """
+        with self._connect() as db:
+            rows = db.execute('SELECT idx, url, status, result, error, blocks FROM job_urls '
+                              'WHERE job_id = ? AND status != ? ORDER BY idx LIMIT ? OFFSET ?',
+                              (job_id, URL_PENDING, limit, offset)).fetchall()
+        boilerplate = self.boilerplate(job_id) if strip_boilerplate and rows else None
+        records = []
+        for row in rows:
+            if row['status'] == URL_DONE:
+                result = json.loads(row['result'])
+                if boilerplate is not None and row['blocks']:
+                    result = boilerplate.strip(row['url'], result, json.loads(row['blocks']))
+                records.append({'index': row['idx'], 'url': row['url'], 'success': True,
+                                'result': result})
+            else:
+                records.append({'index': row['idx'], 'url': row['url'], 'success': False,
+                                'error': row['error']})
+        return records
+
+    def boilerplate(self, job_id, min_pages=BOILERPLATE_MIN_PAGES):
+        """Общие абзацы проверенных страниц задания по хостам"""
+        boilerplate = Boilerplate(min_pages)
+        with self._connect() as db:
+            pages = Counter(url_host(row['url']) for row in db.execute(
+                'SELECT url FROM job_urls WHERE job_id = ? AND status = ? AND blocks IS NOT NULL',
+                (job_id, URL_DONE)))
+            rows = db.execute('SELECT host, digest, pages, violations FROM job_blocks '
+                              'WHERE job_id = ? AND pages >= ?', (job_id, boilerplate.min_pages)).fetchall()
+        counts, violations = {}, {}
+        for row in rows:
+            counts.setdefault(row['host'], {})[row['digest']] = row['pages']
+            if row['violations']:
+                violations[row['digest']] = json.loads(row['violations'])
+        for host, host_counts in counts.items():
+            boilerplate.add_counts(host, pages[host], host_counts, violations)
+        return boilerplate
+
+    def cancel(self, job_id):
+        """Отмена: обработчик остановится после текущей порции"""
+        return self._transition(job_id, (JOB_QUEUED, JOB_RUNNING), JOB_CANCELLED)
+
+    def resume(self, job_id):
+        """Возврат отменённого или упавшего задания в очередь"""
+        return self._transition(job_id, (JOB_CANCELLED, JOB_FAILED), JOB_QUEUED)
+
+    def _transition(self, job_id, allowed, status):
+        with self._connect() as db:
+            job = db.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                return None
+            if job['status'] not in allowed:
+                raise JobError(f"Задание в состоянии {job['status']}")
+            db.execute('UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, error = NULL, '
+                       'finished_at = NULL, updated_at = ? WHERE id = ?', (status, time.time(), job_id))
+        return self.get(job_id)
+
+    def claim(self, owner, lease=JOBS_LEASE):
+        """Аренда самого старого задания в очереди или с истёкшей арендой"""
+        now = time.time()
+        with self._connect() as db:
+            # BEGIN IMMEDIATE - выбор и захват без гонки между процессами
+            db.execute('BEGIN IMMEDIATE')
+            job = db.execute('SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) '
+                             'ORDER BY created_at LIMIT 1', (JOB_QUEUED, JOB_RUNNING, now)).fetchone()
+            if job is None:
+                return None
+            db.execute('UPDATE jobs SET status = ?, owner = ?, lease_until = ?, updated_at = ? WHERE id = ?',
+                       (JOB_RUNNING, owner, now + lease, now, job['id']))
+        return job['id']
+
+    def renew(self, job_id, owner, lease=JOBS_LEASE):
+        """Продление аренды; False - задание отменено или перехвачено"""
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute('UPDATE jobs SET lease_until = ?, updated_at = ? '
+                                'WHERE id = ? AND owner = ? AND status = ?',
+                                (now + lease, now, job_id, owner, JOB_RUNNING))
+        return cursor.rowcount == 1
+
+    def pending(self, job_id, limit=JOBS_CHUNK):
+        with self._connect() as db:
+            return [tuple(row) for row in db.execute(
+                'SELECT idx, url FROM job_urls WHERE job_id = ? AND status = ? ORDER BY idx LIMIT ?',
+                (job_id, URL_PENDING, limit))]
+
+    def save_result(self, job_id, index, result, error):
+        """Итог URL; абзацы страницы (result['blocks']) учитываются в job_blocks"""
+        with self._connect() as db:
+            if error is None:
+                blocks = result.pop('blocks', None)
+                db.execute('UPDATE job_urls SET status = ?, result = ?, blocks = ? WHERE job_id = ? AND idx = ?',
+                           (URL_DONE, json.dumps(result, ensure_ascii=False),
+                            json.dumps(blocks) if blocks else None, job_id, index))
+                if blocks:
+                    self._count_blocks(db, job_id, index, blocks)
+            else:
+                db.execute('UPDATE job_urls SET status = ?, error = ? WHERE job_id = ? AND idx = ?',
+                           (URL_FAILED, str(error), job_id, index))
+
+    def _count_blocks(self, db, job_id, index, blocks):
+        url = db.execute('SELECT url FROM job_urls WHERE job_id = ? AND idx = ?', (job_id, index)).fetchone()['url']
+        host = url_host(url)
+        violations = blocks['violations']
+        db.executemany('INSERT INTO job_blocks VALUES (?, ?, ?, 1, ?) '
+                       'ON CONFLICT (job_id, host, digest) DO UPDATE SET pages = pages + 1',
+                       ((job_id, host, digest,
+                         json.dumps(violations[digest], ensure_ascii=False) if digest in violations else None)
+                        for digest in set(blocks['digests'])))
+
+    def finish(self, job_id, owner, status=JOB_DONE, error=None):
+        now = time.time()
+        with self._connect() as db:
+            db.execute('UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_until = NULL, '
+                       'finished_at = ?, updated_at = ? WHERE id = ? AND owner = ? AND status = ?',
+                       (status, error, now, now, job_id, owner, JOB_RUNNING))
+
+
+class JobRunner:
+    """Фоновый обработчик очереди: одно задание за раз, URL - через BatchFetcher"""
+
+    def __init__(self, store, fetcher, process, crawler=None, poll=JOBS_POLL):
+        self.store = store
+        self.fetcher = fetcher
+        self.process = process
+        # SiteCrawler для заданий обхода сайта (crawler.py)
+        self.crawler = crawler
+        self.poll = poll
+        self.owner = self._make_owner()
+        self._thread = None
+
+    def start(self):
+        """Запуск в фоновом потоке текущего процесса"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.owner = self._make_owner()
+        self._thread = threading.Thread(target=self.run_forever, name='job-runner', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _make_owner():
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def run_forever(self):
+        while True:
+            try:
+                job_id = self.store.claim(self.owner)
+            except sqlite3.Error:
+                logger.exception("Ошибка очереди заданий")
+                job_id = None
+            if job_id is None:
+                time.sleep(self.poll)
+                continue
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                logger.exception("Ошибка задания %s", job_id)
+                self.store.finish(job_id, self.owner, JOB_FAILED, str(e))
+
+    def run_job(self, job_id):
+        """Проверка непроверенных URL задания порциями.
+
+        Аренда продлевается после каждого URL, поэтому у задания нет
+        общего дедлайна - медленные сайты и паузы обхода его не роняют.
+        """
+        logger.info("Задание %s: старт (%s)", job_id, self.owner)
+        fetcher, process = self.fetcher, self.process
+        if self.store.get(job_id)['kind'] == KIND_CRAWL:
+            if self.crawler is None:
+                raise JobError("Обработчик не поддерживает обход сайта")
+            fetcher, process = self.crawler.prepare(job_id)
+        while True:
+            batch = self.store.pending(job_id)
+            if not batch:
+                self.store.finish(job_id, self.owner)
+                logger.info("Задание %s: готово", job_id)
+                return
+            urls = [url for _, url in batch]
+            for position, result, error in fetcher.iter_completed(urls, process, deadline=None):
+                self.store.save_result(job_id, batch[position][0], result, error)
+                # Отмена или перехват аренды - прекращаем
+                if not self.store.renew(job_id, self.owner):
+                    logger.info("Задание %s: остановлено", job_id)
+                    return
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    from checker import RussianLanguageChecker
+    from checkpool import CheckPool
+    from crawler import SiteCrawler
+    from fetcher import BatchFetcher
+    from httpcache import PageCache
+    from monitor import MONITOR_DB, MonitorRunner, MonitorStore
+
+    checker = RussianLanguageChecker()
+    check_pool = CheckPool(checker)
+    fetcher = BatchFetcher()
+    page_cache = PageCache()
+    store = JobStore()
+    runner = JobRunner(store, fetcher,
+                       lambda url, fetch: check_pool.check_page(url, fetch, page_cache),
+                       SiteCrawler(store, check_pool, page_cache))
+    # Мониторинг страниц - в том же процессе, со своим потоком
+    MonitorRunner(MonitorStore(), checker, fetcher, page_cache).start()
+    print(f"Обработчик заданий: {JOBS_DB}, мониторинг: {MONITOR_DB}")
+    try:
+        runner.run_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бинарный снапшот словарей (sorted string table) с доступом через mmap"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections import Counter
+from pathlib import Path
+
+SNAPSHOT_NAME = 'lexicon.bin'
+SNAPSHOT_MAGIC = b'LAWLEX\x00\x00'
+SNAPSHOT_FORMAT = 3
+
+# Источники слова - битовые флаги в едином словаре
+SOURCE_ORFOGRAF = 0x01
+SOURCE_ORFOEP = 0x02
+SOURCE_FOREIGN = 0x04
+SOURCE_NENORMATIVE = 0x08
+SOURCE_COMMON = 0x10
+SOURCE_MORPH = 0x20  # флаги выше получены от леммы через pymorphy3
+
+SOURCE_NAMES = {
+    SOURCE_ORFOGRAF: 'orfograf',
+    SOURCE_ORFOEP: 'orfoep',
+    SOURCE_FOREIGN: 'foreign',
+    SOURCE_NENORMATIVE: 'nenormative',
+    SOURCE_COMMON: 'common',
+    SOURCE_MORPH: 'morph',
+}
+
+# Нормативная лексика: словари и базовые слова
+NORMATIVE_MASK = SOURCE_ORFOGRAF | SOURCE_ORFOEP | SOURCE_COMMON
+# Допустимая лексика: нормативная и разрешённые иностранные слова
+ALLOWED_MASK = NORMATIVE_MASK | SOURCE_FOREIGN
+
+# Исходные файлы словарей и их флаги
+DICTIONARY_FILES = {
+    'orfograf_words.txt': SOURCE_ORFOGRAF,
+    'orfoep_words.txt': SOURCE_ORFOEP,
+    'foreign_words.txt': SOURCE_FOREIGN,
+    'Nenormativnye_slova.txt': SOURCE_NENORMATIVE
+}
+
+# Флаги заголовка
+FLAG_FORMS_EXPANDED = 1  # словоформы лексем развёрнуты через pymorphy3
+
+# magic, формат, число секций, crc32 данных, флаги, sha1 исходников
+HEADER = struct.Struct('<8sIIII20s')
+# имя секции, число слов, смещение таблицы смещений, смещение и длина
+# строк, смещение массива флагов
+SECTION = struct.Struct('<32sIQQQQ')
+
+
+class SnapshotError(Exception):
+    """Снапшот отсутствует, повреждён или устарел"""
+
+
+def source_names(flags):
+    """Названия источников по битовой маске"""
+    return [name for flag, name in SOURCE_NAMES.items() if flags & flag]
+
+
+def read_dictionary_file(filepath):
+    """Слова из текстового словаря (правила как при обычной загрузке)"""
+    words = set()
+    line_count = 0
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line_count += 1
+            word = line.strip().lower()
+            if word and not word.startswith('#') and len(word) > 1:
+                words.add(word)
+    return words, line_count
+
+
+def sources_digest(dict_path, common_words=()):
+    """SHA1 исходных словарей и базовых слов - для проверки актуальности снапшота"""
+    digest = hashlib.sha1()
+    for filename in DICTIONARY_FILES:
+        filepath = Path(dict_path) / filename
+        digest.update(filename.encode('utf-8'))
+        if filepath.exists():
+            digest.update(filepath.read_bytes())
+    digest.update('\n'.join(sorted(common_words)).encode('utf-8'))
+    return digest.digest()
+
+
+def lexeme_forms(morph, lemma):
+    """Все словарные формы лексем слова"""
+    forms = set()
+    try:
+        for parse in morph.parse(lemma):
+            # Угаданные разборы не разворачиваем - их формы тоже угаданы
+            if not parse.is_known:
+                continue
+            for form in parse.lexeme:
+                forms.add(form.word)
+    except Exception:
+        pass
+    return forms
+
+
+def expand_forms(morph, entries):
+    """Развёртывание словоформ в словаре {слово: флаги}.
+
+    Формы нормативных лемм наследуют их флаги. Для ненормативных лемм
+    берутся только формы, чей лучший разбор даёт нормальную форму из
+    списка - тот же критерий, что и у проверки во время запроса. Этот же
+    критерий применяется ко всем нормативным словам: со снапшотом они не
+    разбираются, и словарное слово с ненормативной нормальной формой
+    (угаданный разбор) иначе прошло бы как чистое. Флаги, добавленные
+    развёртыванием, помечаются SOURCE_MORPH.
+    """
+    literal = dict(entries)
+
+    def inherit(form, flags):
+        new = flags & ~entries.get(form, 0)
+        if new:
+            entries[form] = entries.get(form, 0) | new | SOURCE_MORPH
+
+    for lemma, flags in literal.items():
+        if flags & NORMATIVE_MASK:
+            for form in lexeme_forms(morph, lemma):
+                inherit(form, flags & NORMATIVE_MASK)
+
+    nenormative = {word for word, flags in literal.items() if flags & SOURCE_NENORMATIVE}
+    for lemma in nenormative:
+        for form in lexeme_forms(morph, lemma) - nenormative:
+            try:
+                parsed = morph.parse(form)
+            except Exception:
+                continue
+            if parsed and parsed[0].normal_form in nenormative:
+                inherit(form, SOURCE_NENORMATIVE)
+
+    for word, flags in list(entries.items()):
+        if not flags & NORMATIVE_MASK or flags & SOURCE_NENORMATIVE:
+            continue
+        try:
+            parsed = morph.parse(word)
+        except Exception:
+            continue
+        if parsed and parsed[0].normal_form in nenormative:
+            entries[word] = flags | SOURCE_NENORMATIVE | SOURCE_MORPH
+    return entries
+
+
+def _align(pos, to=8):
+    return (pos + to - 1) // to * to
+
+
+def pack_table(entries, base=0):
+    """Упаковка {слово: флаги} в отсортированную таблицу.
+
+    Возвращает байты и раскладку (число слов, смещения таблицы смещений,
+    строк, длина строк, смещение флагов) относительно начала буфера,
+    в котором байты окажутся по позиции base.
+    """
+    items = sorted((word.encode('utf-8'), flags) for word, flags in entries.items())
+    offsets = [0]
+    for item, _ in items:
+        offsets.append(offsets[-1] + len(item))
+
+    chunk = bytearray(b'\x00' * (_align(base) - base))
+    offsets_pos = base + len(chunk)
+    chunk.extend(struct.pack(f'<{len(offsets)}I', *offsets))
+    blob_pos = base + len(chunk)
+    chunk.extend(b''.join(item for item, _ in items))
+    flags_pos = base + len(chunk)
+    chunk.extend(bytes(flags for _, flags in items))
+    return bytes(chunk), (len(items), offsets_pos, blob_pos, offsets[-1], flags_pos)
+
+
+def build_snapshot(dict_path, out_path=None, morph=None, common_words=()):
+    """Компиляция словарей в один бинарный снапшот.
+
+    С morph (pymorphy3) нормативные и ненормативные леммы и базовые слова
+    разворачиваются во все словоформы, чтобы во время запроса словарные
+    слова проверялись без разбора. Запись идёт во временный файл с
+    атомарной заменой, поэтому процессы, уже отобразившие старый снапшот,
+    продолжают работать с ним.
+    """
+    dict_path = Path(dict_path)
+    out_path = Path(out_path) if out_path else dict_path / SNAPSHOT_NAME
+
+    entries = {}
+    for filename, flag in DICTIONARY_FILES.items():
+        filepath = dict_path / filename
+        if filepath.exists():
+            for word in read_dictionary_file(filepath)[0]:
+                entries[word] = entries.get(word, 0) | flag
+
+    header_flags = 0
+    if morph is not None:
+        for word in common_words:
+            entries[word] = entries.get(word, 0) | SOURCE_COMMON
+        expand_forms(morph, entries)
+        header_flags |= FLAG_FORMS_EXPANDED
+
+    sections = {'lexicon': entries}
+    directory_size = HEADER.size + SECTION.size * len(sections)
+    payload = bytearray()
+    directory = []
+    for name, section in sections.items():
+        chunk, layout = pack_table(section, base=directory_size + len(payload))
+        payload.extend(chunk)
+        directory.append(SECTION.pack(name.encode('utf-8'), *layout))
+
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(sections),
+                         zlib.crc32(payload), header_flags, sources_digest(dict_path, common_words))
+
+    tmp_path = out_path.with_name(f'{out_path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(b''.join(directory))
+        f.write(payload)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class SortedStringTable:
+    """Отсортированная таблица строк UTF-8 с флагами и бинарным поиском.
+
+    Компактный backend: строки лежат одним блоком, без объектов str.
+    Буфер - mmap снапшота или bytes, собранный в памяти.
+    """
+
+    backend = 'compact'
+
+    def __init__(self, buf, count, offsets_pos, blob_pos, blob_len, flags_pos):
+        self._buf = buf
+        self._count = count
+        self._offsets = memoryview(buf)[offsets_pos:offsets_pos + 4 * (count + 1)].cast('I')
+        self._blob_pos = blob_pos
+        self._flags = memoryview(buf)[flags_pos:flags_pos + count]
+        self.nbytes = 4 * (count + 1) + blob_len + count
+        self.mapped = isinstance(buf, mmap.mmap)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Таблица в памяти из {слово: флаги}"""
+        buf, layout = pack_table(entries)
+        return cls(buf, *layout)
+
+    def __len__(self):
+        return self._count
+
+    def get(self, word):
+        """Флаги слова (0 - слова нет)"""
+        if not isinstance(word, str):
+            return 0
+        key = word.encode('utf-8')
+        buf, offsets, base = self._buf, self._offsets, self._blob_pos
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item = buf[base + offsets[mid]:base + offsets[mid + 1]]
+            if item < key:
+                lo = mid + 1
+            elif item > key:
+                hi = mid
+            else:
+                return self._flags[mid]
+        return 0
+
+    def __contains__(self, word):
+        return self.get(word) != 0
+
+    def items(self):
+        buf, offsets, base, flags = self._buf, self._offsets, self._blob_pos, self._flags
+        for i in range(self._count):
+            yield buf[base + offsets[i]:base + offsets[i + 1]].decode('utf-8'), flags[i]
+
+    def __iter__(self):
+        for word, _ in self.items():
+            yield word
+
+    def flag_histogram(self):
+        """Число слов по каждому значению маски"""
+        return Counter(self._flags.tobytes())
+
+
+class DictTable:
+    """Таблица на dict: быстрее поиск, но объект str на каждое слово"""
+
+    backend = 'dict'
+    mapped = False
+
+    def __init__(self, entries):
+        self._data = dict(entries)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, word):
+        return self._data.get(word, 0)
+
+    def __contains__(self, word):
+        return word in self._data
+
+    def items(self):
+        return iter(self._data.items())
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def flag_histogram(self):
+        return Counter(self._data.values())
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self._data) + sum(sys.getsizeof(word) for word in self._data)
+
+
+# Доступные backend'ы таблицы словаря
+TABLE_BACKENDS = {
+    'compact': SortedStringTable.from_entries,
+    'dict': DictTable,
+}
+
+
+def make_table(entries, backend='compact'):
+    """Таблица выбранного backend'а из {слово: флаги} или пар (слово, флаги)"""
+    if backend not in TABLE_BACKENDS:
+        raise ValueError(f'неизвестный backend словаря: {backend}')
+    if not isinstance(entries, dict):
+        entries = dict(entries)
+    return TABLE_BACKENDS[backend](entries)
+
+
+class LexiconSnapshot:
+    """Открытый через mmap снапшот словарей"""
+
+    def __init__(self, path, buf, tables, digest, flags=0):
+        self.path = path
+        self.tables = tables
+        self.digest = digest
+        self.flags = flags
+        self._buf = buf
+
+    @classmethod
+    def open(cls, path, dict_path=None, common_words=()):
+        """Открытие и проверка снапшота; при dict_path сверяется актуальность"""
+        path = Path(path)
+        if not path.exists():
+            raise SnapshotError(f'снапшот не найден: {path}')
+        if sys.byteorder != 'little':
+            raise SnapshotError('снапшот поддерживается только на little-endian')
+
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(buf) < HEADER.size:
+            raise SnapshotError('снапшот повреждён: короткий заголовок')
+        magic, fmt, section_count, crc, flags, digest = HEADER.unpack_from(buf, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError('неизвестный формат снапшота')
+        if fmt != SNAPSHOT_FORMAT:
+            raise SnapshotError(f'версия снапшота {fmt}, ожидается {SNAPSHOT_FORMAT}')
+
+        directory_size = HEADER.size + SECTION.size * section_count
+        if zlib.crc32(memoryview(buf)[directory_size:]) != crc:
+            raise SnapshotError('снапшот повреждён: не совпадает контрольная сумма')
+        if dict_path is not None and sources_digest(dict_path, common_words) != digest:
+            raise SnapshotError('снапшот устарел: словари изменились')
+
+        tables = {}
+        for i in range(section_count):
+            name, *layout = SECTION.unpack_from(buf, HEADER.size + i * SECTION.size)
+            tables[name.rstrip(b'\x00').decode('utf-8')] = SortedStringTable(buf, *layout)
+        if 'lexicon' not in tables:
+            raise SnapshotError('в снапшоте нет секции lexicon')
+
+        return cls(path, buf, tables, digest, flags)
+
+    @property
+    def table(self):
+        return self.tables['lexicon']
+
+    @property
+    def forms_expanded(self):
+        """Словоформы развёрнуты - словарные слова не требуют разбора"""
+        return bool(self.flags & FLAG_FORMS_EXPANDED)
+
+    @property
+    def version(self):
+        """Короткий идентификатор содержимого снапшота"""
+        return self.digest.hex()[:12]
+
+
+class Lexicon:
+    """Единый словарь: слово -> битовая маска источников.
+
+    Одна проверка get() отвечает на все вопросы о слове: нормативное ли
+    оно, иностранное, ненормативное, откуда взято. Основа - таблица
+    снапшота (mmap), дополнения хранятся в словаре в памяти. После
+    подключения к чекеру объект не меняется: перезагрузка словарей
+    собирает новый Lexicon и подменяет ссылку целиком.
+    """
+
+    def __init__(self, table=None, version='empty', forms_expanded=False):
+        self.table = table
+        self.extra = {}
+        # Идентификатор содержимого - часть ключей кэшей
+        self.version = version
+        # Словоформы развёрнуты - словарные слова не требуют разбора
+        self.forms_expanded = forms_expanded
+        self._histogram = None
+
+    def get(self, word):
+        """Флаги слова (0 - слова нет)"""
+        if self.table is None:
+            return self.extra.get(word, 0)
+        flags = self.table.get(word)
+        if self.extra:
+            flags |= self.extra.get(word, 0)
+        return flags
+
+    def add(self, word, flag):
+        self.extra[word] = self.extra.get(word, 0) | flag
+        self._histogram = None
+
+    def update(self, words, flag):
+        extra = self.extra
+        for word in words:
+            extra[word] = extra.get(word, 0) | flag
+        self._histogram = None
+
+    def count(self, mask):
+        """Число слов, у которых есть хотя бы один флаг из mask"""
+        if self._histogram is None:
+            histogram = self.table.flag_histogram() if self.table is not None else Counter()
+            for word, flags in self.extra.items():
+                base = self.table.get(word) if self.table is not None else 0
+                if base:
+                    histogram[base] -= 1
+                histogram[base | flags] += 1
+            self._histogram = histogram
+        return sum(n for flags, n in self._histogram.items() if flags & mask)
+
+    def items(self):
+        if self.table is not None:
+            for word, flags in self.table.items():
+                yield word, flags | self.extra.get(word, 0)
+        for word, flags in self.extra.items():
+            if self.table is None or word not in self.table:
+                yield word, flags
+
+
+class LexiconView:
+    """Представление единого словаря как множества слов по маске.
+
+    Сохраняет прежний интерфейс set (in, len, add, update, итерация)
+    для normative_words / foreign_allowed / nenormative_words.
+    """
+
+    def __init__(self, lexicon, mask, add_flag):
+        self.lexicon = lexicon
+        self.mask = mask
+        self.add_flag = add_flag
+
+    def __contains__(self, word):
+        return bool(self.lexicon.get(word) & self.mask)
+
+    def __len__(self):
+        return self.lexicon.count(self.mask)
+
+    def __iter__(self):
+        for word, flags in self.lexicon.items():
+            if flags & self.mask:
+                yield word
+
+    def add(self, word):
+        self.lexicon.add(word, self.add_flag)
+
+    def update(self, words):
+        self.lexicon.update(words, self.add_flag)
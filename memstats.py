@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Отчёт о памяти процессов: общие (shared) и собственные (private) страницы"""
+
+import gc
+import os
+import sys
+from pathlib import Path
+
+
+def deep_sizeof(obj, seen=None):
+    """Оценка памяти объекта с вложенными контейнерами (байты)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def read_smaps_rollup(pid='self'):
+    """Сводка по памяти процесса из /proc/<pid>/smaps_rollup (в КБ)"""
+    fields = {}
+    path = Path(f'/proc/{pid}/smaps_rollup')
+    if not path.exists():
+        # Старые ядра: суммируем /proc/<pid>/smaps
+        path = Path(f'/proc/{pid}/smaps')
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    key = parts[0][:-1]
+                    fields[key] = fields.get(key, 0) + int(parts[1])
+    except OSError:
+        return None
+
+    return {
+        'pid': os.getpid() if pid == 'self' else int(pid),
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'private_dirty_kb': fields.get('Private_Dirty', 0),
+    }
+
+
+def child_pids(pid):
+    """PID дочерних процессов (воркеров gunicorn для мастера)"""
+    children_file = Path(f'/proc/{pid}/task/{pid}/children')
+    try:
+        return [int(p) for p in children_file.read_text().split()]
+    except OSError:
+        pass
+
+    children = []
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # Формат: pid (comm) state ppid ...
+            ppid = int(stat.read_text().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(stat.parent.name))
+    return sorted(children)
+
+
+def memory_report():
+    """Память текущего процесса, а под gunicorn - мастера и всех воркеров"""
+    report = {
+        'pid': os.getpid(),
+        'process': read_smaps_rollup(),
+        'gc_frozen_objects': gc.get_freeze_count(),
+    }
+    if 'gunicorn' in sys.modules:
+        master = os.getppid()
+        report['master'] = read_smaps_rollup(master)
+        report['workers'] = [r for r in (read_smaps_rollup(p) for p in child_pids(master)) if r]
+    return report
+
+
+if __name__ == '__main__':
+    # python memstats.py <pid мастера gunicorn>
+    if len(sys.argv) < 2:
+        print("Использование: python memstats.py <pid мастера>")
+        sys.exit(1)
+    master_pid = int(sys.argv[1])
+    print(f"{'PID':>8} {'RSS, КБ':>10} {'PSS, КБ':>10} {'Shared, КБ':>11} {'Private, КБ':>12}")
+    for pid in [master_pid] + child_pids(master_pid):
+        info = read_smaps_rollup(pid)
+        if info:
+            print(f"{info['pid']:>8} {info['rss_kb']:>10,} {info['pss_kb']:>10,} "
+                  f"{info['shared_kb']:>11,} {info['private_kb']:>12,}")
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Мониторинг страниц по расписанию с проверкой только изменённых абзацев.
+
+Страница разбивается на абзацы (блочные элементы, htmltext.extract_blocks),
+у каждого абзаца - хеш (boilerplate.block_digest). Вердикты абзацев
+(checker.text_verdicts) хранятся по (версия словарей, хеш) и общие для
+всех страниц: одинаковые шапки и подвалы сайта проверяются один раз.
+При очередном запуске проверяются только новые абзацы, результат
+страницы собирается из сохранённых вердиктов (checker.merge_verdicts)
+и сравнивается с прошлым запуском: какие нарушения появились и какие
+исчезли.
+
+Неизменённая страница (304 по ETag или те же абзацы) не проверяется
+вовсе. Расписание, абзацы и история запусков - в SQLite (MONITOR_DB);
+обработчик работает в процессе заданий (python jobs.py, worker в
+Procfile), в процессе приложения (JOBS_INLINE=1) или отдельно:
+python monitor.py
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from boilerplate import block_digest
+from checker import make_result, merge_verdicts
+from fetcher import normalize_url
+from htmltext import BATCH_SKIP_TAGS, BLOCK_SEPARATOR, decode_page, extract_blocks, read_page_bytes
+from httpcache import CACHE_STALE
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+MONITOR_DB = os.environ.get('MONITOR_DB', str(Path(__file__).parent / 'monitor.sqlite3'))
+# Интервал проверки страницы (секунды): по умолчанию и минимальный
+MONITOR_INTERVAL = float(os.environ.get('MONITOR_INTERVAL', 86400))
+MONITOR_MIN_INTERVAL = float(os.environ.get('MONITOR_MIN_INTERVAL', 300))
+MONITOR_MAX_URLS = int(os.environ.get('MONITOR_MAX_URLS', 5000))
+# Страниц за один проход обработчика и на сколько они за ним закрепляются
+MONITOR_CHUNK = int(os.environ.get('MONITOR_CHUNK', 50))
+MONITOR_LEASE = float(os.environ.get('MONITOR_LEASE', 600))
+MONITOR_POLL = float(os.environ.get('MONITOR_POLL', 30))
+# Сколько запусков хранить на страницу и сколько живёт неиспользуемый абзац
+MONITOR_RUNS_KEPT = int(os.environ.get('MONITOR_RUNS_KEPT', 30))
+MONITOR_BLOCK_TTL = float(os.environ.get('MONITOR_BLOCK_TTL', 30 * 86400))
+
+# Категории нарушений для сравнения запусков
+VIOLATION_KEYS = ('latin_words', 'unknown_cyrillic', 'nenormative_words')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS monitors (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    interval REAL NOT NULL,
+    next_run REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_run REAL,
+    status TEXT,
+    error TEXT,
+    blocks TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS monitors_due ON monitors (next_run);
+CREATE TABLE IF NOT EXISTS monitor_runs (
+    monitor_id TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    summary TEXT,
+    diff TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS monitor_runs_monitor ON monitor_runs (monitor_id, run_at);
+CREATE TABLE IF NOT EXISTS blocks (
+    version TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (version, digest)
+);
+"""
+
+# Итог запуска
+RUN_OK = 'ok'
+RUN_ERROR = 'error'
+
+
+class MonitorError(Exception):
+    """Недопустимая операция с мониторингом или ошибка загрузки страницы"""
+
+
+def page_blocks(response):
+    """load для PageCache: (абзацы через BLOCK_SEPARATOR, title, сведения)"""
+    if response.status_code != 200:
+        response.close()
+        raise MonitorError(f"HTTP {response.status_code}")
+    content_type = response.headers.get('Content-Type')
+    body, info = read_page_bytes(response)
+    html, encoding, method = decode_page(body, content_type)
+    blocks, title, _ = extract_blocks(html, BATCH_SKIP_TAGS)
+    return BLOCK_SEPARATOR.join(blocks), title, dict(info, page_encoding=encoding, encoding_method=method)
+
+
+def violation_diff(previous, result):
+    """Появившиеся и исчезнувшие нарушения по сравнению с прошлым результатом"""
+    new, resolved = {}, {}
+    for key in VIOLATION_KEYS:
+        before = set(previous.get(key, ())) if previous else set()
+        after = set(result[key])
+        new[key] = sorted(after - before)
+        resolved[key] = sorted(before - after)
+    return {
+        'new': new,
+        'resolved': resolved,
+        'changed': any(new.values()) or any(resolved.values()),
+        'first_run': previous is None
+    }
+
+
+class MonitorStore:
+    """Страницы под наблюдением, вердикты абзацев и история в SQLite"""
+
+    def __init__(self, path=MONITOR_DB):
+        self.path = path
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Соединения не переживают fork и не делятся между потоками
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.row_factory = sqlite3.Row
+            with db:
+                yield db
+
+    def add(self, url, interval=MONITOR_INTERVAL):
+        """Страница под наблюдением (первый запуск - сразу); повторный add меняет интервал"""
+        url = normalize_url(url)
+        if not url.startswith(('http://', 'https://')):
+            raise MonitorError("URL должен начинаться с http:// или https://")
+        interval = max(float(interval), MONITOR_MIN_INTERVAL)
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute('SELECT id FROM monitors WHERE url = ?', (url,)).fetchone()
+            if row is not None:
+                db.execute('UPDATE monitors SET interval = ? WHERE id = ?', (interval, row['id']))
+                monitor_id = row['id']
+            else:
+                if db.execute('SELECT COUNT(*) FROM monitors').fetchone()[0] >= MONITOR_MAX_URLS:
+                    raise MonitorError(f"Под наблюдением уже {MONITOR_MAX_URLS} страниц")
+                monitor_id = uuid.uuid4().hex
+                db.execute('INSERT INTO monitors (id, url, interval, next_run, created_at) VALUES (?, ?, ?, ?, ?)',
+                           (monitor_id, url, interval, now, now))
+        return self.get(monitor_id)
+
+    def remove(self, monitor_id):
+        with self._connect() as db:
+            cursor = db.execute('DELETE FROM monitors WHERE id = ?', (monitor_id,))
+            db.execute('DELETE FROM monitor_runs WHERE monitor_id = ?', (monitor_id,))
+        return cursor.rowcount == 1
+
+    def schedule_now(self, monitor_id):
+        """Внеочередной запуск при следующем опросе обработчика"""
+        with self._connect() as db:
+            cursor = db.execute('UPDATE monitors SET next_run = ? WHERE id = ?', (time.time(), monitor_id))
+        return self.get(monitor_id) if cursor.rowcount == 1 else None
+
+    def _describe(self, row, full=False):
+        monitor = {
+            'monitor_id': row['id'],
+            'url': row['url'],
+            'interval': row['interval'],
+            'next_run': row['next_run'],
+            'created_at': row['created_at'],
+            'last_run': row['last_run'],
+            'status': row['status'],
+            'error': row['error']
+        }
+        if full:
+            monitor['result'] = json.loads(row['result']) if row['result'] else None
+        return monitor
+
+    def get(self, monitor_id):
+        """Страница с последним результатом или None"""
+        with self._connect() as db:
+            row = db.execute('SELECT * FROM monitors WHERE id = ?', (monitor_id,)).fetchone()
+        return self._describe(row, full=True) if row else None
+
+    def list(self, offset=0, limit=100):
+        with self._connect() as db:
+            rows = db.execute('SELECT * FROM monitors ORDER BY created_at LIMIT ? OFFSET ?',
+                              (limit, offset)).fetchall()
+        return [self._describe(row) for row in rows]
+
+    def runs(self, monitor_id, limit=MONITOR_RUNS_KEPT):
+        """История запусков, последние первыми"""
+        with self._connect() as db:
+            rows = db.execute('SELECT * FROM monitor_runs WHERE monitor_id = ? ORDER BY run_at DESC LIMIT ?',
+                              (monitor_id, limit)).fetchall()
+        return [{
+            'run_at': row['run_at'],
+            'status': row['status'],
+            'summary': json.loads(row['summary']) if row['summary'] else None,
+            'diff': json.loads(row['diff']) if row['diff'] else None,
+            'error': row['error']
+        } for row in rows]
+
+    def claim(self, limit=MONITOR_CHUNK, lease=MONITOR_LEASE):
+        """Страницы, которым пора проверяться; закрепляются на lease секунд"""
+        now = time.time()
+        with self._connect() as db:
+            # BEGIN IMMEDIATE - выбор и захват без гонки между процессами
+            db.execute('BEGIN IMMEDIATE')
+            rows = db.execute('SELECT id, url, blocks, result FROM monitors WHERE next_run <= ? '
+                              'ORDER BY next_run LIMIT ?', (now, limit)).fetchall()
+            db.executemany('UPDATE monitors SET next_run = ? WHERE id = ?',
+                           ((now + lease, row['id']) for row in rows))
+        return [{
+            'monitor_id': row['id'],
+            'url': row['url'],
+            'blocks': json.loads(row['blocks']) if row['blocks'] else None,
+            'result': json.loads(row['result']) if row['result'] else None
+        } for row in rows]
+
+    def block_verdicts(self, version, digests):
+        """Сохранённые вердикты абзацев {хеш: text_verdicts}"""
+        found = {}
+        digests = list(digests)
+        now = time.time()
+        with self._connect() as db:
+            # Ограничение SQLite на число параметров запроса
+            for start in range(0, len(digests), 500):
+                part = digests[start:start + 500]
+                marks = ','.join('?' * len(part))
+                for row in db.execute(f'SELECT digest, verdict FROM blocks WHERE version = ? AND digest IN ({marks})',
+                                      (version, *part)):
+                    found[row['digest']] = json.loads(row['verdict'])
+            db.executemany('UPDATE blocks SET used_at = ? WHERE version = ? AND digest = ?',
+                           ((now, version, digest) for digest in found))
+        return found
+
+    def save_blocks(self, version, verdicts):
+        now = time.time()
+        with self._connect() as db:
+            db.executemany('INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?)',
+                           ((version, digest, json.dumps(verdict, ensure_ascii=False), now)
+                            for digest, verdict in verdicts.items()))
+
+    def prune_blocks(self, version):
+        """Удаление вердиктов других версий словарей и давно не нужных абзацев"""
+        with self._connect() as db:
+            db.execute('DELETE FROM blocks WHERE version != ? OR used_at < ?',
+                       (version, time.time() - MONITOR_BLOCK_TTL))
+
+    def save_run(self, monitor_id, started, blocks=None, result=None, summary=None, diff=None, error=None):
+        """Итог запуска: расписание, последний результат и запись истории"""
+        status = RUN_OK if error is None else RUN_ERROR
+        with self._connect() as db:
+            if error is None:
+                db.execute('UPDATE monitors SET next_run = ? + interval, last_run = ?, status = ?, error = NULL, '
+                           'blocks = ?, result = ? WHERE id = ?',
+                           (started, started, status, json.dumps(blocks),
+                            json.dumps(result, ensure_ascii=False), monitor_id))
+            else:
+                db.execute('UPDATE monitors SET next_run = ? + interval, last_run = ?, status = ?, error = ? '
+                           'WHERE id = ?', (started, started, status, error, monitor_id))
+            db.execute('INSERT INTO monitor_runs VALUES (?, ?, ?, ?, ?, ?)',
+                       (monitor_id, started, status, json.dumps(summary) if summary else None,
+                        json.dumps(diff, ensure_ascii=False) if diff else None, error))
+            db.execute('DELETE FROM monitor_runs WHERE monitor_id = ? AND run_at NOT IN '
+                       '(SELECT run_at FROM monitor_runs WHERE monitor_id = ? ORDER BY run_at DESC LIMIT ?)',
+                       (monitor_id, monitor_id, MONITOR_RUNS_KEPT))
+
+
+class MonitorRunner:
+    """Фоновый обработчик расписания: страницы - через BatchFetcher и кэш страниц"""
+
+    def __init__(self, store, checker, fetcher, cache, poll=MONITOR_POLL):
+        self.store = store
+        self.checker = checker
+        self.fetcher = fetcher
+        self.cache = cache
+        self.poll = poll
+        self._thread = None
+
+    def start(self):
+        """Запуск в фоновом потоке текущего процесса"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.run_forever, name='monitor-runner', daemon=True)
+        self._thread.start()
+
+    def run_forever(self):
+        while True:
+            try:
+                monitors = self.store.claim()
+            except sqlite3.Error:
+                logger.exception("Ошибка расписания мониторинга")
+                monitors = []
+            if not monitors:
+                time.sleep(self.poll)
+                continue
+            try:
+                self.run_due(monitors)
+            except Exception:
+                logger.exception("Ошибка запуска мониторинга")
+
+    def run_due(self, monitors):
+        """Проверка порции страниц; итог каждой сохраняется по готовности"""
+        if not self.checker.ready:
+            self.checker.wait_ready()
+        started = time.time()
+        urls = [monitor['url'] for monitor in monitors]
+        for index, outcome, error in self.fetcher.iter_completed(urls, self.check_page, deadline=None):
+            monitor = monitors[index]
+            if error is not None:
+                logger.info("Мониторинг %s: %s", monitor['url'], error)
+                self.store.save_run(monitor['monitor_id'], started, error=str(error))
+                continue
+            blocks, result, summary = self.merge(monitor, *outcome)
+            diff = violation_diff(monitor['result'], result)
+            self.store.save_run(monitor['monitor_id'], started, blocks, result, summary, diff)
+        self.store.prune_blocks(self.checker.dict_version)
+
+    def check_page(self, url, fetch):
+        """Загрузка (через кэш страниц) - (абзацы, title, сведения, кэш)"""
+        text, title, info, cache_info = self.cache.fetch(url, 'monitor', fetch, page_blocks)
+        if cache_info['status'] == CACHE_STALE:
+            # Сервер недоступен - старая копия не говорит о текущем состоянии
+            raise MonitorError("Страница недоступна")
+        blocks = [block for block in text.split(BLOCK_SEPARATOR) if block]
+        return blocks, title, info, cache_info
+
+    def merge(self, monitor, blocks, title, info, cache_info):
+        """(хеши абзацев, результат страницы, сводка) с проверкой только новых абзацев"""
+        lexicon = self.checker.lexicon
+        digests = [block_digest(block) for block in blocks]
+        summary = {'blocks': len(blocks), 'checked_blocks': 0, 'unchanged': False, 'cache': cache_info['status']}
+        previous = monitor['result']
+        if previous and digests == monitor['blocks'] and previous.get('dict_version') == lexicon.version:
+            summary['unchanged'] = True
+            return digests, previous, summary
+
+        unique = dict(zip(digests, blocks))
+        verdicts = self.store.block_verdicts(lexicon.version, unique)
+        missing = {digest: self.checker.text_verdicts(block, lexicon)
+                   for digest, block in unique.items() if digest not in verdicts}
+        if missing:
+            self.store.save_blocks(lexicon.version, missing)
+            verdicts.update(missing)
+        summary['checked_blocks'] = len(missing)
+        result = make_result(lexicon.version, *merge_verdicts(verdicts[digest] for digest in digests))
+        result.update(info, page_title=title)
+        return digests, result, summary
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    from checker import RussianLanguageChecker
+    from fetcher import BatchFetcher
+    from httpcache import PageCache
+
+    runner = MonitorRunner(MonitorStore(), RussianLanguageChecker(), BatchFetcher(), PageCache())
+    print(f"Мониторинг страниц: {MONITOR_DB}")
+    try:
+        runner.run_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
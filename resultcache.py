@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Кэш результатов check_text по содержимому текста.
+
+Ключ - sha256 текста как есть (пробелы влияют на разбиение: PHONE_RE
+захватывает пробельные символы) и версия словарей. Первый уровень -
+LRU в памяти процесса (RESULT_CACHE_SIZE записей), второй - необязательный
+SQLite (RESULT_CACHE_DB, общий для воркеров, RESULT_CACHE_DISK_ENTRIES
+записей). После перезагрузки словарей записи старой версии не находятся:
+в памяти они удаляются сразу, на диске вытесняются как давно не
+использованные (воркеры с разными версиями не стирают записи друг друга).
+
+Результат отдаётся общим объектом - его нельзя изменять, только копировать.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+# Пусто - дискового уровня нет
+RESULT_CACHE_DB = os.environ.get('RESULT_CACHE_DB', '')
+RESULT_CACHE_DISK_ENTRIES = int(os.environ.get('RESULT_CACHE_DISK_ENTRIES', 100000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    version TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    result TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (version, digest)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used_at);
+"""
+
+
+def text_digest(text):
+    """sha256 текста"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Результаты проверки по (версия словарей, хеш текста): память и SQLite"""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, path=RESULT_CACHE_DB, disk_entries=RESULT_CACHE_DISK_ENTRIES):
+        self.maxsize = maxsize
+        self.path = path or None
+        self.disk_entries = disk_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.path:
+            with self._connect() as db:
+                db.execute('PRAGMA journal_mode=WAL')
+                db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            with db:
+                yield db
+
+    def _retain(self, version):
+        # Под self._lock: записи прежних версий словарей больше не нужны
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+
+    def get(self, digest, version):
+        """Результат из кэша или None"""
+        with self._lock:
+            self._retain(version)
+            result = self._data.get(digest)
+            if result is not None:
+                self._data.move_to_end(digest)
+                self.hits += 1
+                return result
+        if self.path:
+            result = self._disk_get(digest, version)
+            if result is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(digest, version, result)
+                return result
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, digest, result):
+        """Сохранение результата под его dict_version; возвращает result"""
+        version = result['dict_version']
+        with self._lock:
+            self._remember(digest, version, result)
+        if self.path:
+            self._disk_put(digest, version, result)
+        return result
+
+    def _remember(self, digest, version, result):
+        if self.maxsize <= 0 or version != self._version:
+            return
+        self._data[digest] = result
+        self._data.move_to_end(digest)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _disk_get(self, digest, version):
+        with self._connect() as db:
+            row = db.execute('SELECT result FROM results WHERE version = ? AND digest = ?',
+                             (version, digest)).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE results SET used_at = ? WHERE version = ? AND digest = ?',
+                       (time.time(), version, digest))
+        return json.loads(row[0])
+
+    def _disk_put(self, digest, version, result):
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                       (version, digest, json.dumps(result, ensure_ascii=False), time.time()))
+            excess = db.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.disk_entries
+            if excess > 0:
+                db.execute('DELETE FROM results WHERE rowid IN '
+                           '(SELECT rowid FROM results ORDER BY used_at LIMIT ?)', (excess,))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'disk': self.path is not None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Объединение одинаковых одновременных вычислений (single-flight).
+
+Пока вычисление по ключу идёт, повторные вызовы с тем же ключом не
+запускают своё, а ждут первое и получают его результат или исключение.
+Результат не кэшируется: после завершения следующий вызов считает заново.
+"""
+
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Одно вычисление на ключ среди одновременных вызовов в процессе"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """(результат func(), разделён ли он с уже идущим вызовом)"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.started += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'started': self.started,
+                'coalesced': self.coalesced
+            }
@@ -1,6 +1,8 @@
 // API Configuration
 const API_BASE = window.API_BASE_URL || 'http://localhost:5000';
 console.log('🔗 Using API:', API_BASE);
+// Лимит URL в одном запросе /api/batch-check/stream
+const BATCH_LIMIT = 50;
 
 // Global variables
 let currentResults = {
@@ -175,38 +177,74 @@ async function checkBatch() {
     progressFill.style.width = '0%';
     progressFill.style.animation = 'none';
     
-    const results = [];
+    // Потоковые запросы по BATCH_LIMIT URL (лимит сервера): записи NDJSON
+    // приходят по мере готовности URL. Текст страниц извлекается как у
+    // проверки одного URL (extract: 'page' - без меню, шапки и подвала)
+    const results = new Array(urls.length);
     let completed = 0;
+    progressText.textContent = `${completed} / ${urls.length}`;
     
-    for (const url of urls) {
-        progressText.textContent = `${completed} / ${urls.length}`;
-        
+    for (let offset = 0; offset < urls.length; offset += BATCH_LIMIT) {
+        const chunk = urls.slice(offset, offset + BATCH_LIMIT);
         try {
-            const response = await fetch(`${API_BASE}/api/check-url`, {
+            const response = await fetch(`${API_BASE}/api/batch-check/stream`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/x-ndjson'
                 },
-                body: JSON.stringify({ url })
+                body: JSON.stringify({ urls: chunk, extract: 'page' })
             });
             
-            const data = await response.json();
-            results.push({
-                url,
-                success: data.success,
-                result: data.result,
-                error: data.error
-            });
+            if (!response.ok || !response.body) {
+                const data = await response.json();
+                throw new Error(data.error || `HTTP ${response.status}`);
+            }
+            
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    const event = JSON.parse(line);
+                    if (event.type === 'result') {
+                        results[offset + event.index] = {
+                            url: event.url,
+                            success: event.success,
+                            result: event.result,
+                            error: event.error
+                        };
+                    } else if (event.type === 'progress') {
+                        const checked = offset + event.completed;
+                        progressText.textContent = `${checked} / ${urls.length}`;
+                        progressFill.style.width = `${(checked / urls.length) * 100}%`;
+                    }
+                }
+            }
         } catch (error) {
-            results.push({
-                url,
-                success: false,
-                error: error.message
+            // Оставшиеся URL части помечаем ошибкой соединения
+            chunk.forEach((url, index) => {
+                if (!results[offset + index]) {
+                    results[offset + index] = { url, success: false, error: error.message };
+                }
             });
         }
-        
-        completed++;
-        progressFill.style.width = `${(completed / urls.length) * 100}%`;
+        completed = Math.min(offset + BATCH_LIMIT, urls.length);
+    }
+    
+    // Поток оборвался без ошибки - URL без записи не проверены
+    for (let index = 0; index < urls.length; index++) {
+        if (!results[index]) {
+            results[index] = { url: urls[index], success: false, error: 'Не проверен' };
+        }
     }
     
     progressText.textContent = `${completed} / ${urls.length}`;
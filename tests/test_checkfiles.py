@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""CLI checkfiles.py: коды выхода и вывод по каталогу и stdin"""
+
+import io
+import json
+
+import pytest
+
+import checkfiles
+
+
+def records(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'clean.txt').write_text('привет мир', encoding='utf-8')
+    (tmp_path / 'page.htm').write_text('<p>привет мир</p><script>hello()</script>', encoding='utf-8')
+    (tmp_path / 'skip.md').write_text('hello', encoding='utf-8')
+    (tmp_path / 'sub' / 'bad.html').write_text('<p>привет hello</p>', encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_directory(files, capsys, processes):
+    code = checkfiles.main([str(files), '--processes', str(processes)])
+    out, err = capsys.readouterr()
+    found = records(out)
+    assert [record['path'] for record in found] == [
+        str(files / 'clean.txt'), str(files / 'page.htm'), str(files / 'sub' / 'bad.html')]
+    assert [record['result']['law_compliant'] for record in found] == [True, True, False]
+    assert found[2]['result']['latin_words'] == ['hello']
+    assert code == checkfiles.EXIT_VIOLATIONS
+    assert 'Файлов: 3, с нарушениями: 1, ошибок: 0' in err
+
+
+def test_clean_files(files, capsys):
+    code = checkfiles.main([str(files / 'clean.txt'), str(files / 'page.htm'), '--processes', '1'])
+    assert code == checkfiles.EXIT_CLEAN
+    assert all(record['success'] for record in records(capsys.readouterr().out))
+
+
+def test_missing_file(files, capsys):
+    code = checkfiles.main([str(files / 'clean.txt'), str(files / 'none.txt'), '--processes', '1'])
+    found = records(capsys.readouterr().out)
+    assert code == checkfiles.EXIT_ERRORS
+    assert found[0]['success'] and not found[1]['success']
+    assert 'No such file' in found[1]['error']
+
+
+def test_stdin_csv(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('мир hello'))
+    code = checkfiles.main(['--format', 'csv', '--processes', '0'])
+    lines = capsys.readouterr().out.splitlines()
+    assert code == checkfiles.EXIT_VIOLATIONS
+    assert lines[0].startswith('path,success,law_compliant')
+    assert lines[1].startswith('-,True,False,1,1,0,0,2,hello')
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Пул проверки: fork при блокировках, захваченных другими потоками"""
+
+import threading
+
+import pytest
+
+from checker import RussianLanguageChecker
+from checkpool import CheckPool
+
+
+@pytest.fixture(scope='module')
+def checker():
+    return RussianLanguageChecker()
+
+
+def test_fork_while_verdict_cache_locked(checker):
+    pool = CheckPool(checker, processes=1)
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with checker.verdict_cache._lock:
+            locked.set()
+            release.wait(30)
+
+    holder = threading.Thread(target=hold_lock, daemon=True)
+    holder.start()
+    assert locked.wait(5)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(pool.check_text('привет мир hello')),
+                              daemon=True)
+    try:
+        # Пул порождается сейчас, пока блокировку держит holder
+        worker.start()
+        worker.join(20)
+        assert results, "процесс пула завис на унаследованной блокировке"
+        assert results[0]['latin_words'] == ['hello']
+    finally:
+        release.set()
+        holder.join()
+        if worker.is_alive():
+            # Завис - завершаем процессы пула, чтобы тест упал, а не повис
+            for process in list(pool._executor._processes.values()):
+                process.terminate()
+        worker.join(10)
+        pool.shutdown()
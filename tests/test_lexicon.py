@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Развёртывание словоформ: вердикты как у проверки с разбором"""
+
+import pytest
+
+from checker import VERDICT_NENORMATIVE
+from lexicon import (SOURCE_MORPH, SOURCE_NENORMATIVE, SOURCE_ORFOGRAF, Lexicon, expand_forms,
+                     make_table)
+
+pymorphy3 = pytest.importorskip('pymorphy3')
+
+
+@pytest.fixture(scope='module')
+def morph():
+    return pymorphy3.MorphAnalyzer()
+
+
+@pytest.fixture(scope='module')
+def checker():
+    from checker import RussianLanguageChecker
+    return RussianLanguageChecker()
+
+
+def test_normative_word_with_nenormative_normal_form(morph):
+    # "манде" есть в орфографическом словаре, но лучший (угаданный)
+    # разбор даёт нормальную форму "манда" из списка ненормативной лексики
+    entries = expand_forms(morph, {'манде': SOURCE_ORFOGRAF, 'манда': SOURCE_NENORMATIVE})
+    assert entries['манде'] & SOURCE_NENORMATIVE
+    assert entries['манде'] & SOURCE_MORPH
+    assert entries['манде'] & SOURCE_ORFOGRAF
+
+
+def test_expanded_lexicon_matches_runtime_parse(morph, checker):
+    entries = {'манде': SOURCE_ORFOGRAF, 'манда': SOURCE_NENORMATIVE, 'дом': SOURCE_ORFOGRAF}
+    plain = Lexicon(make_table(entries), version='plain')
+    expanded = Lexicon(make_table(expand_forms(morph, dict(entries))), version='expanded',
+                       forms_expanded=True)
+    for word in ('манде', 'дом', 'дома'):
+        assert checker._classify(word, None, expanded)[0] == checker._classify(word, None, plain)[0]
+    assert checker._classify('манде', None, expanded)[0] == VERDICT_NENORMATIVE
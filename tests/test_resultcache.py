@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Кэш результатов: ключ по точному тексту, дисковый уровень разных версий"""
+
+import pytest
+
+from checker import RussianLanguageChecker
+from resultcache import ResultCache, text_digest
+
+
+@pytest.fixture(scope='module')
+def checker():
+    return RussianLanguageChecker()
+
+
+def test_whitespace_changes_key(checker):
+    # Семь пробелов - номер телефона (PHONE_RE), который отрезает дефис от слова
+    spaced, single = 'ab-1       cd', 'ab-1 cd'
+    assert checker.check_text(spaced)['latin_words'] != checker.check_text(single)['latin_words']
+    assert text_digest(spaced) != text_digest(single)
+
+    cache = ResultCache(path='')
+    cache.put(text_digest(spaced), checker.check_text(spaced))
+    assert cache.get(text_digest(single), checker.dict_version) is None
+
+
+def test_disk_keeps_other_versions(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    old, new = ResultCache(maxsize=0, path=path), ResultCache(maxsize=0, path=path)
+    old.put('a', {'dict_version': 'v1', 'total_words': 1})
+    new.put('b', {'dict_version': 'v2', 'total_words': 2})
+    old.put('c', {'dict_version': 'v1', 'total_words': 3})
+    assert new.get('a', 'v1') == {'dict_version': 'v1', 'total_words': 1}
+    assert old.get('b', 'v2') == {'dict_version': 'v2', 'total_words': 2}
+
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(maxsize=0, path=str(tmp_path / 'results.sqlite3'), disk_entries=2)
+    cache.put('a', {'dict_version': 'v1'})
+    cache.put('b', {'dict_version': 'v1'})
+    assert cache.get('a', 'v1') is not None
+    cache.put('c', {'dict_version': 'v2'})
+    assert cache.get('b', 'v1') is None
+    assert cache.get('a', 'v1') is not None
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""count_tokens совпадает с прежней очисткой re.sub + findall"""
+
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from checker import count_tokens
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from bench_tokenizer import make_text  # noqa: E402
+
+
+def legacy_words(text):
+    """Прежняя реализация check_text"""
+    text = re.sub(r'https?://[^\s]+', ' ', text)
+    text = re.sub(r'\+?\d[\d\s\-\(\)]{7,}', ' ', text)
+    return Counter(re.findall(r'\b[а-яёА-ЯЁa-zA-Z][а-яёА-ЯЁa-zA-Z\-]*\b', text))
+
+
+@pytest.mark.parametrize('text', [
+    'abc123 4567890',
+    'сайтhttps://example.com/путь и дальше',
+    'abc1 http://x 234567 конец',
+    '+7 (999) 123-45-67-abc',
+    'слово-12345678-слово',
+    'https://a.ru/x,https://b.ru тест',
+    '',
+])
+def test_edge_cases(text):
+    assert count_tokens(text)[0] == legacy_words(text)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_corpus(seed):
+    text = make_text(256 * 1024, seed=seed)
+    # Склейки слов с цифрами, телефонами и ссылками без пробелов
+    text = text.replace(' 8-800', 'abc8-800').replace(' https', 'сайтhttps')
+    assert count_tokens(text)[0] == legacy_words(text)